@@ -0,0 +1,89 @@
+"""
+Benchmark the compiled filter engine against the previous filter_list implementation on large lists.
+
+Run with: python benchmarks/bench_filters.py [records]
+"""
+import random
+import sys
+import time
+
+from civo.utils import filter_list
+
+
+def legacy_filter_list(data, filter_by):
+    # filter_list as it was before civo.filters, kept here as the baseline
+    return_list = []
+    filter_split = filter_by.split(':')
+    search_in = filter_split[0]
+    search = filter_split[1]
+
+    try:
+        search = int(search)
+    except ValueError:
+        pass
+
+    try:
+        data_search = data['items']
+    except TypeError:
+        data_search = data
+
+    for element in data_search:
+        try:
+            if search in element[search_in]:
+                return_list.append(element)
+        except TypeError:
+            if search == element[search_in]:
+                return_list.append(element)
+    return return_list
+
+
+def make_records(count):
+    rnd = random.Random(42)
+    statuses = ['ACTIVE', 'BUILDING', 'SHUTOFF']
+    sizes = ['g3.xsmall', 'g3.small', 'g3.medium', 'g3.large']
+    return [{
+        'id': 'instance-{}'.format(i),
+        'hostname': 'host-{}.example.com'.format(i),
+        'status': rnd.choice(statuses),
+        'size': rnd.choice(sizes),
+        'cpu_cores': rnd.choice([1, 2, 4, 8]),
+        'network_id': 'net-{}'.format(rnd.randint(0, 9)),
+    } for i in range(count)]
+
+
+def timed(function, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(count=100000):
+    data = make_records(count)
+    page = data[:20]
+
+    cases = [
+        ('{} searches of 20'.format(count // 20), lambda: [legacy_filter_list(page, 'size:g3.small')
+                                                           for _ in range(count // 20)],
+         lambda: [filter_list(page, 'size:g3.small') for _ in range(count // 20)]),
+        ('single key', lambda: legacy_filter_list(data, 'status:ACTIVE'),
+         lambda: filter_list(data, 'status:ACTIVE')),
+        ('three passes vs one AND', lambda: legacy_filter_list(legacy_filter_list(
+            legacy_filter_list(data, 'status:ACTIVE'), 'size:g3.small'), 'network_id:net-3'),
+         lambda: filter_list(data, 'status:ACTIVE AND size:g3.small AND network_id:net-3')),
+    ]
+
+    print('{} records'.format(count))
+    for name, legacy, compiled in cases:
+        legacy_time, legacy_result = timed(legacy)
+        compiled_time, compiled_result = timed(compiled)
+        assert legacy_result == compiled_result
+        print('{:24} legacy {:7.2f} ms  compiled {:7.2f} ms  ({:.2f}x)'.format(
+            name, legacy_time * 1e3, compiled_time * 1e3, legacy_time / compiled_time))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
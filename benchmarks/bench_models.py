@@ -0,0 +1,58 @@
+"""
+Benchmark the memory held by an inventory of instances kept as the dicts of the api against the same
+inventory kept as Instance models (__slots__, interned strings, lazy nested fields).
+
+Run with: python benchmarks/bench_models.py [records]
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+from civo.models import Instance
+
+
+def payload(count: int) -> bytes:
+    records = [{
+        'id': '{:08x}-9b57-4bb3-9ab4-17334e3e0249'.format(i), 'hostname': 'web-{}.example.com'.format(i),
+        'reverse_dns': None, 'size': 'g3.small', 'region': 'lon1', 'network_id': '28244c42-b1da-4b44-bd3a-0d6f5c7a8d15',
+        'private_ip': '10.0.{}.{}'.format(i // 256 % 256, i % 256), 'public_ip': '74.220.{}.{}'.format(i // 256 % 256,
+                                                                                                i % 256),
+        'template_id': '811a8dfb-8202-49ad-b1ef-1e6320b20497', 'initial_user': 'civo', 'ssh_key': None,
+        'status': 'ACTIVE' if i % 10 else 'SHUTOFF', 'firewall_id': '5f0ba9ed-5ca7-4e14-9a09-449a84196d64',
+        'tags': ['web', 'prod'], 'cpu_cores': 1, 'ram_mb': 2048, 'disk_gb': 25,
+        'created_at': '2021-02-27T02:46:57.563+00:00', 'notes': '', 'script': '#!/bin/sh\necho "hello"\n',
+        'civostatsd_stats': '', 'civostatsd_stats_per_minute': [], 'civostatsd_stats_per_hour': [],
+    } for i in range(count)]
+    # decoded from the wire like the api responses, so the values are not shared by the generator
+    return json.dumps({'items': records}).encode()
+
+
+def measure(build, raw: bytes):
+    # timed without tracemalloc, which slows every allocation down
+    start = time.perf_counter()
+    build(json.loads(raw)['items'])
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    held = build(json.loads(raw)['items'])
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held, size, elapsed
+
+
+def main(count: int = 50000):
+    raw = payload(count)
+
+    dicts, dict_size, dict_time = measure(lambda items: items, raw)
+    del dicts
+    models, model_size, model_time = measure(lambda items: [Instance(item) for item in items], raw)
+
+    print('dicts  {:10.1f} MiB  {:6.0f} bytes/record  {:6.1f} ms'.format(
+        dict_size / 2 ** 20, dict_size / count, dict_time * 1000))
+    print('models {:10.1f} MiB  {:6.0f} bytes/record  {:6.1f} ms  ({:.1f}x smaller)'.format(
+        model_size / 2 ** 20, model_size / count, model_time * 1000, dict_size / model_size))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
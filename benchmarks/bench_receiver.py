@@ -0,0 +1,50 @@
+"""
+Benchmark the events per second taken by the webhook receiver, signed events are posted by several senders on
+keep-alive connections and counted once the handler has received them.
+
+Run with: python benchmarks/bench_receiver.py [events] [senders]
+"""
+import http.client
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from civo.receiver import WebhookReceiver, deliver, synthetic_event
+
+
+def main(count: int = 20000, senders: int = 8):
+    received = []
+    done = threading.Event()
+
+    def handler(events):
+        received.append(len(events))
+        if sum(received) >= count:
+            done.set()
+
+    receiver = WebhookReceiver('secret', queue_size=count)
+    receiver.on('*', handler)
+    parts = urlsplit(receiver.url)
+    event = synthetic_event('instance.created', instance_id='b8ba0c9c-a36b-4a25-9a73-e27f4c6bd5e6')
+
+    def send(share: int):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port)
+        for _ in range(share):
+            while deliver(receiver.url, 'secret', event, connection=connection) == 503:
+                time.sleep(0.01)
+        connection.close()
+
+    with receiver:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=senders) as executor:
+            list(executor.map(send, [count // senders] * senders))
+        done.wait(60)
+        elapsed = time.perf_counter() - start
+
+    print('{} events in {:.2f} s, {:.0f} events/s, {} batches'.format(
+        sum(received), elapsed, sum(received) / elapsed, len(received)))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
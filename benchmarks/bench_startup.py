@@ -0,0 +1,82 @@
+"""
+Benchmark the cold start of a short-lived process: `import civo`, the first Civo() and the first call of one
+resource, each measured in a fresh interpreter. The run fails with exit status 1 when the best of the runs is
+over its budget, or when the process imported the modules of resources it never used.
+
+Run with: python benchmarks/bench_startup.py [--runs 10] [--import-budget 10] [--init-budget 250]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import civo
+imported = time.perf_counter()
+client = civo.Civo('token', region='lon1')
+built = time.perf_counter()
+client.networks
+used = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'init_ms': (built - imported) * 1000,
+    'first_resource_ms': (used - built) * 1000,
+    'modules': sorted(name for name in sys.modules if name.startswith('civo.')),
+    'asyncio': 'asyncio' in sys.modules,
+}))
+'''
+
+# the only resource module the probe is allowed to import
+_USED = {'civo.networks'}
+
+_RESOURCE_MODULES = {'civo.charges', 'civo.diskimage', 'civo.dns', 'civo.firewall', 'civo.intances',
+                     'civo.kubernetes', 'civo.loadbalance', 'civo.multiregion', 'civo.networks', 'civo.quota',
+                     'civo.regions', 'civo.size', 'civo.snapshots', 'civo.ssh', 'civo.volumes', 'civo.webhook'}
+
+
+def probe() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    return json.loads(subprocess.check_output([sys.executable, '-c', _PROBE], env=env))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Cold start benchmark of the civo library')
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters started')
+    parser.add_argument('--import-budget', type=float, default=10, help='milliseconds allowed for import civo')
+    parser.add_argument('--init-budget', type=float, default=250, help='milliseconds allowed for the first Civo()')
+    args = parser.parse_args(argv)
+
+    runs = [probe() for _ in range(args.runs)]
+    best = {metric: min(run[metric] for run in runs) for metric in ('import_ms', 'init_ms', 'first_resource_ms')}
+
+    for metric, value in best.items():
+        print('{:20} {:8.2f} ms'.format(metric, value))
+
+    failures = []
+    if best['import_ms'] > args.import_budget:
+        failures.append('import civo took {:.2f} ms, budget {} ms'.format(best['import_ms'], args.import_budget))
+    if best['init_ms'] > args.init_budget:
+        failures.append('Civo() took {:.2f} ms, budget {} ms'.format(best['init_ms'], args.init_budget))
+
+    unused = (set(runs[0]['modules']) & _RESOURCE_MODULES) - _USED
+    if unused:
+        failures.append('unused resource modules imported: {}'.format(', '.join(sorted(unused))))
+    if runs[0]['asyncio']:
+        failures.append('asyncio imported by a blocking client')
+
+    if failures:
+        print('\nSTARTUP OVER BUDGET:', file=sys.stderr)
+        for failure in failures:
+            print('  ' + failure, file=sys.stderr)
+        return 1
+
+    print('\nstartup within budget')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Benchmark the cost of a new connection per call (module level requests.get) against
+the pooled keep-alive Transport used by the Civo client.
+
+Run with: python benchmarks/bench_transport.py [calls]
+"""
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from civo.transport import Transport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'[{"id": "1", "name": "g3.small"}]'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main(calls: int = 500):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://127.0.0.1:{}/v2/sizes'.format(server.server_address[1])
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        requests.get(url).json()
+    unpooled = time.perf_counter() - start
+
+    transport = Transport()
+    transport.warm_up(url)
+    start = time.perf_counter()
+    for _ in range(calls):
+        transport.get(url)
+    pooled = time.perf_counter() - start
+
+    server.shutdown()
+    print('requests.get  {:8.1f} us/call'.format(unpooled / calls * 1e6))
+    print('Transport.get {:8.1f} us/call  ({:.1f}x)'.format(pooled / calls * 1e6, unpooled / pooled))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,219 @@
+"""
+Benchmark the client-side overhead of the wrapper: Civo construction, url formatting and payload building in
+the resource methods, json decoding and filter_list. Every call is answered in-process by a replay Cassette, so
+nothing but the library is measured, for single calls, listings of 10k and 100k records and concurrent calls.
+
+Each case reports the best time per call over a few rounds and the peak memory allocated by one call
+(tracemalloc). The results are compared with benchmarks/baseline.json and a case slower or allocating more
+than the tolerance above its baseline fails the run with exit status 1. The allocations are deterministic and
+are the strict gate. The timings are first scaled by a calibration loop timed in the same run, so a machine
+that is slower or busier as a whole does not flag every case, and the remaining noise is covered by a wide
+timing tolerance.
+
+Run with: python benchmarks/suite.py [--save] [--tolerance 1.0] [--memory-tolerance 0.1] [--only name ...]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# run as a script, the package is imported from the checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from civo import Civo  # noqa: E402
+from civo.cassette import Cassette  # noqa: E402
+from civo.utils import run_bulk  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def _records(count: int) -> list:
+    return [{'id': str(i), 'hostname': 'web-{}'.format(i), 'status': 'ACTIVE' if i % 3 else 'SHUTOFF',
+             'size': 'g3.small', 'region': 'lon1', 'tags': ['web', 'prod'], 'cpu_cores': 1 + i % 4}
+            for i in range(count)]
+
+
+def _client(cassette: Cassette) -> Civo:
+    # cache disabled, a cached catalog would not exercise the transport
+    return Civo('token', region='lon1', cache=False, max_retries=0, cassette=cassette)
+
+
+def civo_init():
+    cassette = Cassette()
+    return lambda: _client(cassette), 200
+
+
+def networks_search():
+    cassette = Cassette()
+    cassette.add('GET', '/v2/networks', [{'id': '1', 'label': 'Default', 'default': True}])
+    civo = _client(cassette)
+    return civo.networks.search, 2000
+
+
+def dns_update():
+    cassette = Cassette()
+    cassette.add('PUT', '/v2/dns/domain-id', {'result': 'success'})
+    civo = _client(cassette)
+    return lambda: civo.dns.update('domain-id', name='example.com'), 2000
+
+
+def loadbalance_create():
+    cassette = Cassette()
+    cassette.add('POST', '/v2/loadbalancers', {'id': 'lb', 'result': 'success'})
+    civo = _client(cassette)
+    backends = [{'instance_id': str(i), 'protocol': 'http', 'port': 80} for i in range(50)]
+    return lambda: civo.loadbalance.create(backends, hostname='www.example.com'), 500
+
+
+def _listing(count: int, filter: str = None, stream: bool = False):
+    cassette = Cassette()
+    cassette.add('GET', '/v2/instances', {'page': 1, 'per_page': count, 'pages': 1, 'items': _records(count)})
+    civo = _client(cassette)
+    if stream:
+        return lambda: sum(1 for _ in civo.instances.search(filter=filter, stream=True))
+    return lambda: civo.instances.search(filter=filter)
+
+
+def instances_list_10k():
+    return _listing(10000), 20
+
+
+def instances_list_100k():
+    return _listing(100000), 3
+
+
+def instances_filter_100k():
+    return _listing(100000, 'status:ACTIVE'), 3
+
+
+def instances_stream_100k():
+    return _listing(100000, stream=True), 3
+
+
+def instances_stream_filter_100k():
+    return _listing(100000, 'status:ACTIVE', stream=True), 3
+
+
+def concurrent_search():
+    cassette = Cassette(latency=0.001)
+    cassette.add('GET', '/v2/instances', {'page': 1, 'per_page': 20, 'pages': 1, 'items': _records(20)})
+    civo = _client(cassette)
+    return lambda: run_bulk(lambda _: civo.instances.search(), range(200), concurrency=10), 5
+
+
+CASES = [civo_init, networks_search, dns_update, loadbalance_create, instances_list_10k,
+         instances_list_100k, instances_filter_100k, instances_stream_100k, instances_stream_filter_100k,
+         concurrent_search]
+
+
+def calibration():
+    # pure python work close to the library's own (json decoding and a pass over the records), no civo code
+    payload = json.dumps(_records(5000))
+    return lambda: [record for record in json.loads(payload) if record['status'] == 'ACTIVE'], 5
+
+
+def measure(case, rounds: int = 5) -> dict:
+    function, number = case()
+    function()
+
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    function()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    return {'us_per_call': round(best * 1e6, 1), 'peak_kb': round(peak / 1024, 1)}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance: float, scale: float = 1.0) -> list:
+    """
+    Function to list the cases over their baseline
+    :param scale: calibration time of the baseline divided by the one of this run, applied to the timings
+    """
+    regressions = []
+
+    for name, result in results.items():
+        for metric, value in result.items():
+            reference = baseline.get(name, {}).get(metric)
+            if metric == 'peak_kb':
+                allowed = memory_tolerance
+            else:
+                allowed = tolerance
+                value = round(value * scale, 1)
+            if reference and value > reference * (1 + allowed):
+                regressions.append('{} {} {} > baseline {} (+{:.0%})'.format(
+                    name, metric, value, reference, value / reference - 1))
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Client-side overhead benchmarks of the civo library')
+    parser.add_argument('--save', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help='allowed slowdown over the baseline, after the calibration scaling')
+    parser.add_argument('--memory-tolerance', type=float, default=0.1,
+                        help='allowed growth of the allocations over the baseline')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file')
+    parser.add_argument('--only', nargs='*', help='names of the cases to run')
+    args = parser.parse_args(argv)
+
+    calibrated = measure(calibration)['us_per_call']
+    print('{:28} {:12.1f} us/call'.format('calibration', calibrated))
+
+    results = {}
+    for case in CASES:
+        if args.only and case.__name__ not in args.only:
+            continue
+        results[case.__name__] = measure(case)
+        print('{:28} {:12.1f} us/call {:12.1f} KiB peak'.format(
+            case.__name__, results[case.__name__]['us_per_call'], results[case.__name__]['peak_kb']))
+
+    if args.save:
+        # the cases left out with --only keep their previous baseline
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as fd:
+                saved = json.load(fd)['results']
+        saved.update(results)
+
+        with open(args.baseline, 'w') as fd:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'calibration_us': calibrated, 'results': saved}, fd, indent=2, sort_keys=True)
+            fd.write('\n')
+        print('baseline written to {}'.format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('no baseline at {}, run with --save first'.format(args.baseline))
+        return 0
+
+    with open(args.baseline) as fd:
+        baseline = json.load(fd)
+
+    # an older baseline without calibration is compared as is
+    scale = baseline['calibration_us'] / calibrated if baseline.get('calibration_us') else 1.0
+    regressions = compare(results, baseline['results'], args.tolerance, args.memory_tolerance, scale)
+
+    if regressions:
+        print('\nPERFORMANCE REGRESSION over the baseline:', file=sys.stderr)
+        for regression in regressions:
+            print('  ' + regression, file=sys.stderr)
+        return 1
+
+    print('\nno regression over the baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
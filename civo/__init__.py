@@ -2,4 +2,13 @@ from .civo import Civo
 
 __version__ = '1.0.7'
 __author__ = 'Alejandro JNM <alejandrojnm@gmail.com>'
-__all__ = []
\ No newline at end of file
+__all__ = []
+
+
+def __getattr__(name):
+    # the async client pulls asyncio in, it is only imported by the processes that use it
+    if name == 'AsyncCivo':
+        from .aio import AsyncCivo
+        return AsyncCivo
+
+    raise AttributeError("module 'civo' has no attribute '{}'".format(name))
@@ -0,0 +1,267 @@
+"""
+File to check the creates against the quota of the account before they are sent
+"""
+import threading
+import time
+from collections import Counter
+
+from .exceptions import CIVOAPIError, QuotaExceededError
+
+# quotas followed locally, each one is read from the <name>_limit and <name>_usage fields of Quota.get
+RESOURCES = ('instance_count', 'cpu_core', 'ram_mb', 'disk_gb', 'public_ip_address', 'disk_volume_count')
+
+
+class Reservation:
+    """
+    Share of the quota taken by one create. It is committed once the create is sent, so the usage counts until
+    the next resync brings it from the api, or released when the create failed.
+    """
+
+    def __init__(self, controller, demand: Counter):
+        self.controller = controller
+        self.demand = demand
+        self.state = 'reserved'
+
+    def commit(self):
+        self.controller._settle(self, 'committed')
+
+    def release(self):
+        self.controller._settle(self, 'released')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.state != 'reserved':
+            return
+
+        if exc_type is None:
+            self.commit()
+        else:
+            self.release()
+
+
+class AdmissionController:
+    """
+    Local account of the quota: the limits and usage are loaded once from Quota.get, and each create reserves
+    the instances, cpu cores, ram, disk, public ips and volumes it needs, derived from Size.search, before any
+    call to the api. A create that does not fit is refused with QuotaExceededError, or waits for the
+    reservations in flight to be released, so a large batch stops before its first call instead of failing
+    halfway. The quota is loaded again every resync seconds to pick up the changes made outside the process.
+    """
+
+    def __init__(self, client, resync: float = 300, wait: bool = False, timeout: float = None):
+        """
+        Init for AdmissionController class
+        :param client: the Civo client used for the quota, the sizes and the creates
+        :param resync: seconds before the quota is loaded again (optional, default 300)
+        :param wait: a create that does not fit waits for quota to be released instead of failing (optional)
+        :param timeout: seconds a create waits at most, then QuotaExceededError is raised (optional, default no limit)
+        """
+        self.client = client
+        self.resync = resync
+        self.wait = wait
+        self.timeout = timeout
+        self.limits = {}
+        self.usage = Counter()
+        self.reserved = Counter()
+        self.committed = Counter()
+        self._sizes = {}
+        self._loaded = None
+        self._condition = threading.Condition()
+
+    def refresh(self):
+        """
+        Function to load the quota and the sizes from the api, the committed creates are then part of the usage
+        """
+        quota = self.client.quota.get()
+        sizes = self.client.size.search()
+
+        # an error of the api is answered as a json object in place of the data
+        if not isinstance(quota, dict) or 'reason' in quota:
+            raise CIVOAPIError('Loading the quota failed: {}'.format(quota), body=quota)
+
+        with self._condition:
+            self.limits = {name: quota[name + '_limit'] for name in RESOURCES
+                           if quota.get(name + '_limit') is not None}
+            self.usage = Counter({name: quota.get(name + '_usage') or 0 for name in self.limits})
+            self.committed = Counter()
+            if isinstance(sizes, list):
+                # a size can be given by its name or its id, like in Instances.create
+                self._sizes = {key: size for size in sizes for key in (size.get('id'), size.get('name')) if key}
+            self._loaded = time.monotonic()
+            self._condition.notify_all()
+
+    def _ensure_loaded(self):
+        if self._loaded is None or time.monotonic() - self._loaded >= self.resync:
+            self.refresh()
+
+    def _size(self, name: str) -> dict:
+        self._ensure_loaded()
+
+        size = self._sizes.get(name)
+        if size is None:
+            raise ValueError('Unknown size {}'.format(name))
+        return size
+
+    def instance_demand(self, size: str, count: int = 1, public_ip: str = 'create') -> Counter:
+        """
+        Function to get the quota taken by instances
+        :param size: name or id of the size, e.g. 'g3.small'
+        :param count: number of instances (optional, default 1)
+        :param public_ip: 'create' or 'true' takes a new public ip for each instance (optional, default 'create')
+        :return: Counter of the resources
+        """
+        spec = self._size(size)
+        demand = Counter({'instance_count': count, 'cpu_core': spec.get('cpu_cores', 0) * count,
+                          'ram_mb': spec.get('ram_mb', 0) * count, 'disk_gb': spec.get('disk_gb', 0) * count})
+        if str(public_ip).lower() in ('create', 'true'):
+            demand['public_ip_address'] = count
+        return demand
+
+    def volume_demand(self, size_gb) -> Counter:
+        """
+        Function to get the quota taken by a volume
+        :param size_gb: size of the volume in gigabytes
+        :return: Counter of the resources
+        """
+        return Counter({'disk_volume_count': 1, 'disk_gb': int(size_gb)})
+
+    def cluster_demand(self, num_nodes: int = 3, nodes_size: str = 'g3.small') -> Counter:
+        """
+        Function to get the quota taken by the nodes of a kubernetes cluster
+        :param num_nodes: number of nodes
+        :param nodes_size: name of the size of the nodes
+        :return: Counter of the resources
+        """
+        return self.instance_demand(nodes_size, count=num_nodes, public_ip='none')
+
+    def available(self) -> dict:
+        """
+        Function to get the quota left for new creates
+        :return: dict of resource: units left
+        """
+        self._ensure_loaded()
+
+        with self._condition:
+            return {name: limit - self.usage[name] - self.committed[name] - self.reserved[name]
+                    for name, limit in self.limits.items()}
+
+    def _exceeded(self, demand: Counter) -> dict:
+        exceeded = {}
+
+        for name, needed in demand.items():
+            if name in self.limits and needed:
+                left = self.limits[name] - self.usage[name] - self.committed[name] - self.reserved[name]
+                if needed > left:
+                    exceeded[name] = (needed, left)
+
+        return exceeded
+
+    def check(self, demands: list):
+        """
+        Function to check that a whole batch of creates fits in the quota, nothing is reserved
+        :param demands: Counters of instance_demand, volume_demand or cluster_demand
+        :raise QuotaExceededError: when the batch does not fit
+        """
+        self._ensure_loaded()
+        total = sum(demands, Counter())
+
+        with self._condition:
+            exceeded = self._exceeded(total)
+
+        if exceeded:
+            raise QuotaExceededError(_message(exceeded), exceeded)
+
+    def reserve(self, demand: Counter) -> Reservation:
+        """
+        Function to take a share of the quota before a create, use it as a context manager around the call
+        :param demand: Counter of instance_demand, volume_demand or cluster_demand
+        :return: Reservation
+        :raise QuotaExceededError: when the demand does not fit, after waiting when wait is set
+        """
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+
+        while True:
+            # the usage is loaded again while waiting, a resource deleted meanwhile gives its quota back
+            self._ensure_loaded()
+
+            with self._condition:
+                exceeded = self._exceeded(demand)
+                if not exceeded:
+                    self.reserved.update(demand)
+                    return Reservation(self, demand)
+
+                # only the reservations in flight can be released before the next resync, a demand over what
+                # is left without them would never fit
+                now = time.monotonic()
+                remaining = deadline - now if deadline is not None else None
+                if not self.wait or (remaining is not None and remaining <= 0) or \
+                        any(demand[name] > self.limits[name] - self.usage[name] - self.committed[name]
+                            for name in exceeded):
+                    raise QuotaExceededError(_message(exceeded), exceeded)
+
+                resync = max(self._loaded + self.resync - now, 0)
+                self._condition.wait(min(remaining, resync) if remaining is not None else resync)
+
+    def _settle(self, reservation: Reservation, state: str):
+        with self._condition:
+            if reservation.state != 'reserved':
+                return
+
+            self.reserved.subtract(reservation.demand)
+            if state == 'committed':
+                self.committed.update(reservation.demand)
+            reservation.state = state
+            self._condition.notify_all()
+
+    def _admit(self, demand: Counter, function, *args, **kwargs):
+        reservation = self.reserve(demand)
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException:
+            reservation.release()
+            raise
+
+        # an error of the api is answered as a json object, nothing was created
+        if isinstance(result, dict) and 'reason' in result:
+            reservation.release()
+        else:
+            reservation.commit()
+        return result
+
+    def create_instance(self, hostname: str, size: str, template_id: str, count: int = 1,
+                        public_ip: str = 'create', **kwargs) -> dict:
+        """
+        Function to create instances once their quota is reserved, the arguments are the ones of Instances.create
+        :return: object json
+        :raise QuotaExceededError: when the instances do not fit in the quota, no call is sent
+        """
+        return self._admit(self.instance_demand(size, count, public_ip), self.client.instances.create,
+                           hostname=hostname, size=size, template_id=template_id, count=count, public_ip=public_ip,
+                           **kwargs)
+
+    def create_volume(self, name: str, size_gb: str, bootable: str = 'false') -> dict:
+        """
+        Function to create a volume once its quota is reserved, the arguments are the ones of Volumes.create
+        :return: object json
+        :raise QuotaExceededError: when the volume does not fit in the quota, no call is sent
+        """
+        return self._admit(self.volume_demand(size_gb), self.client.volumes.create, name=name, size_gb=size_gb,
+                           bootable=bootable)
+
+    def create_cluster(self, name: str, num_nodes: int = 3, nodes_size: str = 'g3.small', **kwargs) -> dict:
+        """
+        Function to create a kubernetes cluster once the quota of its nodes is reserved, the arguments are the
+        ones of Kubernetes.create
+        :return: object json
+        :raise QuotaExceededError: when the nodes do not fit in the quota, no call is sent
+        """
+        return self._admit(self.cluster_demand(num_nodes, nodes_size), self.client.kubernetes.create, name=name,
+                           num_nodes=num_nodes, nodes_size=nodes_size, **kwargs)
+
+
+def _message(exceeded: dict) -> str:
+    return 'Quota exceeded: {}'.format(', '.join('{} needs {} but {} left'.format(name, needed, left)
+                                                  for name, (needed, left) in sorted(exceeded.items())))
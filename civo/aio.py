@@ -0,0 +1,434 @@
+"""
+Asyncio client for the civo api, every resource method keeps the name and arguments of the
+blocking client but returns a coroutine
+"""
+import asyncio
+import inspect
+import os
+
+from .cache import TTLCache
+from .cassette import Cassette
+from .charges import Charges, ChargesReport, _check
+from .civo import _Resource
+from .conditional import ConditionalStore
+from .diskimage import DiskImages
+from .dns import Dns, _phases as _dns_phases, _summary
+from .firewall import Firewall, _phases as _firewall_phases, _plan, _reconciled
+from .instrumentation import traced
+from .intances import Instances
+from .kubernetes import Kubernetes
+from .loadbalance import LoadBalance, _answer, _flushed
+from .multiregion import MultiRegion, RegionResult, _codes, _merge, _tag
+from .networks import Networks
+from .quota import Quota
+from .regions import Regions
+from .resolver import AsyncResolver
+from .scheduler import RetryPolicy
+from .size import Size
+from .snapshots import Snapshots
+from .ssh import Ssh
+from .transport import AsyncTransport
+from .utils import BulkResult, filter_list, page_items
+from .volumes import Volumes
+from .waiter import AsyncWaiter
+from .webhook import WebHook
+
+
+async def _iterate_pages(fetch_page, filter_by: str = None):
+    """
+    Async counterpart of utils.iterate_pages, the next page is requested as a task while the
+    current one is consumed
+    :param fetch_page: callable that receives the page number and returns a coroutine of the decoded page
+    :param filter_by: The key:value pair to filter each page by (optional)
+    :return: async generator of items
+    """
+    page = 1
+    task = asyncio.ensure_future(fetch_page(page))
+
+    try:
+        while task is not None:
+            data = await task
+
+            pages = data.get('pages', page) if isinstance(data, dict) else page
+            task = asyncio.ensure_future(fetch_page(page + 1)) if page < pages else None
+
+            items = page_items(data)
+            if filter_by:
+                items = filter_list(data=items, filter_by=filter_by)
+
+            for item in items:
+                yield item
+            page += 1
+    finally:
+        if task is not None:
+            task.cancel()
+
+
+async def _collect(items) -> list:
+    return [item async for item in items]
+
+
+async def _run_bulk(function, items: list, concurrency: int = 100, progress=None) -> list:
+    """
+    Async counterpart of utils.run_bulk, a semaphore bounds the number of coroutines in flight
+    :param function: coroutine function that receives one item
+    :param items: the items to process
+    :param concurrency: maximum number of items processed at the same time (optional, default 100)
+    :param progress: callable receiving (done, total, BulkResult) as each item finishes (optional)
+    :return: list of BulkResult in the same order as items
+    """
+    items = list(items)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    done = 0
+
+    async def _run(item):
+        nonlocal done
+        async with semaphore:
+            try:
+                result = BulkResult(item, await function(item), None)
+            except Exception as error:
+                result = BulkResult(item, None, error)
+
+        done += 1
+        if progress:
+            progress(done, len(items), result)
+        return result
+
+    return list(await asyncio.gather(*[_run(item) for item in items]))
+
+
+@traced
+class AsyncCharges(Charges):
+
+    async def get(self, date_from: str = None, date_to: str = None, stream: bool = False) -> list:
+        result = super().get(date_from=date_from, date_to=date_to, stream=stream)
+
+        # an invalid range is answered locally without a request
+        if inspect.isawaitable(result):
+            result = await result
+
+        return result
+
+    async def _get_window(self, window: tuple) -> list:
+        key = self._cache_key(window)
+
+        if key is not None:
+            found, charges = self.transport.cache.get(key)
+            if found:
+                return charges
+
+        charges = _check(await self.transport.get(self.url, params=window[0]))
+
+        if key is not None:
+            self.transport.cache.set(key, charges)
+
+        return charges
+
+    async def report(self, date_from: str, date_to: str = None, window_days: int = 7,
+                     concurrency: int = None) -> dict:
+        windows = self._windows(date_from, date_to, window_days)
+        concurrency = concurrency if concurrency else (self.transport.limit or 100)
+        report = ChargesReport(date_from, date_to)
+
+        def _add(done, total, result):
+            if result.error is None:
+                report.add(result.result)
+
+        for result in await _run_bulk(self._get_window, windows, concurrency=concurrency, progress=_add):
+            if result.error is not None:
+                raise result.error
+
+        return report.to_dict()
+
+
+@traced
+class AsyncDiskImages(DiskImages):
+    pass
+
+
+@traced
+class AsyncDns(Dns):
+
+    async def sync(self, id: str, records: list = None, zone: str = None, origin: str = None, delete: bool = True,
+                   concurrency: int = 10, dry_run: bool = False) -> dict:
+        changes = self._changes(await self.lists_record(id), records, zone, origin, delete)
+        results = []
+
+        if not dry_run:
+            for phase in _dns_phases(changes):
+                results.extend(await _run_bulk(lambda change: self._apply(id, change), phase,
+                                               concurrency=concurrency))
+
+        return _summary(changes, results)
+
+
+@traced
+class AsyncFirewall(Firewall):
+
+    async def reconcile(self, desired: dict, delete: bool = True, concurrency: int = 10,
+                        dry_run: bool = False) -> dict:
+        listed = await _run_bulk(self.lists_rule, list(desired), concurrency=concurrency)
+        plans, changes = _plan(listed, desired, delete)
+        results = []
+
+        if not dry_run:
+            for phase in _firewall_phases(changes):
+                results.extend(await _run_bulk(self._apply, phase, concurrency=concurrency))
+
+        return _reconciled(plans, results)
+
+
+@traced
+class AsyncInstances(Instances):
+
+    def wait(self, ids: list, state: str = 'ACTIVE', timeout: float = 600, callback=None) -> dict:
+        if self._waiter is None:
+            self._waiter = AsyncWaiter(fetch_page=lambda page: self.search(page=page, per_page=100))
+
+        return self._waiter.wait(ids, state=state, timeout=timeout, callback=callback)
+
+    async def create(self, hostname: str, size: str, template_id: str, reverse_dns: str = None, region: str = None,
+                     public_ip: str = 'create', move_ip_from: str = None, count: int = 1, network_id: str = None,
+                     snapshot_id: str = None, initial_user: str = None, ssh_key_id: str = None, script: str = None,
+                     tags: str = None) -> dict:
+        lookup_region = region if region else self.region
+        size = await self.resolver.resolve('sizes', size)
+
+        if network_id:
+            network_id = await self.resolver.resolve('networks', network_id, lookup_region)
+
+        if ssh_key_id:
+            ssh_key_id = await self.resolver.resolve('sshkeys', ssh_key_id)
+
+        payload = self._create_payload(hostname=hostname, size=size, template_id=template_id, reverse_dns=reverse_dns,
+                                       region=region, public_ip=public_ip, move_ip_from=move_ip_from, count=count,
+                                       network_id=network_id, snapshot_id=snapshot_id, initial_user=initial_user,
+                                       ssh_key_id=ssh_key_id, script=script, tags=tags)
+
+        return await self.transport.post(self.url, params=payload)
+
+    async def bulk(self, action: str, ids: list, concurrency: int = None, progress=None, **kwargs) -> list:
+        if action not in self.BULK_ACTIONS:
+            raise ValueError('Invalid bulk action {}, use one of {}'.format(action, ', '.join(self.BULK_ACTIONS)))
+
+        function = getattr(self, action)
+        concurrency = concurrency if concurrency else (self.transport.limit or 100)
+
+        return await _run_bulk(lambda id: function(id, **kwargs), ids, concurrency=concurrency, progress=progress)
+
+    async def firewall(self, id: str, firewall_id: str = None) -> dict:
+        payload = {}
+
+        if firewall_id:
+            payload['firewall_id'] = await self.resolver.resolve('firewalls', firewall_id, self.region)
+
+        return await self.transport.put(self.get_url('/{}/firewall'.format(id)), params=payload)
+
+    def iter_all(self, tags: str = None, per_page: int = 100, filter: str = None):
+        return _iterate_pages(lambda page: self.search(tags=tags, page=page, per_page=per_page), filter_by=filter)
+
+
+@traced
+class AsyncKubernetes(Kubernetes):
+
+    async def create(self, name: str, num_nodes: int = 3, nodes_size: str = 'g3.small', kubernetes_version: str = None,
+                     tags: str = None, network: str = None, region: str = None) -> dict:
+        payload = self._create_payload(name, num_nodes, nodes_size, kubernetes_version, tags)
+
+        payload['network_id'] = await self.resolver.resolve('networks', network, region if region else self.region)
+
+        return await self.transport.post(self.get_url(region=region), params=payload)
+
+    def iter_all(self, per_page: int = 100, filter: str = None, region: str = None):
+        url = self.get_url(region=region)
+
+        return _iterate_pages(lambda page: self.transport.get(url, params={'page': page, 'per_page': per_page}),
+                              filter_by=filter)
+
+    def wait(self, ids: list, state: str = 'ACTIVE', timeout: float = 600, callback=None) -> dict:
+        if self._waiter is None:
+            url = self.get_url()
+            self._waiter = AsyncWaiter(fetch_page=lambda page: self.transport.get(url, params={'page': page,
+                                                                                               'per_page': 100}))
+
+        return self._waiter.wait(ids, state=state, timeout=timeout, callback=callback)
+
+
+@traced
+class AsyncLoadBalance(LoadBalance):
+    _lock_type = asyncio.Lock
+
+    async def refresh(self) -> dict:
+        since = self._settles
+        return self._store_views(await self.search(), since)
+
+    async def _queue(self, id: str, action: str, backends: list, flush: bool):
+        ticket = self._ticket(id, action, backends)
+        if not flush:
+            return None
+
+        await self.flush([id])
+        return _answer(ticket)
+
+    async def _flush_one(self, id: str) -> BulkResult:
+        async with self._flush_lock(id):
+            plans = self._coalesce([id])
+            results = []
+
+            for plan in self._sendable(plans):
+                try:
+                    results.append(BulkResult(plan, await self._send(plan), None))
+                except Exception as error:
+                    results.append(BulkResult(plan, None, error))
+
+            return self._settle(plans, results).get(id)
+
+    async def flush(self, ids: list = None, concurrency: int = 10) -> dict:
+        if self._missing(ids):
+            await self.refresh()
+
+        with self._lock:
+            ids = list(ids if ids is not None else self._pending)
+
+        return _flushed(await _run_bulk(self._flush_one, ids, concurrency=concurrency))
+
+
+class AsyncMultiRegion(MultiRegion):
+    RESOURCES = {
+        'instances': ('.aio', 'AsyncInstances', 'iter_all'),
+        'kubernetes': ('.aio', 'AsyncKubernetes', 'iter_all'),
+        'volumes': ('.aio', 'AsyncVolumes', 'search'),
+        'loadbalance': ('.aio', 'AsyncLoadBalance', 'search'),
+        'networks': ('.aio', 'AsyncNetworks', 'search'),
+        'firewalls': ('.aio', 'AsyncFirewall', 'search'),
+        'snapshots': ('.aio', 'AsyncSnapshots', 'search'),
+    }
+
+    async def regions(self) -> list:
+        return _codes(await self._regions.search())
+
+    async def _list(self, name: str, region: str, filter: str = None) -> list:
+        items = getattr(self.resource(name, region), self.RESOURCES[name][2])(filter=filter)
+        items = await _collect(items) if hasattr(items, '__anext__') else await items
+
+        return _tag(items, region)
+
+    async def search(self, resource: str, regions: list = None, filter: str = None,
+                     concurrency: int = None) -> RegionResult:
+        if resource not in self.RESOURCES:
+            raise ValueError('Invalid resource {}, use one of {}'.format(resource, ', '.join(self.RESOURCES)))
+
+        regions = list(regions) if regions else await self.regions()
+        concurrency = concurrency if concurrency else (self.transport.limit or 100)
+
+        return _merge(await _run_bulk(lambda region: self._list(resource, region, filter), regions,
+                                      concurrency=concurrency))
+
+
+@traced
+class AsyncNetworks(Networks):
+    pass
+
+
+@traced
+class AsyncQuota(Quota):
+    pass
+
+
+@traced
+class AsyncRegions(Regions):
+    pass
+
+
+@traced
+class AsyncSize(Size):
+    pass
+
+
+@traced
+class AsyncSnapshots(Snapshots):
+    pass
+
+
+@traced
+class AsyncSsh(Ssh):
+    pass
+
+
+@traced
+class AsyncVolumes(Volumes):
+
+    def wait(self, ids: list, state: str = 'available', timeout: float = 600, callback=None) -> dict:
+        if self._waiter is None:
+            self._waiter = AsyncWaiter(self.search)
+
+        return self._waiter.wait(ids, state=state, timeout=timeout, callback=callback)
+
+
+@traced
+class AsyncWebHook(WebHook):
+    pass
+
+
+class AsyncCivo:
+    # int all class, each one is built the first time it is used
+    ssh = _Resource('.aio', 'AsyncSsh')
+    instances = _Resource('.aio', 'AsyncInstances', region=True, resolver=True)
+    networks = _Resource('.aio', 'AsyncNetworks', region=True)
+    snapshots = _Resource('.aio', 'AsyncSnapshots', region=True)
+    volumes = _Resource('.aio', 'AsyncVolumes', region=True)
+    firewalls = _Resource('.aio', 'AsyncFirewall', region=True)
+    dns = _Resource('.aio', 'AsyncDns')
+    loadbalance = _Resource('.aio', 'AsyncLoadBalance', region=True)
+    webhook = _Resource('.aio', 'AsyncWebHook')
+    size = _Resource('.aio', 'AsyncSize')
+    regions = _Resource('.aio', 'AsyncRegions')
+    diskimage = _Resource('.aio', 'AsyncDiskImages', region=True)
+    quota = _Resource('.aio', 'AsyncQuota')
+    charges = _Resource('.aio', 'AsyncCharges')
+    kubernetes = _Resource('.aio', 'AsyncKubernetes', region=True, resolver=True)
+    multiregion = _Resource('.aio', 'AsyncMultiRegion', resolver=True)
+
+    def __init__(self, civo_token: str = None, api_url: str = None, region: str = None, limit: int = 100,
+                 limit_per_host: int = 0, cache: bool = True, cache_ttls: dict = None, cache_size: int = 128,
+                 rate_limit: float = None, burst: int = None, max_retries: int = 3, hooks: list = None,
+                 conditional: ConditionalStore = None, coalesce: bool = True, cassette: Cassette = None):
+        """
+        Init for AsyncCivo class, use it as ``async with AsyncCivo() as civo`` or call ``await civo.close()``
+        :param civo_token: str, optional the token generate by civo
+        :param limit: int, optional maximum number of simultaneous connections of the shared pool
+        :param limit_per_host: int, optional maximum number of simultaneous connections per host
+        :param cache: bool, optional keep sizes, regions, disk images and kubernetes versions/applications in memory
+        :param cache_ttls: dict, optional seconds to keep each catalog, e.g. {'sizes': 600}
+        :param cache_size: int, optional maximum number of cached responses
+        :param rate_limit: float, optional requests per second sent on average, calls over it wait their turn
+        :param burst: int, optional requests sent back to back before rate_limit applies
+        :param max_retries: int, optional retries of idempotent calls answered with 429, 502, 503 or 504
+        :param hooks: list, optional callables receiving a RequestEvent for every request, e.g. LatencyAggregator()
+        :param conditional: ConditionalStore, optional send the GET requests with the ETag/Last-Modified of the
+                            last answer, an unchanged answer is then served from the store
+        :param coalesce: bool, optional identical GET requests sent at the same time share one call to the api
+        :param cassette: Cassette, optional record the traffic to, or replay it from, a cassette
+        """
+        self.token = civo_token if civo_token else os.getenv('CIVO_TOKEN', False)
+        self.api_url = api_url if api_url else os.getenv('CIVO_API', 'https://api.civo.com')
+        self.region = region
+
+        if not self.token:
+            raise Exception('CIVO_TOKEN not found in the environment or is not declared in the class')
+
+        self.headers = {'Authorization': 'bearer {}'.format(self.token)}
+        self.cache = TTLCache(maxsize=cache_size, ttls=cache_ttls, enabled=cache)
+        self.transport = AsyncTransport(self.headers, limit=limit, limit_per_host=limit_per_host, cache=self.cache,
+                                        rate_limit=rate_limit, burst=burst, retry=RetryPolicy(max_retries=max_retries),
+                                        hooks=hooks, conditional=conditional, coalesce=coalesce, cassette=cassette)
+        self.resolver = AsyncResolver(self.transport, self.api_url)
+
+    async def close(self):
+        await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,112 @@
+"""
+File to handle the in-memory cache of the catalog endpoints
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds each catalog endpoint is kept, the data behind them changes about once a day
+DEFAULT_TTLS = {
+    'sizes': 3600,
+    'regions': 3600,
+    'disk_images': 3600,
+    'kubernetes_versions': 3600,
+    'kubernetes_applications': 3600,
+    # the charges of a closed period, they are only cached once the period is over
+    'charges': 86400,
+}
+
+
+class TTLCache:
+    """
+    Thread safe LRU cache where every entry expires after the ttl of its endpoint. The cached objects are
+    shared between callers, so they must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 128, ttls: dict = None, default_ttl: int = 300, enabled: bool = True):
+        """
+        Init for TTLCache class
+        :param maxsize: maximum number of entries, the least recently used one is evicted (optional, default 128)
+        :param ttls: seconds to keep each endpoint, merged over DEFAULT_TTLS, e.g. {'sizes': 600} (optional)
+        :param default_ttl: seconds to keep an endpoint not listed in ttls (optional, default 300)
+        :param enabled: when False every lookup is a miss and nothing is stored (optional, default True)
+        """
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_TTLS, **(ttls if ttls else {}))
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint: str, url: str, params: dict = None) -> tuple:
+        return endpoint, url, tuple(sorted(params.items())) if params else ()
+
+    def get(self, key: tuple):
+        """
+        Function to get a cached value
+        :param key: key built with TTLCache.key
+        :return: tuple (found, value)
+        """
+        if not self.enabled:
+            return False, None
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+
+            if entry is not None:
+                del self._data[key]
+
+            self.misses += 1
+            return False, None
+
+    def set(self, key: tuple, value):
+        """
+        Function to store a value, it expires after the ttl of the endpoint in key[0]
+        :param key: key built with TTLCache.key
+        :param value: the value to cache
+        """
+        if not self.enabled:
+            return
+
+        ttl = self.ttls.get(key[0], self.default_ttl)
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, endpoint: str = None):
+        """
+        Function to drop cached entries
+        :param endpoint: only drop the entries of this endpoint, e.g. 'sizes' (optional, default all)
+        """
+        with self._lock:
+            if endpoint is None:
+                self._data.clear()
+                return
+
+            for key in [key for key in self._data if key[0] == endpoint]:
+                del self._data[key]
+
+    def stats(self) -> dict:
+        """
+        Function to get the counters of the cache
+        :return: dict
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._data)}
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,227 @@
+"""
+File to record and replay the http traffic of the transport, so every resource can be tested and
+benchmarked offline
+"""
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from io import BytesIO
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import CIVOAPIError
+
+
+def _normalize(url: str) -> tuple:
+    # the host is left out so a cassette works against any api_url
+    parts = urlsplit(url)
+    return parts.path.rstrip('/'), urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+
+def _body(body) -> str:
+    if body is None:
+        return ''
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    return urlencode(sorted(parse_qsl(body, keep_blank_values=True))) if '=' in body else body
+
+
+class Cassette:
+    """
+    Request/response pairs stored as compact json lines. In replay mode the transport is served from the
+    cassette in-process, a request is matched on method, path, sorted query and body (the host is ignored),
+    and interactions added without a query match any query. Several answers for the same request are
+    replayed in order and the last one keeps being replayed.
+    """
+
+    def __init__(self, path: str = None, mode: str = 'replay', latency: float = 0.0):
+        """
+        Init for Cassette class
+        :param path: file of the cassette, loaded in replay mode and written by save in record mode (optional)
+        :param mode: 'replay' to serve the requests from the cassette or 'record' to capture real traffic
+        :param latency: seconds added to every replayed request to mimic the network (optional, default 0)
+        """
+        if mode not in ('replay', 'record'):
+            raise ValueError('Invalid cassette mode {}, use replay or record'.format(mode))
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.interactions = []
+        self._replay = defaultdict(deque)
+        self._lock = threading.Lock()
+
+        if path and mode == 'replay':
+            self.load(path)
+
+    def load(self, path: str):
+        """
+        Function to load the interactions of a cassette file
+        :param path: file of the cassette
+        """
+        with open(path, encoding='utf-8') as fd:
+            for line in fd:
+                if line.strip():
+                    self._add(json.loads(line))
+
+    def save(self, path: str = None):
+        """
+        Function to write the interactions to a cassette file
+        :param path: file of the cassette (optional, default the path of the cassette)
+        """
+        with open(path if path else self.path, 'w', encoding='utf-8') as fd:
+            for interaction in self.interactions:
+                fd.write(json.dumps(interaction, separators=(',', ':')) + '\n')
+
+    def _add(self, interaction: dict):
+        key = (interaction['method'], interaction['path'], interaction.get('query'), interaction.get('body', ''))
+
+        with self._lock:
+            self.interactions.append(interaction)
+            self._replay[key].append(interaction)
+
+    def add(self, method: str, path: str, response=None, status: int = 200, fixture: str = None,
+            query: dict = None, body: dict = None):
+        """
+        Function to add an interaction by hand, e.g. from one of the responses/ fixtures
+        :param method: http method
+        :param path: path of the endpoint, e.g. /v2/networks
+        :param response: the decoded json answered (optional)
+        :param status: http status answered (optional, default 200)
+        :param fixture: json file holding the response, used instead of response (optional)
+        :param query: query the request must have, when None any query matches (optional)
+        :param body: form body the request must have (optional)
+        """
+        if fixture:
+            with open(fixture, encoding='utf-8') as fd:
+                response = json.load(fd)
+
+        self._add({
+            'method': method.upper(),
+            'path': path.rstrip('/'),
+            'query': urlencode(sorted(query.items())) if query is not None else None,
+            'body': urlencode(sorted(body.items())) if body else '',
+            'status': status,
+            'response': response,
+        })
+
+    def find(self, method: str, url: str, body=None) -> dict:
+        path, query = _normalize(url)
+        body = _body(body)
+
+        with self._lock:
+            for key in ((method, path, query, body), (method, path, None, body), (method, path, None, '')):
+                answers = self._replay.get(key)
+                if answers:
+                    return answers.popleft() if len(answers) > 1 else answers[0]
+
+        raise CIVOAPIError('No interaction recorded for {} {}?{}'.format(method, path, query), status=599)
+
+    def record(self, request, response: Response):
+        try:
+            content = response.json()
+        except ValueError:
+            content = response.text
+
+        self.record_answer(request.method, request.url, request.body, response.status_code, response.headers,
+                           content)
+
+    def record_answer(self, method: str, url: str, body, status: int, headers, content):
+        """
+        Function to capture one interaction, used by the transports in record mode
+        :param method: http method
+        :param url: url of the request with its query
+        :param body: form body of the request
+        :param status: http status of the answer
+        :param headers: headers of the answer
+        :param content: decoded json of the answer, or its text
+        """
+        path, query = _normalize(url)
+
+        self._add({
+            'method': method,
+            'path': path,
+            'query': query,
+            'body': _body(body),
+            'status': status,
+            'headers': {k: v for k, v in headers.items() if k.lower() in ('retry-after', 'etag', 'last-modified')},
+            'response': content,
+        })
+
+
+def _encode(content) -> bytes:
+    return content.encode('utf-8') if isinstance(content, str) else json.dumps(content).encode('utf-8')
+
+
+class _ReplayedContent:
+    def __init__(self, raw: bytes):
+        self._raw = raw
+
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self._raw), size):
+            yield self._raw[start:start + size]
+
+
+class ReplayedResponse:
+    """
+    Stand-in for the aiohttp response of an interaction, used by AsyncTransport to replay a cassette
+    """
+
+    def __init__(self, status: int, headers: dict, raw: bytes):
+        self.status = status
+        self.headers = CaseInsensitiveDict(headers)
+        self.content_length = len(raw)
+        self.content = _ReplayedContent(raw)
+        self._raw = raw
+
+    async def text(self) -> str:
+        return self._raw.decode('utf-8')
+
+    def release(self):
+        pass
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    Transport adapter that answers from a cassette in replay mode, or sends through the real adapter and
+    captures the traffic in record mode
+    """
+
+    def __init__(self, cassette: Cassette, adapter: HTTPAdapter = None):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter if adapter else HTTPAdapter()
+        self._encoded = {}
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == 'record':
+            response = self.adapter.send(request, **kwargs)
+            self.cassette.record(request, response)
+            return response
+
+        if self.cassette.latency:
+            time.sleep(self.cassette.latency)
+
+        interaction = self.cassette.find(request.method, request.url, request.body)
+        raw = self._encoded.get(id(interaction))
+        if raw is None:
+            # encoded once, large replayed listings would otherwise be measured as client overhead
+            raw = _encode(interaction['response'])
+            self._encoded[id(interaction)] = raw
+
+        response = Response()
+        response.status_code = interaction['status']
+        response.headers = CaseInsensitiveDict(interaction.get('headers', {}))
+        response.raw = BytesIO(raw)
+        response._content = raw
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        self.adapter.close()
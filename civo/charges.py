@@ -1,8 +1,67 @@
-from datetime import datetime
+from collections import Counter
+from datetime import date, datetime, time, timedelta
 
-import requests
+from .cache import TTLCache
+from .exceptions import CIVOAPIError
+from .instrumentation import traced
+from .transport import Transport
+from .utils import run_bulk
 
 
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time()).astimezone()
+
+
+def _check(charges) -> list:
+    # an error of the api is answered as a json object in place of the list, it must not be cached
+    if isinstance(charges, dict):
+        raise CIVOAPIError('Charges failed: {}'.format(charges.get('reason', charges)), body=charges)
+
+    return charges
+
+
+class ChargesReport:
+    """
+    Running totals of the hours of the charges, each window is added as soon as it is received so the
+    charges of a long range are never held all at once
+    """
+
+    def __init__(self, date_from: str = None, date_to: str = None):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.hours = 0
+        self.by_type = Counter()
+        self.by_resource = Counter()
+
+    def add(self, charges: list):
+        """
+        Function to add the charges of one window to the totals
+        :param charges: list of charges of the api
+        """
+        for charge in charges:
+            hours = charge.get('num_hours') or 0
+            code = charge.get('code')
+            self.hours += hours
+            self.by_type[code] += hours
+            self.by_resource[(code, charge.get('label'))] += hours
+
+    def to_dict(self) -> dict:
+        """
+        Function to get the totals
+        :return: {'from': '2019-07-01', 'to': '2019-08-01', 'hours': 744, 'types': {'instance-g3.small': 744},
+                  'resources': [{'code': 'instance-g3.small', 'label': 'web', 'hours': 744}]}
+        """
+        return {
+            'from': self.date_from,
+            'to': self.date_to,
+            'hours': self.hours,
+            'types': dict(self.by_type),
+            'resources': [{'code': code, 'label': label, 'hours': hours}
+                          for (code, label), hours in self.by_resource.most_common()],
+        }
+
+
+@traced
 class Charges:
     """
     The system tracks usage of paid service on an hourly basis.
@@ -10,30 +69,104 @@ class Charges:
     IP address and snapshot the amount of hours it's in use for.
     """
 
-    def __init__(self, headers, api_url):
+    def __init__(self, headers, api_url, transport=None):
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{}/v2/charges'.format(api_url)
 
-    def get(self, date_from: str = None, date_to: str = None) -> list:
+    def get(self, date_from: str = None, date_to: str = None, stream: bool = False) -> list:
         """
         Function to listing charges
         :param date_from: The from date like '2019-07-01'
         :param date_to: The to date like '2019-07-30'
+        :param stream: yield the charges as they are decoded instead of building the whole list (optional)
         :return: object json
         """
         params = {}
 
         if date_from:
-            date = datetime.strptime(date_from, '%Y-%m-%d')
-            params['from'] = date.astimezone().isoformat()
+            day = datetime.strptime(date_from, '%Y-%m-%d')
+            params['from'] = day.astimezone().isoformat()
 
         if date_to:
-            date = datetime.strptime(date_to, '%Y-%m-%d')
-            params['to'] = date.astimezone().isoformat()
+            day = datetime.strptime(date_to, '%Y-%m-%d')
+            params['to'] = day.astimezone().isoformat()
     
         if (date_from and date_to and date_to<date_from):
             return {"message":"From date can not be before To date"}
 
-        r = requests.get(self.url, headers=self.headers, params=params)
-    
-        return r.json()
\ No newline at end of file
+        return self.transport.get(self.url, params=params, stream=stream)
+
+    def _windows(self, date_from: str, date_to: str = None, window_days: int = 7) -> list:
+        """
+        Split a range in windows of window_days, each one is (params, closed), a closed window is fully in the past
+        """
+        start = datetime.strptime(date_from, '%Y-%m-%d').date()
+        end = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else date.today() + timedelta(days=1)
+
+        if end < start:
+            raise ValueError('From date can not be before To date')
+
+        if window_days < 1:
+            raise ValueError('window_days must be at least 1')
+
+        now = datetime.now().astimezone()
+        windows = []
+        lower = _midnight(start)
+
+        while start < end:
+            start = min(start + timedelta(days=window_days), end)
+            upper = _midnight(start)
+            windows.append(({'from': lower.isoformat(), 'to': upper.isoformat()}, upper <= now))
+            lower = upper
+
+        return windows
+
+    def _cache_key(self, window: tuple):
+        params, closed = window
+
+        # the charges of a closed period never change, they are kept in the cache of the client
+        if not closed or self.transport.cache is None:
+            return None
+
+        return TTLCache.key('charges', self.url, params)
+
+    def _get_window(self, window: tuple) -> list:
+        key = self._cache_key(window)
+
+        if key is not None:
+            found, charges = self.transport.cache.get(key)
+            if found:
+                return charges
+
+        charges = _check(self.transport.get(self.url, params=window[0]))
+
+        if key is not None:
+            self.transport.cache.set(key, charges)
+
+        return charges
+
+    def report(self, date_from: str, date_to: str = None, window_days: int = 7, concurrency: int = None) -> dict:
+        """
+        Function to sum the hours charged in a long range, the range is split in windows fetched at the same time.
+        The windows already closed are served from the cache of the client after the first report, only the
+        window still open is requested again.
+        :param date_from: The from date like '2019-07-01'
+        :param date_to: The to date like '2019-12-31', not included (optional, default up to now)
+        :param window_days: days of each window (optional, default 7)
+        :param concurrency: maximum number of windows fetched at the same time (optional, default the pool size)
+        :return: object json, see ChargesReport.to_dict
+        """
+        windows = self._windows(date_from, date_to, window_days)
+        concurrency = concurrency if concurrency else getattr(self.transport, 'pool_maxsize', 10)
+        report = ChargesReport(date_from, date_to)
+
+        def _add(done, total, result):
+            if result.error is None:
+                report.add(result.result)
+
+        for result in run_bulk(self._get_window, windows, concurrency=concurrency, progress=_add):
+            if result.error is not None:
+                raise result.error
+
+        return report.to_dict()
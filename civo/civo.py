@@ -1,29 +1,92 @@
+import importlib
 import os
+from typing import TYPE_CHECKING
 
-from .charges import Charges
-from .dns import Dns
-from .firewall import Firewall
-from .intances import Instances
-from .kubernetes import Kubernetes
-from .loadbalance import LoadBalance
-from .networks import Networks
-from .quota import Quota
-from .regions import Regions
-from .size import Size
-from .snapshots import Snapshots
-from .ssh import Ssh
-from .diskimage import DiskImages
-from .volumes import Volumes
-from .webhook import WebHook
-from .utils import print_err
+if TYPE_CHECKING:
+    from .cassette import Cassette
+    from .conditional import ConditionalStore
+
+# "Using Default Region" is only printed by the first client of the process
+_default_region_printed = False
+
+
+class _Resource:
+    """
+    Resource of a client built on first access, so its module is only imported and the object only created
+    by the processes that use it. Once built it is stored on the client and the descriptor is not called again.
+    """
+
+    def __init__(self, module: str, name: str, region: bool = False, resolver: bool = False):
+        """
+        Init for _Resource class
+        :param module: module of the resource class relative to the civo package, e.g. '.intances'
+        :param name: name of the resource class
+        :param region: the class takes the region of the client
+        :param resolver: the class takes the resolver of the client
+        """
+        self.module = module
+        self.name = name
+        self.region = region
+        self.resolver = resolver
+
+    def __set_name__(self, owner, attr):
+        self.attr = attr
+
+    def __get__(self, client, owner=None):
+        if client is None:
+            return self
+
+        resource_class = getattr(importlib.import_module(self.module, __package__), self.name)
+        args = (client.headers, client.api_url, client.region) if self.region else (client.headers, client.api_url)
+        kwargs = {'resolver': client.resolver} if self.resolver else {}
+
+        # setdefault keeps the first object when two threads build the resource at the same time
+        return client.__dict__.setdefault(self.attr, resource_class(*args, transport=client.transport, **kwargs))
 
 
 class Civo:
+    # int all class, each one is built the first time it is used
+    ssh = _Resource('.ssh', 'Ssh')
+    instances = _Resource('.intances', 'Instances', region=True, resolver=True)
+    networks = _Resource('.networks', 'Networks', region=True)
+    snapshots = _Resource('.snapshots', 'Snapshots', region=True)
+    volumes = _Resource('.volumes', 'Volumes', region=True)
+    firewalls = _Resource('.firewall', 'Firewall', region=True)
+    dns = _Resource('.dns', 'Dns')
+    loadbalance = _Resource('.loadbalance', 'LoadBalance', region=True)
+    webhook = _Resource('.webhook', 'WebHook')
+    size = _Resource('.size', 'Size')
+    regions = _Resource('.regions', 'Regions')
+    diskimage = _Resource('.diskimage', 'DiskImages', region=True)
+    quota = _Resource('.quota', 'Quota')
+    charges = _Resource('.charges', 'Charges')
+    kubernetes = _Resource('.kubernetes', 'Kubernetes', region=True, resolver=True)
+    multiregion = _Resource('.multiregion', 'MultiRegion', resolver=True)
 
-    def __init__(self, civo_token: str = None, api_url: str = None, region: str = None):
+    def __init__(self, civo_token: str = None, api_url: str = None, region: str = None, pool_connections: int = 10,
+                 pool_maxsize: int = 10, pool_block: bool = False, warm_up: int = 0, cache: bool = True,
+                 cache_ttls: dict = None, cache_size: int = 128,
+                 rate_limit: float = None, burst: int = None, max_retries: int = 3, cassette: 'Cassette' = None,
+                 hooks: list = None, conditional: 'ConditionalStore' = None,
+                 coalesce: bool = True):
         """
         Init for Civo class
         :param civo_token: str, optional the token generate by civo
+        :param pool_connections: int, optional number of host pools kept by the shared transport
+        :param pool_maxsize: int, optional maximum number of keep-alive connections kept per host
+        :param pool_block: bool, optional block when the pool is exhausted instead of opening extra connections
+        :param warm_up: int, optional number of connections to open to the api before the first call
+        :param cache: bool, optional keep sizes, regions, disk images and kubernetes versions/applications in memory
+        :param cache_ttls: dict, optional seconds to keep each catalog, e.g. {'sizes': 600}
+        :param cache_size: int, optional maximum number of cached responses
+        :param rate_limit: float, optional requests per second sent on average, calls over it wait their turn
+        :param burst: int, optional requests sent back to back before rate_limit applies
+        :param max_retries: int, optional retries of idempotent calls answered with 429, 502, 503 or 504
+        :param cassette: Cassette, optional record the traffic to, or replay it from, a cassette
+        :param hooks: list, optional callables receiving a RequestEvent for every request, e.g. LatencyAggregator()
+        :param conditional: ConditionalStore, optional send the GET requests with the ETag/Last-Modified of the
+                            last answer, an unchanged answer is then served from the store
+        :param coalesce: bool, optional identical GET requests sent at the same time share one call to the api
         """
 
         # Get token from env or pass to the class
@@ -35,9 +98,15 @@ class Civo:
         # Get api url from env or you can pass to the class
         if not api_url:
             self.api_url = os.getenv('CIVO_API', 'https://api.civo.com')
+        else:
+            self.api_url = api_url
 
         if not region:
-            print_err('Using Default Region')
+            global _default_region_printed
+            if not _default_region_printed:
+                from .utils import print_err
+                print_err('Using Default Region')
+                _default_region_printed = True
             self.region = None
         else:
             self.region = region
@@ -48,19 +117,23 @@ class Civo:
 
         self.headers = {'Authorization': 'bearer {}'.format(self.token)}
 
-        # int all class
-        self.ssh = Ssh(self.headers, self.api_url)
-        self.instances = Instances(self.headers, self.api_url, self.region)
-        self.networks = Networks(self.headers, self.api_url, self.region)
-        self.snapshots = Snapshots(self.headers, self.api_url, self.region)
-        self.volumes = Volumes(self.headers, self.api_url, self.region)
-        self.firewalls = Firewall(self.headers, self.api_url, self.region)
-        self.dns = Dns(self.headers, self.api_url)
-        self.loadbalance = LoadBalance(self.headers, self.api_url, self.region)
-        self.webhook = WebHook(self.headers, self.api_url)
-        self.size = Size(self.headers, self.api_url)
-        self.regions = Regions(self.headers, self.api_url)
-        self.diskimage = DiskImages(self.headers, self.api_url,self.region)
-        self.quota = Quota(self.headers, self.api_url)
-        self.charges = Charges(self.headers, self.api_url)
-        self.kubernetes = Kubernetes(self.headers, self.api_url, self.region)
+        # requests is only imported once a client is created
+        from .cache import TTLCache
+        from .resolver import Resolver
+        from .scheduler import RetryPolicy
+        from .transport import Transport
+
+        # Catalog endpoints change about once a day, they are served from memory until their ttl expires
+        self.cache = TTLCache(maxsize=cache_size, ttls=cache_ttls, enabled=cache)
+
+        # One pooled transport shared by all the class, so connections are reused between calls
+        self.transport = Transport(self.headers, pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                   pool_block=pool_block, cache=self.cache, rate_limit=rate_limit, burst=burst,
+                                   retry=RetryPolicy(max_retries=max_retries), cassette=cassette,
+                                   hooks=hooks, conditional=conditional, coalesce=coalesce)
+
+        # Shared name/id indexes of networks, firewalls, ssh keys and sizes used by the create calls
+        self.resolver = Resolver(self.transport, self.api_url)
+
+        if warm_up:
+            self.transport.warm_up(self.api_url, connections=warm_up)
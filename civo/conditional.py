@@ -0,0 +1,135 @@
+"""
+File to keep the validators and the decoded bodies of the GET responses, to send conditional requests
+"""
+import threading
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlsplit
+
+# validators of a response with its decoded body, the size of the body and the time its decoding took
+Entry = namedtuple('Entry', ['etag', 'last_modified', 'value', 'size', 'decode_time'])
+
+
+class ConditionalStore:
+    """
+    Thread safe LRU store of the GET responses that carry an ETag or a Last-Modified header. The transport sends
+    their validators with If-None-Match / If-Modified-Since, and a 304 answer is served with the object already
+    decoded, so an unchanged listing is neither downloaded nor parsed again. The store is bounded by the bytes of
+    the bodies it holds. The stored objects are shared between callers, so they must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 2 ** 20, exclude: list = None):
+        """
+        Init for ConditionalStore class
+        :param max_bytes: bytes of response bodies kept, the least recently used are evicted (optional, default 32 MiB)
+        :param exclude: path prefixes never sent conditionally, e.g. ['/v2/charges'] (optional)
+        """
+        self.max_bytes = max_bytes
+        self.exclude = tuple(exclude) if exclude else ()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self.decode_time_saved = 0.0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: dict = None) -> tuple:
+        return url, tuple(sorted(params.items())) if params else ()
+
+    def enabled(self, url: str) -> bool:
+        """
+        Function to know if the requests to an url may be sent conditionally
+        :param url: absolute url of the endpoint
+        :return: bool
+        """
+        return not self.exclude or not urlsplit(url).path.startswith(self.exclude)
+
+    def headers(self, key: tuple) -> dict:
+        """
+        Function to get the conditional headers of a request
+        :param key: key built with ConditionalStore.key
+        :return: dict, empty when nothing is stored for the request
+        """
+        with self._lock:
+            entry = self._data.get(key)
+
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def hit(self, key: tuple):
+        """
+        Function to get the object of a request answered with 304 Not Modified
+        :param key: key built with ConditionalStore.key
+        :return: tuple (found, value)
+        """
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            self.bytes_saved += entry.size
+            self.decode_time_saved += entry.decode_time
+            return True, entry.value
+
+    def store(self, key: tuple, headers, value, size: int, decode_time: float):
+        """
+        Function to keep a response, only the responses with a validator are kept
+        :param key: key built with ConditionalStore.key
+        :param headers: headers of the response
+        :param value: decoded body
+        :param size: bytes of the body
+        :param decode_time: seconds taken to decode the body
+        """
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+
+            self.misses += 1
+            if not etag and not last_modified or size > self.max_bytes:
+                return
+
+            self._data[key] = Entry(etag, last_modified, value, size, decode_time)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, entry = self._data.popitem(last=False)
+                self.size -= entry.size
+                self.evictions += 1
+
+    def invalidate(self, prefix: str = None):
+        """
+        Function to drop stored responses
+        :param prefix: only drop the responses of the urls starting with it (optional, default all)
+        """
+        with self._lock:
+            for key in [key for key in self._data if prefix is None or key[0].startswith(prefix)]:
+                self.size -= self._data.pop(key).size
+
+    def stats(self) -> dict:
+        """
+        Function to get the counters of the store, bytes_saved and decode_time_saved are the body bytes not
+        downloaded and the seconds of json decoding avoided by the 304 answers
+        :return: dict
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self._data),
+                    'size': self.size, 'bytes_saved': self.bytes_saved, 'decode_time_saved': self.decode_time_saved}
+
+    def __len__(self):
+        return len(self._data)
@@ -1,16 +1,17 @@
-import requests
-
-from .utils import filter_list
+from .instrumentation import traced
+from .transport import Transport
 
 
+@traced
 class DiskImages:
     """
     Disk Images contains the contents and structure of a disk volume or of an entire data storage device on the Civo cloud platform.
     Note:Every region will have similar set of disk images. But the disk image IDs are different.
     """
 
-    def __init__(self, headers, api_url,region):
+    def __init__(self, headers, api_url, region, transport=None):
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{}/v2/disk_images'.format(api_url)
         self.region = region
 
@@ -24,9 +25,7 @@ class DiskImages:
             params = {
                 "region":self.region
             } 
-        r = requests.get(self.url, headers=self.headers,params=params)
-
-        return r.json()
+        return self.transport.get(self.url, params=params, cache='disk_images')
     
     def retrieve(self,disk_id:str)->dict:
         """
@@ -39,6 +38,5 @@ class DiskImages:
             params = {
                 "region":self.region
             } 
-        r = requests.get(self.url+"/{}".format(disk_id),headers=self.headers,params=params)
-        return r.json()
+        return self.transport.get(self.url+"/{}".format(disk_id),params=params)
 
@@ -1,8 +1,11 @@
-import requests
-
-from .utils import filter_list
+from .exceptions import CIVOAPIError
+from .instrumentation import traced
+from .transport import Transport
+from .utils import run_bulk
+from .zone import diff_records, parse_zone
 
 
+@traced
 class Dns:
     """
     We host reverse DNS for all instances automatically. If you'd like to manage forward (normal)
@@ -13,8 +16,9 @@ class Dns:
     and very competitive prices.
     """
 
-    def __init__(self, headers, api_url):
+    def __init__(self, headers, api_url, transport=None):
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{}/v2/dns'.format(api_url)
 
     def create(self, name: str) -> dict:
@@ -24,9 +28,7 @@ class Dns:
         :return: object json
         """
         payload = {'name': name}
-        r = requests.post(self.url, headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.post(self.url, params=payload)
 
     def update(self, id: str, name: str) -> dict:
         """
@@ -35,9 +37,7 @@ class Dns:
         :return: object json
         """
         payload = {'name': name}
-        r = requests.put(self.url + '/{}'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.url + '/{}'.format(id), params=payload)
 
     def search(self, filter: str = None) -> dict:
         """
@@ -46,13 +46,7 @@ class Dns:
                        you can filter by any object that is inside the json
         :return: object json
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.url, filter=filter)
 
     def delete(self, id: str) -> dict:
         """
@@ -60,9 +54,7 @@ class Dns:
         :param id: id of the domain object
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.delete(self.url + '/{}'.format(id))
 
     def create_record(self, id: str, type: str, name: str, value: str, priority: str, ttl: str = '600') -> dict:
         """
@@ -78,9 +70,7 @@ class Dns:
         :return: object json
         """
         payload = {'type': type, 'name': name, 'value': value, 'priority': priority, 'ttl': ttl}
-        r = requests.post(self.url + '{}/records'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.post(self.url + '/{}/records'.format(id), params=payload)
 
     def update_record(self, id: str, id_record: str, type: str = None, name: str = None, value: str = None,
                       priority: str = None,
@@ -115,25 +105,18 @@ class Dns:
         if ttl:
             payload['ttl'] = ttl
 
-        r = requests.put(self.url + '{}/records/{}'.format(id, id_record), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.url + '/{}/records/{}'.format(id, id_record), params=payload)
 
-    def lists_record(self, id: str, filter: str = None) -> dict:
+    def lists_record(self, id: str, filter: str = None, stream: bool = False) -> dict:
         """
         Function to list DNS records
         :param id: Firewall object id
         :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
                        you can filter by any object that is inside the json
+        :param stream: yield the records as they are decoded instead of building the whole list (optional)
         :return: object json
         """
-        r = requests.get(self.url + '{}/records'.format(id), headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.url + '/{}/records'.format(id), filter=filter, stream=stream)
 
     def delete_record(self, id: str, record_id: str) -> dict:
         """
@@ -142,6 +125,76 @@ class Dns:
         :param record_id: id of the dns record object
         :return: object json
         """
-        r = requests.delete(self.url + '/{}/records/{}'.format(id, record_id), headers=self.headers)
+        return self.transport.delete(self.url + '/{}/records/{}'.format(id, record_id))
+
+    def _changes(self, current: list, records: list = None, zone: str = None, origin: str = None,
+                 delete: bool = True) -> list:
+        """
+        Build the diff of a sync as a list of (action, record, desired) in the order they are applied
+        """
+        # an error of the api is answered as a json object in place of the list
+        if isinstance(current, dict):
+            raise CIVOAPIError('Listing the records failed: {}'.format(current.get('reason', current)), body=current)
+
+        if zone is not None:
+            records = list(records if records else []) + parse_zone(zone, origin=origin)
+
+        diff = diff_records(current, records if records else [], delete=delete)
+
+        return ([('delete', record, None) for record in diff.delete] +
+                [('update', record, desired) for record, desired in diff.update] +
+                [('create', None, record) for record in diff.create])
+
+    def _apply(self, id: str, change: tuple):
+        action, record, desired = change
+
+        if action == 'create':
+            return self.create_record(id, type=desired['type'], name=desired['name'], value=desired['value'],
+                                      priority=desired.get('priority', 10), ttl=desired.get('ttl', 600))
+
+        if action == 'update':
+            return self.update_record(id, record['id'], type=desired['type'], name=desired['name'],
+                                      value=desired['value'], priority=desired.get('priority'),
+                                      ttl=desired.get('ttl'))
+
+        return self.delete_record(id, record['id'])
+
+    def sync(self, id: str, records: list = None, zone: str = None, origin: str = None, delete: bool = True,
+             concurrency: int = 10, dry_run: bool = False) -> dict:
+        """
+        Function to make the records of a domain match a desired set, the current records are listed once and
+        only the records that changed are deleted, then updated, then created, several at the same time within
+        each step, so a replaced record is gone before its replacement is created
+        :param id: id of the domain object
+        :param records: desired records, e.g. [{'type': 'A', 'name': 'www', 'value': '10.0.0.1', 'ttl': 600}]
+        :param zone: desired records as the text of a bind zone file, added to records (optional)
+        :param origin: domain name of the zone file, e.g. 'example.com' (optional)
+        :param delete: delete the records of the domain that are not desired (optional, default True)
+        :param concurrency: maximum number of changes applied at the same time (optional, default 10)
+        :param dry_run: only compute the changes (optional, default False)
+        :return: {'create': [...], 'update': [...], 'delete': [...], 'errors': [BulkResult]}
+        """
+        changes = self._changes(self.lists_record(id), records, zone, origin, delete)
+        results = []
+
+        if not dry_run:
+            for phase in _phases(changes):
+                results.extend(run_bulk(lambda change: self._apply(id, change), phase, concurrency=concurrency))
+
+        return _summary(changes, results)
+
+
+def _phases(changes: list) -> list:
+    # the changes of one action are sent together, the next action waits for them
+    return [phase for phase in ([change for change in changes if change[0] == action]
+                                for action in ('delete', 'update', 'create')) if phase]
+
+
+def _summary(changes: list, results: list) -> dict:
+    summary = {'create': [], 'update': [], 'delete': [], 'errors': []}
+
+    for action, record, desired in changes:
+        summary[action].append(record if action == 'delete' else desired)
 
-        return r.json()
+    summary['errors'] = [result for result in results if result.error is not None]
+    return summary
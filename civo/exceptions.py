@@ -3,4 +3,16 @@
 
 
 class CIVOAPIError(RuntimeError):
-    pass
\ No newline at end of file
+
+    def __init__(self, message: str = None, status: int = None, body: str = None):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class QuotaExceededError(CIVOAPIError):
+
+    def __init__(self, message: str = None, exceeded: dict = None):
+        super().__init__(message)
+        # resource: (requested, available) of each quota the request would exceed
+        self.exceeded = exceeded if exceeded else {}
@@ -0,0 +1,392 @@
+"""
+File to compile filter expressions into reusable predicates
+
+A filter is one or more terms joined with AND, OR, NOT and parentheses, each term compares a key of
+the record (nested keys with dots, like network.id) with a value:
+
+    key:value       partial match for strings and lists, equality for numbers (the classic filter)
+    key=value       equality, key!=value for inequality
+    key~regex       regular expression search
+    key>N key>=N    numeric comparison, also < and <=
+    key in [a, b]   the value is one of the set
+    key in 2..8     numeric range, both ends included
+
+A term on a key missing from a record is False for that record, so NOT key=value matches it.
+
+A filter made of one key:value whose value holds no other operator, parenthesis or quote is read as
+before, the whole text after the colon is the value, e.g. name:R AND D searches "R AND D".
+
+Values can be quoted with " or ' when they contain spaces, parentheses or a keyword, e.g.
+    status=ACTIVE AND (size in [g3.small, g3.medium] OR NOT network.label:"private net")
+"""
+import re
+from functools import lru_cache
+
+_KEYWORDS = ('AND', 'OR', 'NOT')
+
+# value of a key missing from the record, a term on it is False for that record
+_MISSING = object()
+
+_TERM = re.compile(r'^\s*([\w\-]+(?:\.[\w\-]+)*)\s*(>=|<=|!=|=|~|>|<|:|\s+in\s+)(.*)$', re.DOTALL)
+
+# a classic filter, one key:value whose value is taken as is even with spaces or keywords in it
+_CLASSIC = re.compile(r'^\s*([\w\-]+(?:\.[\w\-]+)*):([^:=~<>()"\']+)$')
+
+_RANGE = re.compile(r'^\s*(-?[\d.]+)\s*\.\.\s*(-?[\d.]+)\s*$')
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+
+    return value
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return None
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _tokenize(expression: str) -> list:
+    """
+    Split the expression in '(', ')', keywords and raw terms, a term runs until a closing parenthesis
+    or a top level AND/OR, so unquoted values can still contain spaces
+    """
+    tokens = []
+    position = 0
+    length = len(expression)
+
+    while position < length:
+        char = expression[position]
+
+        if char.isspace():
+            position += 1
+            continue
+
+        if char in '()':
+            tokens.append(char)
+            position += 1
+            continue
+
+        word = re.match(r'(AND|OR|NOT)(?=[\s(]|$)', expression[position:])
+        if word:
+            tokens.append(word.group(1))
+            position += len(word.group(1))
+            continue
+
+        start = position
+        depth = 0
+        while position < length:
+            char = expression[position]
+
+            if char in '"\'':
+                end = expression.find(char, position + 1)
+                position = length if end == -1 else end + 1
+                continue
+
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                if not depth:
+                    break
+                depth -= 1
+            elif char.isspace() and not depth and re.match(r'\s+(AND|OR)(?=[\s(]|$)', expression[position:]):
+                break
+
+            position += 1
+
+        tokens.append(expression[start:position].strip())
+
+    return tokens
+
+
+def _getter(key: str):
+    parts = key.split('.')
+
+    def get(element):
+        for part in parts:
+            try:
+                element = element[part]
+            except (KeyError, IndexError, TypeError):
+                # a missing key, or an intermediate value that is not an object (e.g. None)
+                return _MISSING
+        return element
+
+    return get
+
+
+def _contains(key: str, search: str):
+    """
+    Compile a classic key:value term, a partial match for strings and lists and equality for numbers
+    """
+    get = _getter(key)
+    try:
+        search = int(search)
+    except ValueError:
+        pass
+
+    def predicate(element):
+        value = get(element)
+        if value is _MISSING:
+            return False
+        try:
+            return search in value
+        except TypeError:
+            return search == value
+
+    return predicate, key, (key.split('.'), search)
+
+
+def _compile_term(term: str):
+    """
+    Compile a single term into a predicate, classic key:value terms also return their key parts and
+    search value so the parser can inline them in the generated code
+    :return: tuple (predicate, key, inline or None)
+    """
+    match = _TERM.match(term)
+    if not match or not match.group(3).strip():
+        raise ValueError('Invalid filter format: {}'.format(term))
+
+    key = match.group(1)
+    get = _getter(key)
+    operator = match.group(2).strip()
+    raw = match.group(3)
+
+    if operator == ':':
+        return _contains(key, _unquote(raw))
+
+    if operator in ('=', '!='):
+        expected = _unquote(raw)
+        number = _to_number(expected)
+        negate = operator == '!='
+
+        def predicate(element):
+            value = get(element)
+            if value is _MISSING:
+                return False
+            if isinstance(value, bool):
+                equal = str(value).lower() == expected.lower()
+            elif isinstance(value, (int, float)):
+                equal = number is not None and value == number
+            else:
+                equal = value == expected
+
+            return equal != negate
+
+        return predicate, key, None
+
+    if operator == '~':
+        search = re.compile(_unquote(raw)).search
+
+        def predicate(element):
+            value = get(element)
+            return value is not _MISSING and search(str(value)) is not None
+
+        return predicate, key, None
+
+    if operator in ('>', '>=', '<', '<='):
+        limit = _to_number(_unquote(raw))
+        if limit is None:
+            raise ValueError('Invalid filter format, {} needs a number: {}'.format(operator, term))
+
+        compare = {
+            '>': lambda value: value > limit,
+            '>=': lambda value: value >= limit,
+            '<': lambda value: value < limit,
+            '<=': lambda value: value <= limit,
+        }[operator]
+
+        def predicate(element):
+            value = _to_number(get(element))
+            return value is not None and compare(value)
+
+        return predicate, key, None
+
+    # in: a numeric range or a set of values
+    raw = raw.strip()
+    match = _RANGE.match(raw)
+    if match:
+        low, high = float(match.group(1)), float(match.group(2))
+
+        def predicate(element):
+            value = _to_number(get(element))
+            return value is not None and low <= value <= high
+
+        return predicate, key, None
+
+    if not (raw.startswith('[') and raw.endswith(']')):
+        raise ValueError('Invalid filter format, in needs [a, b] or a..b: {}'.format(term))
+
+    choices = frozenset(_unquote(i) for i in raw[1:-1].split(',') if i.strip())
+
+    def predicate(element):
+        value = get(element)
+        if value is _MISSING:
+            return False
+        if isinstance(value, bool):
+            value = str(value).lower()
+        return str(value) in choices
+
+    return predicate, key, None
+
+
+class _Parser:
+    """
+    Recursive descent parser over the tokens, precedence is NOT > AND > OR. Every node is returned
+    twice: as python source for the generated fast path and as a closure used as the exact fallback
+    """
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.position = 0
+        self.namespace = {}
+        self.keys = []
+
+    def constant(self, value) -> str:
+        name = '_c{}'.format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise ValueError('Invalid filter format, unexpected {!r}'.format(self.peek()))
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.peek() == 'OR':
+            self.take()
+            nodes.append(self.parse_and())
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        predicates = [predicate for _, predicate in nodes]
+        source = '(' + ' or '.join(source for source, _ in nodes) + ')'
+        return source, lambda element: any(predicate(element) for predicate in predicates)
+
+    def parse_and(self):
+        nodes = [self.parse_not()]
+        while self.peek() == 'AND':
+            self.take()
+            nodes.append(self.parse_not())
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        predicates = [predicate for _, predicate in nodes]
+        source = '(' + ' and '.join(source for source, _ in nodes) + ')'
+        return source, lambda element: all(predicate(element) for predicate in predicates)
+
+    def parse_not(self):
+        token = self.take()
+
+        if token == 'NOT':
+            source, predicate = self.parse_not()
+            return '(not {})'.format(source), lambda element: not predicate(element)
+
+        if token == '(':
+            node = self.parse_or()
+            if self.take() != ')':
+                raise ValueError('Invalid filter format, missing )')
+            return node
+
+        if token is None or token in _KEYWORDS or token == ')':
+            raise ValueError('Invalid filter format, unexpected {!r}'.format(token))
+
+        return self.term(*_compile_term(token))
+
+    def term(self, predicate, key: str, inline):
+        self.keys.append(key)
+
+        if inline is None:
+            return '{}(e)'.format(self.constant(predicate)), predicate
+
+        # key:value is inlined as `search in e[key]`, a TypeError (e.g. an int value) or a KeyError (a missing
+        # key) falls back to the closure
+        parts, search = inline
+        getter = ''.join('[{}]'.format(self.constant(part)) for part in parts)
+        return '({} in e{})'.format(self.constant(search), getter), predicate
+
+
+_TEMPLATE = """
+def make({names}):
+
+    def predicate(e):
+        try:
+            return bool({source})
+        except (TypeError, KeyError):
+            return _exact(e)
+
+    def select(data):
+        try:
+            return [e for e in data if {source}]
+        except (TypeError, KeyError):
+            # mixed value types or missing keys, evaluate record by record with the exact fallback
+            return [e for e in data if predicate(e)]
+
+    return predicate, select
+"""
+
+
+@lru_cache(maxsize=256)
+def compile_filter(expression: str):
+    """
+    Compile a filter expression into a predicate, the result is cached by the expression text so
+    repeated searches with the same filter do not parse it again. The predicate also has a select(list)
+    attribute that returns the matching records with the whole loop compiled in one function
+    :param expression: the filter expression, e.g. 'status:ACTIVE AND network.id=6224cd2b'
+    :return: callable that receives a record and returns True when it matches
+    """
+    if not isinstance(expression, str) or not expression.strip():
+        raise ValueError('Invalid filter format')
+
+    classic = _CLASSIC.match(expression)
+    if classic:
+        parser = _Parser([])
+        source, exact = parser.term(*_contains(classic.group(1), classic.group(2)))
+    else:
+        parser = _Parser(_tokenize(expression))
+        source, exact = parser.parse()
+
+    constants = dict(parser.namespace, _exact=exact)
+    namespace = {}
+    exec(_TEMPLATE.format(names=', '.join(constants), source=source), namespace)
+
+    # the constants are bound as closure cells, which are faster to load than globals
+    predicate, select = namespace['make'](**constants)
+    predicate.select = select
+    predicate.expression = expression
+    predicate.keys = tuple(dict.fromkeys(parser.keys))
+    return predicate
+
+
+def unknown_key(predicate, data: list):
+    """
+    Function to find a key of a compiled filter that no record has, most likely a typo in the filter
+    :param predicate: result of compile_filter
+    :param data: list of records
+    :return: the key, or None when every key is found in at least one record
+    """
+    for key in predicate.keys:
+        get = _getter(key)
+        if all(get(element) is _MISSING for element in data):
+            return key
+
+    return None
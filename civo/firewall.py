@@ -1,8 +1,12 @@
-import requests
-
-from .utils import filter_list
+from . import models
+from .exceptions import CIVOAPIError
+from .instrumentation import traced
+from .rules import diff_rules
+from .transport import Transport
+from .utils import region_url, run_bulk
 
 
+@traced
 class Firewall:
     """
     The simplest solution for most customers is to configure a firewall within their
@@ -15,10 +19,22 @@ class Firewall:
     should be careful to not lock out their access to the instances.
     """
 
-    def __init__(self, headers, api_url, region):
+    def __init__(self, headers, api_url, region, transport=None):
         param = "?region={region}".format(region=region) if region else ''
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{api_url}/v2/firewalls{param}'.format(api_url=api_url, param=param)
+        self._base_url = '{}/v2/firewalls'.format(api_url)
+        self.region = region
+
+    def get_url(self, path: str = None, region: str = None) -> str:
+        """
+        Function to build the url of the api, with the region in the query
+        :param path: path appended to the url of the firewalls, e.g. '/{id}' (optional)
+        :param region: region of the call (optional, default the region of the class)
+        :return: str
+        """
+        return region_url(self._base_url, path, region if region else self.region)
 
     def create(self, name: str, region: str = None) -> dict:
         """
@@ -27,24 +43,19 @@ class Firewall:
         :return: object json
         """
         payload = {'name': name}
-        r = requests.post(self.url, headers=self.headers, params=payload)
+        return self.transport.post(self.url, params=payload)
 
-        return r.json()
-
-    def search(self, filter: str = None) -> dict:
+    def search(self, filter: str = None, model: bool = False) -> dict:
         """
         Function to list firewalls
         :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
                        you can filter by any object that is inside the json
+        :param model: return Firewall models instead of dicts (optional, default False)
         :return: object json
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
+        result = self.transport.get(self.url, filter=filter)
 
-        return r.json()
+        return models.build(result, models.Firewall) if model else result
 
     def delete(self, id: str) -> dict:
         """
@@ -52,9 +63,7 @@ class Firewall:
         :param id: id of the firewall object
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.delete(self.get_url('/{}'.format(id)))
 
     def create_rule(self, id: str, start_port: str, protocol: str = 'tcp', end_port: str = None,
                     cidr: str = '0.0.0.0/0',
@@ -82,9 +91,7 @@ class Firewall:
         if label:
             payload['label'] = label
 
-        r = requests.post(self.url + '/{}/rules'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.post(self.get_url('/{}/rules'.format(id)), params=payload)
 
     def lists_rule(self, id: str, filter: str = None) -> dict:
         """
@@ -94,13 +101,7 @@ class Firewall:
                        you can filter by any object that is inside the json
         :return: object json
         """
-        r = requests.get(self.url + '/{}/rules'.format(id), headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.get_url('/{}/rules'.format(id)), filter=filter)
 
     def delete_rule(self, id: str, rule_id: str) -> dict:
         """
@@ -109,6 +110,78 @@ class Firewall:
         :param rule_id: id of the firewall rule object
         :return: object json
         """
-        r = requests.delete(self.url + '/{}/rules/{}'.format(id, rule_id), headers=self.headers)
+        return self.transport.delete(self.get_url('/{}/rules/{}'.format(id, rule_id)))
+
+    def _apply(self, change: tuple):
+        id, action, rule = change
+
+        if action == 'delete':
+            return self.delete_rule(id, rule['id'])
+
+        cidr = rule.get('cidr') or '0.0.0.0/0'
+        return self.create_rule(id, start_port=rule.get('start_port'), protocol=rule.get('protocol') or 'tcp',
+                                end_port=rule.get('end_port'), cidr=cidr if isinstance(cidr, str) else ','.join(cidr),
+                                direction=rule.get('direction') or 'inbound', label=rule.get('label'))
+
+    def reconcile(self, desired: dict, delete: bool = True, concurrency: int = 10, dry_run: bool = False) -> dict:
+        """
+        Function to make the rules of many firewalls match a desired set. The rules of every firewall are listed
+        once, at the same time, the desired rules repeated or covered by another one are skipped and only the
+        rules missing or not desired are created or deleted, the changes of all the firewalls together. Every
+        delete is sent before the creates, so a replaced rule never conflicts with its replacement.
+        :param desired: rules wanted per firewall id, with the arguments of create_rule,
+                        e.g. {'id': [{'protocol': 'tcp', 'start_port': '443', 'cidr': '0.0.0.0/0'}]}
+        :param delete: delete the rules that are not desired (optional, default True)
+        :param concurrency: maximum number of calls sent at the same time (optional, default 10)
+        :param dry_run: only compute the changes (optional, default False)
+        :return: {'id': {'create': [...], 'delete': [...], 'errors': [BulkResult]}}
+        """
+        listed = run_bulk(self.lists_rule, list(desired), concurrency=concurrency)
+        plans, changes = _plan(listed, desired, delete)
+        results = []
+
+        if not dry_run:
+            for phase in _phases(changes):
+                results.extend(run_bulk(self._apply, phase, concurrency=concurrency))
+
+        return _reconciled(plans, results)
+
+
+def _phases(changes: list) -> list:
+    # the creates wait for every delete to be done
+    return [phase for phase in ([change for change in changes if change[1] == action]
+                                for action in ('delete', 'create')) if phase]
+
+
+def _plan(listed: list, desired: dict, delete: bool) -> tuple:
+    plans, changes = {}, []
+
+    for result in listed:
+        id = result.item
+        plans[id] = {'create': [], 'delete': [], 'errors': []}
+        error = result.error
+
+        # an error of the api is answered as a json object in place of the list
+        if error is None and isinstance(result.result, dict):
+            error = CIVOAPIError('Listing the rules of {} failed: {}'.format(id, result.result.get('reason')),
+                                 body=result.result)
+
+        if error is not None:
+            plans[id]['errors'].append(result._replace(error=error))
+            continue
+
+        diff = diff_rules(result.result, desired[id], delete=delete)
+        plans[id]['create'] = diff.create
+        plans[id]['delete'] = diff.delete
+        changes.extend((id, 'delete', rule) for rule in diff.delete)
+        changes.extend((id, 'create', rule) for rule in diff.create)
+
+    return plans, changes
+
+
+def _reconciled(plans: dict, results: list) -> dict:
+    for result in results:
+        if result.error is not None:
+            plans[result.item[0]]['errors'].append(result)
 
-        return r.json()
\ No newline at end of file
+    return plans
@@ -0,0 +1,184 @@
+"""
+File to observe the requests sent by the transport: the events given to the hooks and a latency aggregator
+"""
+import contextvars
+import functools
+import math
+import re
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from types import FunctionType
+from urllib.parse import urlsplit
+
+from .utils import print_err
+
+# One event per request start ('request'), answer ('response') or failure ('error'). resource and operation are
+# the class and method of the caller, e.g. Instances and create, endpoint is the path with ids replaced by {id},
+# duration is in seconds, includes the retries and is None on 'request', status and response_bytes are None
+# when no answer was received
+RequestEvent = namedtuple('RequestEvent', ['kind', 'resource', 'operation', 'method', 'endpoint', 'url', 'status',
+                                           'duration', 'request_bytes', 'response_bytes', 'retries', 'error'])
+
+# flag of the code of an async def, read directly as inspect is slow to import
+_CO_COROUTINE = 0x80
+
+# (resource, operation) of the resource method running, set by the methods of the classes decorated with traced
+_origin = contextvars.ContextVar('civo_origin', default=None)
+
+_ID = re.compile(r'^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+|[0-9a-f]{24,})$')
+
+
+@lru_cache(maxsize=1024)
+def endpoint(url: str) -> str:
+    """
+    Function to template the path of an url, e.g. https://api.civo.com/v2/instances/<uuid>/stop?region=lon1
+    gives /v2/instances/{id}/stop
+    :param url: absolute url of the request
+    :return: str
+    """
+    return '/'.join('{id}' if _ID.match(part) else part for part in urlsplit(url).path.split('/'))
+
+
+def _traced(function):
+    name = function.__name__
+
+    if function.__code__.co_flags & _CO_COROUTINE:
+        @functools.wraps(function)
+        async def method(self, *args, **kwargs):
+            token = _origin.set((type(self).__name__, name))
+            try:
+                return await function(self, *args, **kwargs)
+            finally:
+                _origin.reset(token)
+    else:
+        @functools.wraps(function)
+        def method(self, *args, **kwargs):
+            token = _origin.set((type(self).__name__, name))
+            try:
+                return function(self, *args, **kwargs)
+            finally:
+                _origin.reset(token)
+
+    return method
+
+
+def traced(cls):
+    """
+    Class decorator naming the requests sent by the public methods of a resource, the transport reports them
+    with the class and the method, e.g. Instances and create. The innermost method wins, so a reference
+    resolved for Instances.create is reported as Instances.create
+    :param cls: the resource class
+    :return: the class
+    """
+    for name, function in list(vars(cls).items()):
+        if not name.startswith('_') and isinstance(function, FunctionType):
+            setattr(cls, name, _traced(function))
+
+    return cls
+
+
+def caller() -> tuple:
+    """
+    Function to get the resource method sending a request, only called when a hook is registered
+    :return: tuple (resource, operation), (None, None) when the request was sent directly
+    """
+    origin = _origin.get()
+    return origin if origin is not None else (None, None)
+
+
+def emit(hooks: list, event: RequestEvent):
+    # a failing hook must never fail the call it observes
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception as error:
+            print_err('civo hook {!r} failed: {}'.format(hook, error))
+
+
+class _Histogram:
+    """
+    Log scale histogram of durations, each bucket is `growth` times wider than the previous one, so the
+    percentiles are exact to within that factor whatever the number of samples
+    """
+    __slots__ = ('counts', 'count', 'errors', 'total', 'request_bytes', 'response_bytes')
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class LatencyAggregator:
+    """
+    Hook collecting the duration of every request in a histogram per method and endpoint. Register it with
+    Transport.add_hook or Civo(hooks=[...]) and read the percentiles with summary()
+    """
+
+    def __init__(self, minimum: float = 0.0001, growth: float = 1.05):
+        """
+        Init for LatencyAggregator class
+        :param minimum: seconds of the first bucket, every shorter duration falls in it (optional, default 0.1 ms)
+        :param growth: ratio between two buckets, i.e. the precision of the percentiles (optional, default 1.05)
+        """
+        self.minimum = minimum
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent):
+        if event.kind == 'request':
+            return
+
+        bucket = 0
+        if event.duration > self.minimum:
+            bucket = int(math.log(event.duration / self.minimum) / self._log_growth) + 1
+
+        with self._lock:
+            histogram = self._histograms.get((event.method, event.endpoint))
+            if histogram is None:
+                histogram = self._histograms[(event.method, event.endpoint)] = _Histogram()
+
+            histogram.counts[bucket] = histogram.counts.get(bucket, 0) + 1
+            histogram.count += 1
+            histogram.total += event.duration
+            histogram.request_bytes += event.request_bytes or 0
+            histogram.response_bytes += event.response_bytes or 0
+            if event.kind == 'error':
+                histogram.errors += 1
+
+    def _percentile(self, histogram: _Histogram, percent: float) -> float:
+        rank = math.ceil(histogram.count * percent / 100.0)
+        seen = 0
+
+        for bucket in sorted(histogram.counts):
+            seen += histogram.counts[bucket]
+            if seen >= rank:
+                # upper bound of the bucket
+                return self.minimum * self.growth ** bucket
+
+        return 0.0
+
+    def summary(self) -> dict:
+        """
+        Function to get the statistics of each endpoint
+        :return: dict of (method, endpoint) to dict with count, errors, mean, p50, p95 and p99 in seconds,
+                 request_bytes and response_bytes
+        """
+        with self._lock:
+            return {key: {'count': h.count, 'errors': h.errors, 'mean': h.total / h.count,
+                          'p50': self._percentile(h, 50), 'p95': self._percentile(h, 95),
+                          'p99': self._percentile(h, 99), 'request_bytes': h.request_bytes,
+                          'response_bytes': h.response_bytes}
+                    for key, h in self._histograms.items()}
+
+    def reset(self):
+        """
+        Function to drop every sample
+        """
+        with self._lock:
+            self._histograms.clear()
@@ -1,52 +1,47 @@
-import requests
-
-from .utils import filter_list
+from . import models
+from .instrumentation import traced
+from .resolver import Resolver
+from .transport import Transport
+from .utils import iterate_pages, region_url, run_bulk
+from .waiter import Waiter
 
 
+@traced
 class Instances:
     """
     Instances are running virtual servers on the Civo cloud platform. They can be of variable size.
     """
 
-    def __init__(self, headers, api_url, region):
+    # Methods that take the instance id as first argument and can be run by bulk
+    BULK_ACTIONS = ('stop', 'start', 'rebooting', 'retagging', 'resizing', 'firewall', 'delete', 'retrieving')
+
+    def __init__(self, headers, api_url, region, transport=None, resolver=None):
         param = "?region={region}".format(region=region) if region else ''
+        self.region = region
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
+        self.resolver = resolver if resolver else Resolver(self.transport, api_url)
         self.url = '{api_url}/v2/instances{param}'.format(api_url=api_url, param=param)
+        self._base_url = '{}/v2/instances'.format(api_url)
+        self._waiter = None
 
-    def create(self, hostname: str, size: str, template_id: str, reverse_dns: str = None, region: str = None,
-               public_ip: str = 'create', move_ip_from: str = None, count: int = 1, network_id: str = None,
-               snapshot_id: str = None, initial_user: str = None, ssh_key_id: str = None, script: str = None, tags: str = None) -> dict:
-        # TODO: Pending check
+    def get_url(self, path: str = None, region: str = None) -> str:
         """
-        Function to create instance
-        :param hostname: a fully qualified domain name that should be set as the instance's hostname (required)
-        :param size: the identifier for the size, from the current list (required)
-        :param template_id: the ID for the template to use to build the instance, from the current templates.
-               Parameter also accepted as template. (optional; but must be specified if no snapshot is specified)
-        :param reverse_dns: a fully qualified domain name that should be used as the instance's IP's reverse DNS (optional, uses the hostname if unspecified)
-        :param region: the identifier for the region, from the current region (optional; a random one will be picked by the system)
-        :param public_ip: this should be either none, create or from. If from is specified then the move_ip_from
-               parameter should also be specified (and contain the ID of the instance that will be releasing its IP).
-               As aliases true will be treated the same as create and false will be treated the same as none.
-               If create or true is specified it will automatically allocate an initial public IP address,
-               rather than having to add the first one later (optional; default is create)
-        :param move_ip_from: parameter should also be specified (and contain the ID of the instance that will be releasing its IP).
-        :param count: the number of instances to create (optional, default is 1)
-        :param network_id: this must be the ID of the network from the network listing (optional;
-               default network used when not specified)
-        :param snapshot_id: the ID for the snapshot to use to build the instance, from your snapshots
-               (optional; but must be specified if no template is specified)
-        :param initial_user: the name of the initial user created on the server
-               (optional; this will default to the template's default_username and fallback to "civo")
-        :param ssh_key_id: the ID of an already uploaded SSH public key to use for login to the default user
-               (optional; if one isn't provided a random password will be set and returned in the initial_password field)
-        :param script: the contents of a script that will be uploaded to /usr/local/bin/civo-user-init-script on your
-               instance, read/write/executable only by root and then will be
-               executed at the end of the cloud initialization
-        :param tags: a space separated list of tags, to be used freely as required (optional)
-        :return: objects json
+        Function to build the url of the api, with the region in the query
+        :param path: path appended to the url of the instances, e.g. '/{id}' (optional)
+        :param region: region of the call (optional, default the region of the class)
+        :return: str
         """
+        return region_url(self._base_url, path, region if region else self.region)
 
+    @staticmethod
+    def _create_payload(hostname: str, size: str, template_id: str, reverse_dns: str = None, region: str = None,
+                        public_ip: str = 'create', move_ip_from: str = None, count: int = 1, network_id: str = None,
+                        snapshot_id: str = None, initial_user: str = None, ssh_key_id: str = None, script: str = None,
+                        tags: str = None) -> dict:
+        """
+        Build the payload sent by create, the references must be already resolved
+        """
         payload = {'hostname': hostname, 'size': size, 'template_id': template_id}
 
         if reverse_dns:
@@ -82,11 +77,60 @@ class Instances:
         if tags:
             payload['tags'] = tags
 
-        r = requests.post(self.url, headers=self.headers, params=payload)
+        return payload
 
-        return r.json()
+    def create(self, hostname: str, size: str, template_id: str, reverse_dns: str = None, region: str = None,
+               public_ip: str = 'create', move_ip_from: str = None, count: int = 1, network_id: str = None,
+               snapshot_id: str = None, initial_user: str = None, ssh_key_id: str = None, script: str = None, tags: str = None) -> dict:
+        """
+        Function to create instance
+        :param hostname: a fully qualified domain name that should be set as the instance's hostname (required)
+        :param size: the name or id of the size, from the current list (required)
+        :param template_id: the ID for the template to use to build the instance, from the current templates.
+               Parameter also accepted as template. (optional; but must be specified if no snapshot is specified)
+        :param reverse_dns: a fully qualified domain name that should be used as the instance's IP's reverse DNS (optional, uses the hostname if unspecified)
+        :param region: the identifier for the region, from the current region (optional; a random one will be picked by the system)
+        :param public_ip: this should be either none, create or from. If from is specified then the move_ip_from
+               parameter should also be specified (and contain the ID of the instance that will be releasing its IP).
+               As aliases true will be treated the same as create and false will be treated the same as none.
+               If create or true is specified it will automatically allocate an initial public IP address,
+               rather than having to add the first one later (optional; default is create)
+        :param move_ip_from: parameter should also be specified (and contain the ID of the instance that will be releasing its IP).
+        :param count: the number of instances to create (optional, default is 1)
+        :param network_id: the ID, name or label of the network from the network listing (optional;
+               default network used when not specified)
+        :param snapshot_id: the ID for the snapshot to use to build the instance, from your snapshots
+               (optional; but must be specified if no template is specified)
+        :param initial_user: the name of the initial user created on the server
+               (optional; this will default to the template's default_username and fallback to "civo")
+        :param ssh_key_id: the ID or name of an already uploaded SSH public key to use for login to the default user
+               (optional; if one isn't provided a random password will be set and returned in the initial_password field)
+        :param script: the contents of a script that will be uploaded to /usr/local/bin/civo-user-init-script on your
+               instance, read/write/executable only by root and then will be
+               executed at the end of the cloud initialization
+        :param tags: a space separated list of tags, to be used freely as required (optional)
+        :return: objects json
+        """
+
+        # names are resolved against the cached indexes of the resolver, no listing call per create
+        lookup_region = region if region else self.region
+        size = self.resolver.resolve('sizes', size)
+
+        if network_id:
+            network_id = self.resolver.resolve('networks', network_id, lookup_region)
+
+        if ssh_key_id:
+            ssh_key_id = self.resolver.resolve('sshkeys', ssh_key_id)
+
+        payload = self._create_payload(hostname=hostname, size=size, template_id=template_id, reverse_dns=reverse_dns,
+                                       region=region, public_ip=public_ip, move_ip_from=move_ip_from, count=count,
+                                       network_id=network_id, snapshot_id=snapshot_id, initial_user=initial_user,
+                                       ssh_key_id=ssh_key_id, script=script, tags=tags)
 
-    def search(self, tags: str = None, page: str = None, per_page: str = None, filter: str = None) -> dict:
+        return self.transport.post(self.url, params=payload)
+
+    def search(self, tags: str = None, page: str = None, per_page: str = None, filter: str = None,
+               model: bool = False, stream: bool = False) -> dict:
         """
         Function to list all instances
         :param tags: a space separated list of tags, to be used freely as required.
@@ -95,6 +139,9 @@ class Instances:
         :param per_page: how many instances to return per page (defaults to 20)
         :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
            you can filter by any object that is inside the json
+        :param model: return Instance models instead of dicts (optional, default False)
+        :param stream: yield the instances of the page as they are decoded, non matching ones are dropped
+               right away, instead of building the whole page (optional, default False)
         :return: objects json
         """
         payload = {}
@@ -108,13 +155,21 @@ class Instances:
         if per_page:
             payload['per_page'] = per_page
 
-        r = requests.get(self.url, headers=self.headers, params=payload)
+        result = self.transport.get(self.url, params=payload, filter=filter, stream=stream)
 
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
+        return models.build(result, models.Instance) if model else result
 
-        return r.json()
+    def iter_all(self, tags: str = None, per_page: int = 100, filter: str = None):
+        """
+        Function to iterate over every instance, one record at a time, the pages are requested lazily
+        and the next one is prefetched while the current one is consumed
+        :param tags: a space separated list of tags, instances must much all tags to be returned
+        :param per_page: how many instances to request per page (defaults to 100)
+        :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
+           you can filter by any object that is inside the json
+        :return: generator of objects json
+        """
+        return iterate_pages(lambda page: self.search(tags=tags, page=page, per_page=per_page), filter_by=filter)
 
     def retrieving(self, id: str) -> object:
         """
@@ -122,9 +177,7 @@ class Instances:
         :param id: id of the objects
         :return: object json
         """
-        r = requests.get(self.url + '/{}'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.get(self.get_url('/{}'.format(id)))
 
     def retagging(self, id: str, tags: str) -> dict:
         """
@@ -135,9 +188,7 @@ class Instances:
         """
         payload = {'tags': tags}
 
-        r = requests.put(self.url + '/{}/tags'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/tags'.format(id)), params=payload)
 
     def rebooting(self, id: str, type_reboot: str) -> dict:
         """
@@ -146,9 +197,7 @@ class Instances:
         :param type_reboot: (reboots|hard_reboots|soft_reboots)
         :return: object json
         """
-        r = requests.post(self.url + '/{}/{}'.format(id, type_reboot), headers=self.headers)
-
-        return r.json()
+        return self.transport.post(self.get_url('/{}/{}'.format(id, type_reboot)))
 
     def stop(self, id: str) -> dict:
         """
@@ -156,9 +205,7 @@ class Instances:
         :param id: id of the objects
         :return: object json
         """
-        r = requests.put(self.url + '/{}/stop'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/stop'.format(id)))
 
     def start(self, id: str) -> dict:
         """
@@ -166,9 +213,7 @@ class Instances:
         :param id: id of the objects
         :return: object json
         """
-        r = requests.put(self.url + '/{}/start'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/start'.format(id)))
 
     def resizing(self, id: str, size: str) -> dict:
         """
@@ -179,26 +224,22 @@ class Instances:
         """
         payload = {'size': size}
 
-        r = requests.put(self.url + '/{}/resize'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/resize'.format(id)), params=payload)
 
     def firewall(self, id: str, firewall_id: str = None) -> dict:
         """
         Function to setting the firewall for an instance
         :param id: id of the objects
-        :param firewall_id: the ID of the firewall to use, from the current list. If left blank or not sent,
+        :param firewall_id: the ID or name of the firewall to use, from the current list. If left blank or not sent,
                the default firewall will be used (open to all)
         :return: object json
         """
         payload = {}
 
         if firewall_id:
-            payload['firewall_id'] = firewall_id
+            payload['firewall_id'] = self.resolver.resolve('firewalls', firewall_id, self.region)
 
-        r = requests.put(self.url + '/{}/firewall'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/firewall'.format(id)), params=payload)
 
     def moving_ip(self, id: str, ip: str) -> dict:
         """
@@ -207,9 +248,7 @@ class Instances:
         :param ip: ip address
         :return: object json
         """
-        r = requests.put(self.url + '/{}/ip/{}'.format(id, ip), headers=self.headers)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/ip/{}'.format(id, ip)))
 
     def delete(self, id: str) -> dict:
         """
@@ -217,6 +256,39 @@ class Instances:
         :param id: id of the objects
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(id), headers=self.headers)
+        return self.transport.delete(self.get_url('/{}'.format(id)))
+
+    def bulk(self, action: str, ids: list, concurrency: int = None, progress=None, **kwargs) -> list:
+        """
+        Function to run the same action over many instances in parallel, sharing the pooled transport
+        :param action: one of stop, start, rebooting, retagging, resizing, firewall, delete or retrieving
+        :param ids: the ids of the instances
+        :param concurrency: maximum number of calls in flight (optional, defaults to the pool size of the transport,
+               a higher value needs a bigger pool_maxsize to keep reusing connections)
+        :param progress: callable receiving (done, total, BulkResult) as each instance finishes (optional)
+        :param kwargs: the other arguments of the action, e.g. tags for retagging or type_reboot for rebooting
+        :return: list of BulkResult(item, result, error) in the same order as ids
+        """
+        if action not in self.BULK_ACTIONS:
+            raise ValueError('Invalid bulk action {}, use one of {}'.format(action, ', '.join(self.BULK_ACTIONS)))
+
+        function = getattr(self, action)
+        concurrency = concurrency if concurrency else getattr(self.transport, 'pool_maxsize', 10)
+
+        return run_bulk(lambda id: function(id, **kwargs), ids, concurrency=concurrency, progress=progress)
+
+    def wait(self, ids: list, state: str = 'ACTIVE', timeout: float = 600, callback=None) -> dict:
+        """
+        Function to wait for instances to reach a state, all the waits of this object share one poller that
+        lists the instances once per tick instead of retrieving each one, the pages after the first are only
+        requested while a tracked instance is not found yet or a deletion is waited for
+        :param ids: ids of the instances
+        :param state: the target status, None waits for the deletion (optional, default ACTIVE)
+        :param timeout: seconds before the future of one of them fails with TimeoutError (optional, default 600)
+        :param callback: callable receiving the future of each one once it is done (optional)
+        :return: dict of id to concurrent.futures.Future resolving to the object json
+        """
+        if self._waiter is None:
+            self._waiter = Waiter(fetch_page=lambda page: self.search(page=page, per_page=100))
 
-        return r.json()
\ No newline at end of file
+        return self._waiter.wait(ids, state=state, timeout=timeout, callback=callback)
@@ -0,0 +1,297 @@
+"""
+File to keep a local mirror of the resources of the account, refreshed in the background and queried from
+memory through indexes
+"""
+import json
+import threading
+import time
+from collections import namedtuple
+
+from .exceptions import CIVOAPIError
+from .utils import print_err
+
+# ids of the items added, changed and removed by one refresh of a resource type
+Changes = namedtuple('Changes', ['added', 'updated', 'removed'])
+
+# last failed refresh of a resource type, with its time (time.time())
+RefreshError = namedtuple('RefreshError', ['error', 'at'])
+
+# fields indexed for each resource type, a list field like tags is indexed by each of its values
+DEFAULT_INDEXES = {
+    'instances': ('network_id', 'firewall_id', 'status', 'size', 'tags'),
+    'volumes': ('instance_id', 'network_id', 'status'),
+    'networks': ('label', 'default'),
+    'firewalls': ('network_id', 'name'),
+    'loadbalancers': ('hostname',),
+}
+
+# seconds between two refreshes of each resource type
+DEFAULT_INTERVALS = {
+    'instances': 30,
+    'volumes': 30,
+    'networks': 300,
+    'firewalls': 300,
+    'loadbalancers': 60,
+}
+
+
+def _list_all(client, type: str) -> list:
+    if type == 'instances':
+        return list(client.instances.iter_all())
+
+    resource = {'volumes': client.volumes, 'networks': client.networks, 'firewalls': client.firewalls,
+                'loadbalancers': client.loadbalance}[type]
+    items = resource.search()
+
+    # an error of the api is answered as a json object in place of the list
+    if isinstance(items, dict):
+        raise CIVOAPIError('Listing the {} failed: {}'.format(type, items.get('reason', items)), body=items)
+
+    return items
+
+
+def _values(value) -> tuple:
+    if isinstance(value, (list, tuple)):
+        return tuple(v for v in value if not isinstance(v, (dict, list)))
+
+    return () if isinstance(value, dict) else (value,)
+
+
+class _Table:
+    """
+    Items of one resource type by id, with an index of value to ids for each indexed field
+    """
+
+    def __init__(self, fields: tuple):
+        self.items = {}
+        self.indexes = {field: {} for field in fields}
+
+    def _index(self, id: str, item: dict):
+        for field, index in self.indexes.items():
+            for value in _values(item.get(field)):
+                index.setdefault(value, set()).add(id)
+
+    def _unindex(self, id: str, item: dict):
+        for field, index in self.indexes.items():
+            for value in _values(item.get(field)):
+                ids = index.get(value)
+                if ids is not None:
+                    ids.discard(id)
+                    if not ids:
+                        del index[value]
+
+    def apply(self, items: list) -> Changes:
+        """
+        Replace the items with a new listing, only the items whose content changed are indexed again
+        """
+        listed = {item['id']: item for item in items}
+        added, updated = [], []
+
+        for id, item in listed.items():
+            old = self.items.get(id)
+            if old is None:
+                added.append(id)
+            elif old != item:
+                updated.append(id)
+                self._unindex(id, old)
+            else:
+                continue
+            self.items[id] = item
+            self._index(id, item)
+
+        removed = [id for id in self.items if id not in listed]
+        for id in removed:
+            self._unindex(id, self.items.pop(id))
+
+        return Changes(added, updated, removed)
+
+
+class Inventory:
+    """
+    Mirror of the instances, volumes, networks, firewalls and load balancers of the account. Each resource type
+    is listed on its own schedule and the listing is diffed on id, so only the items that changed are indexed
+    again and reported. The questions like "which instances are on network X" are answered from the indexes
+    without any call to the api. With a path the mirror is also kept in a sqlite database, so a new process
+    starts from the last known state. A failed refresh is reported and kept in errors until the type is
+    refreshed again, refreshed_at only moves on success.
+    """
+
+    def __init__(self, client, types: list = None, intervals: dict = None, indexes: dict = None, path: str = None):
+        """
+        Init for Inventory class
+        :param client: the Civo client used to list the resources
+        :param types: resource types mirrored (optional, default every type of DEFAULT_INTERVALS)
+        :param intervals: seconds between refreshes, merged over DEFAULT_INTERVALS, e.g. {'instances': 10} (optional)
+        :param indexes: fields indexed per type, merged over DEFAULT_INDEXES, e.g. {'volumes': ('region',)} (optional)
+        :param path: sqlite database where the mirror is kept, e.g. 'inventory.db' (optional, default memory only)
+        """
+        self.client = client
+        self.types = list(types) if types else list(DEFAULT_INTERVALS)
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals if intervals else {}))
+        indexes = dict(DEFAULT_INDEXES, **(indexes if indexes else {}))
+
+        unknown = [type for type in self.types if type not in DEFAULT_INTERVALS]
+        if unknown:
+            raise ValueError('Invalid resource type {}, use {}'.format(', '.join(unknown), ', '.join(DEFAULT_INTERVALS)))
+
+        self._tables = {type: _Table(tuple(indexes.get(type, ()))) for type in self.types}
+        # last refresh tried, used for the schedule, refreshed_at keeps the last one that succeeded
+        self._attempted = {type: None for type in self.types}
+        self.refreshed_at = {type: None for type in self.types}
+        self.errors = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._db = None
+
+        if path:
+            self._open(path)
+
+    def _open(self, path: str):
+        # sqlite is only imported by the mirrors kept on disk
+        import sqlite3
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS items (type TEXT, id TEXT, data TEXT, PRIMARY KEY (type, id))')
+
+        for type in self.types:
+            rows = self._db.execute('SELECT data FROM items WHERE type = ?', (type,))
+            self._tables[type].apply([json.loads(data) for data, in rows])
+
+    def _save(self, type: str, changes: Changes):
+        table = self._tables[type]
+
+        with self._db:
+            self._db.executemany('DELETE FROM items WHERE type = ? AND id = ?', [(type, id) for id in changes.removed])
+            self._db.executemany('INSERT OR REPLACE INTO items (type, id, data) VALUES (?, ?, ?)',
+                                 [(type, id, json.dumps(table.items[id])) for id in changes.added + changes.updated])
+
+    def due(self) -> list:
+        """
+        Function to list the resource types whose interval is over
+        :return: list
+        """
+        now = time.monotonic()
+        return [type for type in self.types
+                if self._attempted[type] is None or now - self._attempted[type] >= self.intervals[type]]
+
+    def refresh(self, types: list = None) -> dict:
+        """
+        Function to list the resource types again and apply the differences to the mirror
+        :param types: resource types to refresh (optional, default the types whose interval is over)
+        :return: {'instances': Changes(added=[ids], updated=[ids], removed=[ids])}
+        :raise CIVOAPIError: when a type could not be refreshed, once every type was tried, body maps type: error
+        """
+        result = {}
+        failed = {}
+
+        for type in (types if types else self.due()):
+            try:
+                items = _list_all(self.client, type)
+
+                with self._lock:
+                    changes = self._tables[type].apply(items)
+                    if self._db is not None and any(changes):
+                        self._save(type, changes)
+                    self.refreshed_at[type] = time.time()
+                    self.errors.pop(type, None)
+            except Exception as error:
+                # the type is tried again at its next interval, the mirror keeps the last known items
+                with self._lock:
+                    self.errors[type] = RefreshError(error, time.time())
+                failed[type] = error
+                continue
+            finally:
+                with self._lock:
+                    self._attempted[type] = time.monotonic()
+
+            result[type] = changes
+
+        # the other types are refreshed all the same, the errors are raised together at the end
+        if failed:
+            raise CIVOAPIError('Refreshing the inventory failed: {}'.format(
+                ', '.join('{} ({})'.format(type, error) for type, error in failed.items())), body=failed)
+
+        return result
+
+    def get(self, type: str, id: str, default=None) -> dict:
+        """
+        Function to get one item of the mirror
+        :param type: resource type, e.g. 'instances'
+        :param id: id of the item
+        :return: object json
+        """
+        return self._tables[type].items.get(id, default)
+
+    def all(self, type: str) -> list:
+        """
+        Function to list the items of a resource type
+        :param type: resource type, e.g. 'volumes'
+        :return: list
+        """
+        with self._lock:
+            return list(self._tables[type].items.values())
+
+    def find(self, type: str, **where) -> list:
+        """
+        Function to find the items matching every field given, the indexed fields are looked up in their index
+        and only the items found are compared on the other fields, e.g. find('volumes', instance_id='...')
+        :param type: resource type, e.g. 'instances'
+        :param where: field=value pairs, a list field like tags matches when it holds the value
+        :return: list
+        """
+        table = self._tables[type]
+
+        with self._lock:
+            ids = None
+            rest = {}
+
+            for field, value in where.items():
+                index = table.indexes.get(field)
+                if index is None:
+                    rest[field] = value
+                    continue
+
+                found = index.get(value, ())
+                ids = set(found) if ids is None else ids & found
+                if not ids:
+                    return []
+
+            candidates = (table.items[id] for id in ids) if ids is not None else table.items.values()
+            return [item for item in candidates
+                    if all(value in _values(item.get(field)) for field, value in rest.items())]
+
+    def start(self):
+        """
+        Function to refresh the mirror in a background thread, each resource type when its interval is over
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='civo-inventory', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh(self.due())
+            except CIVOAPIError as error:
+                print_err('civo inventory: {}, the mirror is kept as is'.format(error))
+
+            now = time.monotonic()
+            wait = min(self.intervals[type] - (now - self._attempted[type]) for type in self.types)
+            self._stop.wait(max(wait, 0.1))
+
+    def stop(self):
+        """
+        Function to stop the background refresh and close the database
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,21 +1,27 @@
-import requests
-
+from . import models
 from .exceptions import CIVOAPIError
-from .networks import Networks
-from .utils import filter_list
+from .instrumentation import traced
+from .resolver import Resolver
+from .transport import Transport
+from .utils import iterate_pages
+from .waiter import Waiter
 
 
+@traced
 class Kubernetes:
     """
     Kubernetes clusters are a number of instances on the Civo cloud platform running the Kubernetes cloud orchestration platform.
     """
-    def __init__(self, headers, api_url, region=None):
+    def __init__(self, headers, api_url, region=None, transport=None, resolver=None):
         self.region = region
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
+        self.resolver = resolver if resolver else Resolver(self.transport, api_url)
         self._api_url = api_url
         self.url = '{}/v2/kubernetes/clusters'.format(self._api_url)
         self.kube_version = '{}/v2/kubernetes/versions'.format(self._api_url)
         self.marketplace_url = '{}/v2/kubernetes/applications'.format(self._api_url)
+        self._waiter = None
 
     def get_url(self, path=None, region=None):
         """ Construct the API URL, appending necessary parameters
@@ -29,18 +35,11 @@ class Kubernetes:
         query = "?region={region}".format(region=region) if region else ""
         return self.url + path + query
 
-    def create(self, name: str, num_nodes: int = 3, nodes_size: str = 'g3.small', kubernetes_version: str = None,
-               tags: str = None, network: str = None, region: str = None) -> dict:
+    @staticmethod
+    def _create_payload(name: str, num_nodes: int, nodes_size: str, kubernetes_version: str = None,
+                        tags: str = None) -> dict:
         """
-        Function to create a cluster of kubernetes
-        :param name: a name for your cluster, must be unique within your account (required)
-        :param num_nodes: the number of instances to create (optional, the default at the time of writing is 3)
-        :param nodes_size: the size of each node (optional, the default is currently g2.small)
-        :param kubernetes_version: the version of k3s to install (optional, the default is currently the latest available)
-        :param tags: a space separated list of tags, to be used freely as required (optional)
-        :param network: network to be attached to cluster instance, not validated (optional, default: Default)
-        :param region: the civo region to be used for instance creation, not validated (optional)
-        :return: dict
+        Build the payload sent by create, without the network_id
         """
         payload = {
             'name': name,
@@ -57,33 +56,56 @@ class Kubernetes:
         if kubernetes_version:
             payload['kubernetes_version'] = kubernetes_version
 
-        networks_list = Networks(self.headers, self._api_url, region).search()
-        if not network:
-            payload['network_id'] = [i['id'] for i in networks_list if i['default']][0]
-        else:
-            payload['network_id'] = [i['id'] for i in networks_list if i['name'] == network or i['id'] == network][0]
+        return payload
+
+    def create(self, name: str, num_nodes: int = 3, nodes_size: str = 'g3.small', kubernetes_version: str = None,
+               tags: str = None, network: str = None, region: str = None) -> dict:
+        """
+        Function to create a cluster of kubernetes
+        :param name: a name for your cluster, must be unique within your account (required)
+        :param num_nodes: the number of instances to create (optional, the default at the time of writing is 3)
+        :param nodes_size: the size of each node (optional, the default is currently g2.small)
+        :param kubernetes_version: the version of k3s to install (optional, the default is currently the latest available)
+        :param tags: a space separated list of tags, to be used freely as required (optional)
+        :param network: name, label or id of the network to be attached to cluster instance (optional, default: Default)
+        :param region: the civo region to be used for instance creation, not validated (optional)
+        :return: dict
+        """
+        payload = self._create_payload(name, num_nodes, nodes_size, kubernetes_version, tags)
 
-        r = requests.post(self.get_url(region=region), headers=self.headers, params=payload)
+        payload['network_id'] = self.resolver.resolve('networks', network, region if region else self.region)
 
-        return r.json()
+        return self.transport.post(self.get_url(region=region), params=payload)
 
-    def search(self, filter: str = None, region: str = None) -> dict:
+    def search(self, filter: str = None, region: str = None, model: bool = False) -> dict:
         """
         A list of clusters accessible from an account is available
         :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
            you can filter by any object that is inside the json
         :param region: the civo region to be used for instance creation, not validated (optional)
+        :param model: return Cluster models instead of dicts (optional, default False)
         :return: objects dict
         """
         payload = {}
 
-        r = requests.get(self.get_url(region=region), headers=self.headers, params=payload)
+        result = self.transport.get(self.get_url(region=region), params=payload, filter=filter)
 
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
+        return models.build(result, models.Cluster) if model else result
 
-        return r.json()
+    def iter_all(self, per_page: int = 100, filter: str = None, region: str = None):
+        """
+        Function to iterate over every cluster, one record at a time, the pages are requested lazily
+        and the next one is prefetched while the current one is consumed
+        :param per_page: how many clusters to request per page (defaults to 100)
+        :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
+           you can filter by any object that is inside the json
+        :param region: the civo region to be used for instance creation, not validated (optional)
+        :return: generator of objects json
+        """
+        url = self.get_url(region=region)
+
+        return iterate_pages(lambda page: self.transport.get(url, params={'page': page, 'per_page': per_page}),
+                             filter_by=filter)
 
     def retrieving(self, id: str, region: str = None) -> object:
         """
@@ -92,9 +114,7 @@ class Kubernetes:
         :param region: the civo region to be used for instance creation, not validated (optional)
         :return: object json
         """
-        r = requests.get(self.get_url(region=region, path='/{}'.format(id)), headers=self.headers)
-
-        return r.json()
+        return self.transport.get(self.get_url(region=region, path='/{}'.format(id)))
 
     def update(self, id: str, name: str = None, num_nodes: int = None, applications: str = None, version: str = None,
                node_destroy: str = None, region: str = None) -> dict:
@@ -127,9 +147,7 @@ class Kubernetes:
         if applications:
             payload['applications'] = applications
 
-        r = requests.put(self.get_url(region=region, path='/{}'.format(id)), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url(region=region, path='/{}'.format(id)), params=payload)
 
     def marketplace(self, filter: str = None) -> dict:
         """
@@ -140,13 +158,8 @@ class Kubernetes:
         """
         payload = {}
 
-        r = requests.get(self.marketplace_url, headers=self.headers, params=payload)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.marketplace_url, params=payload, filter=filter,
+                                  cache='kubernetes_applications')
 
     def delete(self, id: str, region: str = None) -> dict:
         """
@@ -156,9 +169,7 @@ class Kubernetes:
         :return: dict
         """
 
-        r = requests.delete(self.get_url(region=region, path='/{}'.format(id)), headers=self.headers)
-
-        return r.json()
+        return self.transport.delete(self.get_url(region=region, path='/{}'.format(id)))
 
     def recycle(self, id: str, hostname: str, region: str = None) -> dict:
         """
@@ -170,9 +181,7 @@ class Kubernetes:
         """
         payload = {'hostname': hostname}
 
-        r = requests.post(self.get_url(region=region, path='/{}/recycle'.format(id)), headers=self.headers, payload=payload)
-
-        return r.json()
+        return self.transport.post(self.get_url(region=region, path='/{}/recycle'.format(id)), params=payload)
 
     def versions(self, filter: str = None) -> dict:
         """
@@ -183,10 +192,22 @@ class Kubernetes:
         """
         payload = {}
 
-        r = requests.get(self.kube_version, headers=self.headers, params=payload)
+        return self.transport.get(self.kube_version, params=payload, filter=filter, cache='kubernetes_versions')
 
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
+    def wait(self, ids: list, state: str = 'ACTIVE', timeout: float = 600, callback=None) -> dict:
+        """
+        Function to wait for clusters to reach a state, all the waits of this object share one poller that
+        lists the clusters once per tick instead of retrieving each one, the pages after the first are only
+        requested while a tracked cluster is not found yet or a deletion is waited for
+        :param ids: ids of the clusters
+        :param state: the target status, None waits for the deletion (optional, default ACTIVE)
+        :param timeout: seconds before the future of one of them fails with TimeoutError (optional, default 600)
+        :param callback: callable receiving the future of each one once it is done (optional)
+        :return: dict of id to concurrent.futures.Future resolving to the object json
+        """
+        if self._waiter is None:
+            url = self.get_url()
+            self._waiter = Waiter(fetch_page=lambda page: self.transport.get(url, params={'page': page,
+                                                                                          'per_page': 100}))
 
-        return r.json()
+        return self._waiter.wait(ids, state=state, timeout=timeout, callback=callback)
@@ -1,18 +1,77 @@
-import requests
+import threading
 
-from .utils import filter_list
+from .exceptions import CIVOAPIError
+from .instrumentation import traced
+from .transport import Transport
+from .utils import BulkResult, region_url, run_bulk
 
+# settings of a balancer sent again with its backends, so a change of backends keeps them
+_SETTINGS = ('hostname', 'max_request_size', 'policy', 'health_check_path', 'fail_timeout', 'max_conns',
+             'ignore_invalid_backend_tls')
 
+
+def _flatten_backends(backends: list) -> dict:
+    # the api takes the backends as form fields like backends[0][instance_id]
+    payload = {}
+
+    for number, backend in enumerate(backends):
+        for value in backend:
+            payload['backends[{}][{}]'.format(number, value)] = backend[value]
+
+    return payload
+
+
+def backend_key(backend: dict) -> tuple:
+    """
+    Function to get the identity of a backend
+    :param backend: backend with instance_id, protocol and port
+    :return: (instance_id, protocol, port)
+    """
+    return str(backend.get('instance_id')), str(backend.get('protocol') or ''), str(backend.get('port') or '')
+
+
+class _Ticket:
+    # result of a queued change, set by the flush that sends it
+    __slots__ = ('result',)
+
+    def __init__(self):
+        self.result = None
+
+
+@traced
 class LoadBalance:
     """
     If you want to create a load balancer for your instances, to spread your web traffic
     between them then you can easily launch a managed load balancer service on Civo.
     """
+    # held while the changes of one balancer are coalesced, sent and settled
+    _lock_type = threading.Lock
 
-    def __init__(self, headers, api_url, region):
+    def __init__(self, headers, api_url, region, transport=None):
         param = "?region={region}".format(region=region) if region else ''
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{api_url}/v2/loadbalancers{param}'.format(api_url=api_url, param=param)
+        self._base_url = '{}/v2/loadbalancers'.format(api_url)
+        self.region = region
+        # last known balancers by id and the backend changes not sent yet
+        self._views = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flushing = {}
+        # updates settled so far, and the count when the view of each balancer was last settled, so a listing
+        # sent before an update does not overwrite its view
+        self._settles = 0
+        self._settled = {}
+
+    def get_url(self, path: str = None, region: str = None) -> str:
+        """
+        Function to build the url of the api, with the region in the query
+        :param path: path appended to the url of the loadbalancers, e.g. '/{id}' (optional)
+        :param region: region of the call (optional, default the region of the class)
+        :return: str
+        """
+        return region_url(self._base_url, path, region if region else self.region)
 
     def create(self, backends: list, hostname: str = None, tls_certificate: str = None,
                tls_key: str = None,
@@ -38,11 +97,7 @@ class LoadBalance:
         :return: object json
         """
 
-        payload = {}
-
-        for number, backend in enumerate(backends):
-            for value in backend:
-                payload['backends[{}][{}]'.format(number, value)] = backend[value]
+        payload = _flatten_backends(backends)
 
         if hostname:
             payload['hostname'] = hostname
@@ -71,9 +126,7 @@ class LoadBalance:
         if ignore_invalid_backend_tls:
             payload['ignore_invalid_backend_tls'] = ignore_invalid_backend_tls
 
-        r = requests.post(self.url, headers=self.headers, data=payload)
-
-        return r.json()
+        return self.transport.post(self.url, data=payload)
 
     def update(self, id: str, backends: list, hostname: str = None, tls_certificate: str = None,
                tls_key: str = None,
@@ -99,11 +152,7 @@ class LoadBalance:
         :return: object json
         """
 
-        payload = {}
-
-        for number, backend in enumerate(backends):
-            for value in backend:
-                payload['backends[{}][{}]'.format(number, value)] = backend[value]
+        payload = _flatten_backends(backends)
 
         if hostname:
             payload['hostname'] = hostname
@@ -132,9 +181,7 @@ class LoadBalance:
         if ignore_invalid_backend_tls:
             payload['ignore_invalid_backend_tls'] = ignore_invalid_backend_tls
 
-        r = requests.put(self.url + '/{}'.format(id), headers=self.headers, data=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}'.format(id)), data=payload)
 
     def search(self, filter: str = None) -> dict:
         """
@@ -143,13 +190,7 @@ class LoadBalance:
                        you can filter by any object that is inside the json
         :return: object json
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.url, filter=filter)
 
     def delete(self, id: str) -> dict:
         """
@@ -157,6 +198,203 @@ class LoadBalance:
         :param id: ID of the load balancer to delete
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(id), headers=self.headers)
+        return self.transport.delete(self.get_url('/{}'.format(id)))
+
+    def _store_views(self, balancers, since: int = None) -> dict:
+        # an error of the api is answered as a json object in place of the list
+        if isinstance(balancers, dict):
+            raise CIVOAPIError('Listing the load balancers failed: {}'.format(balancers.get('reason', balancers)),
+                               body=balancers)
+
+        with self._lock:
+            views = {balancer['id']: balancer for balancer in balancers}
+            for id, view in self._views.items():
+                if since is not None and id in views and self._settled.get(id, 0) > since:
+                    views[id] = view
+            self._views = views
+            return dict(self._views)
+
+    def refresh(self) -> dict:
+        """
+        Function to load the local view of the balancers and their backends, one call for all of them
+        :return: {'id': balancer}
+        """
+        since = self._settles
+        return self._store_views(self.search(), since)
+
+    def _ticket(self, id: str, action: str, backends: list) -> _Ticket:
+        ticket = _Ticket()
+
+        with self._lock:
+            self._pending.setdefault(id, []).append((action, list(backends), ticket))
+
+        return ticket
+
+    def _queue(self, id: str, action: str, backends: list, flush: bool):
+        ticket = self._ticket(id, action, backends)
+        if not flush:
+            return None
+
+        # the change may be sent by a flush already running for the balancer, the ticket holds its result
+        self.flush([id])
+        return _answer(ticket)
+
+    def add_backends(self, id: str, backends: list, flush: bool = True):
+        """
+        Function to add backends to a balancer, the backends it already has are kept
+        :param id: id of the load balancer
+        :param backends: backends to add, e.g. [{'instance_id': '8878789', 'protocol': 'https', 'port': 443}]
+        :param flush: send the change now, else it waits for flush with the other changes (optional, default True)
+        :return: BulkResult of the update when flushed, else None
+        :raise CIVOAPIError: when the update failed, the change is dropped
+        """
+        return self._queue(id, 'add', backends, flush)
+
+    def remove_backends(self, id: str, backends: list, flush: bool = True):
+        """
+        Function to remove backends from a balancer, the other backends are kept
+        :param id: id of the load balancer
+        :param backends: backends to remove, matched on instance_id, protocol and port
+        :param flush: send the change now, else it waits for flush with the other changes (optional, default True)
+        :return: BulkResult of the update when flushed, else None
+        :raise CIVOAPIError: when the update failed, the change is dropped
+        """
+        return self._queue(id, 'remove', backends, flush)
+
+    def _coalesce(self, ids: list = None) -> list:
+        """
+        Take the pending changes of the balancers and fold them over their known backends, one plan per balancer
+        """
+        plans = []
+
+        with self._lock:
+            for id in list(ids if ids is not None else self._pending):
+                changes = self._pending.pop(id, None)
+                if not changes:
+                    continue
+
+                balancer = self._views.get(id)
+                if balancer is None:
+                    plans.append((id, None, None, changes))
+                    continue
+
+                backends = {backend_key(backend): backend for backend in balancer.get('backends') or []}
+                current = list(backends)
+                for action, delta, _ in changes:
+                    for backend in delta:
+                        if action == 'add':
+                            backends.setdefault(backend_key(backend), backend)
+                        else:
+                            backends.pop(backend_key(backend), None)
+
+                plans.append((id, balancer, list(backends.values()) if list(backends) != current else None,
+                              changes))
+
+        return plans
+
+    def _send(self, plan: tuple):
+        id, balancer, backends, _ = plan
+        settings = {key: balancer[key] for key in _SETTINGS if balancer.get(key) is not None}
+
+        return self.update(id, backends, **settings)
+
+    def _settle(self, plans: list, results: list) -> dict:
+        """
+        Update the local view with the answers, the changes of a failed update are dropped with the view
+        """
+        settled = {}
+        answers = {result.item[0]: result for result in results}
+
+        with self._lock:
+            for plan in plans:
+                id, balancer, backends, changes = plan
+                result = answers.get(id)
+
+                if balancer is None:
+                    result = BulkResult(id, None, CIVOAPIError('Unknown load balancer {}'.format(id)))
+                elif result is None:
+                    # the changes cancel each other, no call was needed
+                    result = BulkResult(id, None, None)
+                elif result.error is None and isinstance(result.result, dict) and 'reason' in result.result:
+                    result = result._replace(error=CIVOAPIError('Updating the load balancer {} failed: {}'.format(
+                        id, result.result['reason']), body=result.result))
+
+                if result.error is None:
+                    if backends is not None:
+                        self._views[id] = dict(balancer, backends=backends)
+                        self._settles += 1
+                        self._settled[id] = self._settles
+                else:
+                    # the backends of the balancer are unsure now, the next flush lists them again
+                    self._views.pop(id, None)
+
+                settled[id] = BulkResult(id, result.result, result.error)
+                for _, _, ticket in changes:
+                    ticket.result = settled[id]
+
+        return settled
+
+    def _sendable(self, plans: list) -> list:
+        return [plan for plan in plans if plan[1] is not None and plan[2] is not None]
+
+    def _missing(self, ids: list = None) -> bool:
+        with self._lock:
+            return any(id not in self._views for id in (ids if ids is not None else self._pending))
+
+    def _flush_lock(self, id: str):
+        with self._lock:
+            lock = self._flushing.get(id)
+            if lock is None:
+                lock = self._flushing[id] = self._lock_type()
+            return lock
+
+    def _flush_one(self, id: str) -> BulkResult:
+        # one flush at a time per balancer, the next one plans from the view the previous one settled
+        with self._flush_lock(id):
+            plans = self._coalesce([id])
+            results = []
+
+            for plan in self._sendable(plans):
+                try:
+                    results.append(BulkResult(plan, self._send(plan), None))
+                except Exception as error:
+                    results.append(BulkResult(plan, None, error))
+
+            return self._settle(plans, results).get(id)
+
+    def flush(self, ids: list = None, concurrency: int = 10) -> dict:
+        """
+        Function to send the pending backend changes, the changes of one balancer are coalesced in a single
+        update and the balancers are updated at the same time, one update at a time per balancer. The balancers
+        are listed once when one of them is not in the local view yet.
+        :param ids: ids of the load balancers to flush (optional, default all with pending changes)
+        :param concurrency: maximum number of balancers updated at the same time (optional, default 10)
+        :return: {'id': BulkResult}, the result is None when the changes cancel each other, the changes of a
+                 balancer whose update failed are dropped and the error is in its BulkResult
+        """
+        if self._missing(ids):
+            self.refresh()
+
+        with self._lock:
+            ids = list(ids if ids is not None else self._pending)
+
+        return _flushed(run_bulk(self._flush_one, ids, concurrency=concurrency))
+
+
+def _answer(ticket: _Ticket) -> BulkResult:
+    if ticket.result is not None and ticket.result.error is not None:
+        raise ticket.result.error
+    return ticket.result
+
+
+def _flushed(results: list) -> dict:
+    settled = {}
+
+    for result in results:
+        if result.error is not None:
+            raise result.error
+        # nothing was pending for the balancer, e.g. its changes were sent by another flush
+        if result.result is not None:
+            settled[result.item] = result.result
 
-        return r.json()
+    return settled
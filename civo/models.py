@@ -0,0 +1,217 @@
+"""
+File with the compact typed results returned by the search methods called with model=True
+"""
+import json
+import sys
+
+_intern = sys.intern
+_missing = object()
+_PLAIN, _INTERNED, _LAZY = 'plain', 'interned', 'lazy'
+# one shared encoding of the empty containers, most records have nothing in their nested fields
+_EMPTY = {list: b'[]', dict: b'{}'}
+
+
+def _slots(fields: tuple, lazy: tuple = ()) -> tuple:
+    # lazy fields keep their compact json in a private slot named after them
+    return fields + tuple('_' + name for name in lazy)
+
+
+class _Lazy:
+    """
+    Nested field kept as compact json bytes and decoded each time it is read, so a record that is never
+    inspected in depth does not hold its nested dicts and lists. Plain values are stored as they are.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.slot = '_' + name
+
+    def __get__(self, record, owner=None):
+        if record is None:
+            return self
+
+        raw = getattr(record, self.slot, None)
+        return json.loads(raw) if isinstance(raw, bytes) else raw
+
+
+class Model:
+    """
+    Record of the api stored in __slots__ instead of a dict. The values of the INTERNED fields are interned so
+    the thousands of records of an inventory share a single 'lon1' or 'ACTIVE' string, the LAZY fields are kept
+    as compact json until they are read and any key the model does not know is kept aside. The records can
+    still be read like the dicts of the api with record['key'] or record.get('key').
+    """
+    __slots__ = ('_extra',)
+
+    FIELDS = ()
+    INTERNED = frozenset()
+    LAZY = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.LAZY:
+            setattr(cls, name, _Lazy(name))
+
+        # how each key is stored, looked up once per key instead of three membership tests
+        cls._kinds = {key: _PLAIN for key in cls.FIELDS}
+        cls._kinds.update((key, _INTERNED) for key in cls.INTERNED)
+        cls._kinds.update((key, _LAZY) for key in cls.LAZY)
+
+    def __init__(self, data: dict):
+        """
+        Init for Model class
+        :param data: decoded json object of the api
+        """
+        extra = None
+        kinds = self._kinds
+        set_field = object.__setattr__
+
+        for key, value in data.items():
+            kind = kinds.get(key)
+            if kind is _PLAIN:
+                set_field(self, key, value)
+            elif kind is _INTERNED:
+                if value.__class__ is str:
+                    value = _intern(value)
+                elif value.__class__ is list:
+                    value = tuple(_intern(v) if v.__class__ is str else v for v in value)
+                set_field(self, key, value)
+            elif kind is _LAZY:
+                if value.__class__ is list or value.__class__ is dict:
+                    value = json.dumps(value, separators=(',', ':')).encode('utf-8') if value else _EMPTY[value.__class__]
+                set_field(self, '_' + key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+
+        self._extra = extra
+
+    def get(self, key: str, default=None):
+        """
+        Function to read a field like dict.get
+        :param key: name of the field
+        :param default: value returned when the record has no such field (optional)
+        """
+        if key in self.FIELDS:
+            return getattr(self, key, default)
+
+        if key in self.LAZY:
+            return getattr(self, key) if hasattr(self, '_' + key) else default
+
+        return self._extra.get(key, default) if self._extra else default
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _missing) is not _missing
+
+    def to_dict(self) -> dict:
+        """
+        Function to get the record back as the dict of the api
+        :return: dict
+        """
+        data = {}
+        for key in self.FIELDS + self.LAZY:
+            value = self.get(key, _missing)
+            if value is not _missing:
+                data[key] = list(value) if isinstance(value, tuple) else value
+
+        if self._extra:
+            data.update(self._extra)
+
+        return data
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return '{}(id={!r})'.format(type(self).__name__, self.get('id', self.get('name')))
+
+
+class Instance(Model):
+    FIELDS = ('id', 'hostname', 'reverse_dns', 'size', 'region', 'network_id', 'private_ip', 'public_ip',
+              'pseudo_ip', 'template_id', 'source_type', 'source_id', 'snapshot_id', 'initial_user',
+              'initial_password', 'ssh_key', 'status', 'firewall_id', 'tags', 'cpu_cores', 'ram_mb', 'disk_gb',
+              'created_at')
+    INTERNED = frozenset(('size', 'region', 'network_id', 'template_id', 'source_type', 'source_id', 'initial_user',
+                          'status', 'firewall_id', 'tags'))
+    LAZY = ('script', 'notes', 'civostatsd_stats', 'civostatsd_stats_per_minute', 'civostatsd_stats_per_hour')
+    __slots__ = _slots(FIELDS, LAZY)
+
+
+class Cluster(Model):
+    FIELDS = ('id', 'name', 'version', 'status', 'ready', 'num_target_nodes', 'target_nodes_size', 'built_at',
+              'kubernetes_version', 'api_endpoint', 'master_ip', 'dns_entry', 'network_id', 'firewall_id', 'tags',
+              'created_at')
+    INTERNED = frozenset(('version', 'status', 'target_nodes_size', 'kubernetes_version', 'network_id',
+                          'firewall_id', 'tags'))
+    LAZY = ('kubeconfig', 'instances', 'installed_applications', 'pools')
+    __slots__ = _slots(FIELDS, LAZY)
+
+
+class Volume(Model):
+    FIELDS = ('id', 'name', 'instance_id', 'network_id', 'mountpoint', 'status', 'size_gb', 'bootable', 'region',
+              'created_at')
+    INTERNED = frozenset(('network_id', 'status', 'region'))
+    __slots__ = _slots(FIELDS)
+
+
+class Network(Model):
+    FIELDS = ('id', 'name', 'label', 'default', 'region', 'cidr', 'status')
+    INTERNED = frozenset(('region', 'cidr', 'status'))
+    __slots__ = _slots(FIELDS)
+
+
+class Firewall(Model):
+    FIELDS = ('id', 'name', 'rules_count', 'instances_count', 'region', 'network_id', 'default')
+    INTERNED = frozenset(('region', 'network_id'))
+    LAZY = ('rules',)
+    __slots__ = _slots(FIELDS, LAZY)
+
+
+class Size(Model):
+    FIELDS = ('name', 'nice_name', 'type', 'cpu_cores', 'ram_mb', 'disk_gb', 'description', 'selectable')
+    INTERNED = frozenset(('name', 'type'))
+    __slots__ = _slots(FIELDS)
+
+
+def build(result, model: type):
+    """
+    Function to turn the decoded json of a search into models, the pagination of a page is kept
+    :param result: a list, a page dict with 'items', a single object, a stream of objects or an awaitable of one
+    :param model: the Model class to build, e.g. Instance
+    :return: the same shape with a model in place of each object
+    """
+    if hasattr(result, '__await__'):
+        return _build_async(result, model)
+
+    if hasattr(result, '__next__'):
+        return (model(item) for item in result)
+
+    if hasattr(result, '__anext__'):
+        return _build_stream(result, model)
+
+    if isinstance(result, list):
+        return [model(item) for item in result]
+
+    if isinstance(result, dict) and isinstance(result.get('items'), list):
+        page = dict(result)
+        page['items'] = [model(item) for item in result['items']]
+        return page
+
+    return model(result) if isinstance(result, dict) else result
+
+
+async def _build_async(result, model: type):
+    return build(await result, model)
+
+
+async def _build_stream(result, model: type):
+    async for item in result:
+        yield model(item)
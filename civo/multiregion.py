@@ -0,0 +1,117 @@
+"""
+File to query every region of the account at once, one call per region sent concurrently over the shared pool
+"""
+import importlib
+from collections import namedtuple
+
+from .exceptions import CIVOAPIError
+from .regions import Regions
+from .transport import Transport
+from .utils import run_bulk
+
+# items of all the regions tagged with their region, and the error of each region that failed
+RegionResult = namedtuple('RegionResult', ['items', 'errors'])
+
+
+class MultiRegion:
+    """
+    Fan out a search to all the regions, or to a chosen subset, and merge the answers. The regions are
+    queried at the same time so a global inventory takes about the latency of the slowest region instead
+    of the sum of all of them, and a region that fails does not hide the items of the others.
+    """
+    # name of the resource: module, class and the method listing every item of one region
+    RESOURCES = {
+        'instances': ('.intances', 'Instances', 'iter_all'),
+        'kubernetes': ('.kubernetes', 'Kubernetes', 'iter_all'),
+        'volumes': ('.volumes', 'Volumes', 'search'),
+        'loadbalance': ('.loadbalance', 'LoadBalance', 'search'),
+        'networks': ('.networks', 'Networks', 'search'),
+        'firewalls': ('.firewall', 'Firewall', 'search'),
+        'snapshots': ('.snapshots', 'Snapshots', 'search'),
+    }
+
+    def __init__(self, headers, api_url, transport=None, resolver=None):
+        self.headers = headers
+        self.api_url = api_url
+        self.transport = transport if transport else Transport(headers)
+        self.resolver = resolver
+        self._regions = Regions(headers, api_url, transport=self.transport)
+
+    def regions(self) -> list:
+        """
+        Function to list the codes of the regions, the list of regions is served from the cache of the client
+        :return: list, e.g. ['lon1', 'nyc1']
+        :raise CIVOAPIError: when the regions could not be listed
+        """
+        return _codes(self._regions.search())
+
+    def resource(self, name: str, region: str):
+        """
+        Function to build the resource of one region, it shares the transport and resolver of the client
+        :param name: name of the resource, one of RESOURCES
+        :param region: the civo region
+        :return: the resource object
+        """
+        if name not in self.RESOURCES:
+            raise ValueError('Invalid resource {}, use one of {}'.format(name, ', '.join(self.RESOURCES)))
+
+        module, class_name, _ = self.RESOURCES[name]
+        resource_class = getattr(importlib.import_module(module, __package__), class_name)
+        kwargs = {'resolver': self.resolver} if name in ('instances', 'kubernetes') and self.resolver else {}
+
+        return resource_class(self.headers, self.api_url, region, transport=self.transport, **kwargs)
+
+    def _list(self, name: str, region: str, filter: str = None) -> list:
+        method = getattr(self.resource(name, region), self.RESOURCES[name][2])
+
+        return _tag(method(filter=filter), region)
+
+    def search(self, resource: str, regions: list = None, filter: str = None, concurrency: int = None) -> RegionResult:
+        """
+        Function to list a resource in several regions at the same time
+        :param resource: instances, kubernetes, volumes, loadbalance, networks, firewalls or snapshots
+        :param regions: codes of the regions to query (optional, default every region of the account)
+        :param filter: Filter json object the format is 'status:ACTIVE', applied in each region (optional)
+        :param concurrency: maximum number of regions queried at the same time (optional, default the pool size)
+        :return: RegionResult(items=[...], errors={'region': exception}), each item has its 'region'
+        """
+        if resource not in self.RESOURCES:
+            raise ValueError('Invalid resource {}, use one of {}'.format(resource, ', '.join(self.RESOURCES)))
+
+        regions = list(regions) if regions else self.regions()
+        concurrency = concurrency if concurrency else getattr(self.transport, 'pool_maxsize', 10)
+
+        results = run_bulk(lambda region: self._list(resource, region, filter), regions, concurrency=concurrency)
+
+        return _merge(results)
+
+
+def _codes(regions) -> list:
+    # an error of the api is answered as a json object in place of the list
+    if isinstance(regions, dict) and 'reason' in regions:
+        raise CIVOAPIError('Listing the regions failed: {}'.format(regions['reason']), body=regions)
+
+    return [region['code'] for region in regions]
+
+
+def _tag(items, region: str) -> list:
+    # an error of the api is answered as a json object in place of the list
+    if isinstance(items, dict):
+        raise CIVOAPIError('{} failed: {}'.format(region, items.get('reason', items)), body=items)
+
+    # the api only sets the region on some of the resources, the records are copied as they can be shared with
+    # the cache or the other callers of a coalesced request
+    return [dict(item, region=region) if isinstance(item, dict) and 'region' not in item else item
+            for item in items]
+
+
+def _merge(results: list) -> RegionResult:
+    items, errors = [], {}
+
+    for result in results:
+        if result.error is not None:
+            errors[result.item] = result.error
+        else:
+            items.extend(result.result)
+
+    return RegionResult(items, errors)
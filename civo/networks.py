@@ -1,18 +1,32 @@
-import requests
-
-from .utils import filter_list
+from . import models
+from .instrumentation import traced
+from .transport import Transport
+from .utils import region_url
 
 
+@traced
 class Networks:
     """
     To manage the private networks for an account, there are a set of APIs for listing them, as well as adding,
     renaming and removing them by ID.
     """
 
-    def __init__(self, headers, api_url, region):
+    def __init__(self, headers, api_url, region, transport=None):
         param = "?region={region}".format(region=region) if region else ''
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{api_url}/v2/networks{param}'.format(api_url=api_url, param=param)
+        self._base_url = '{}/v2/networks'.format(api_url)
+        self.region = region
+
+    def get_url(self, path: str = None, region: str = None) -> str:
+        """
+        Function to build the url of the api, with the region in the query
+        :param path: path appended to the url of the networks, e.g. '/{id}' (optional)
+        :param region: region of the call (optional, default the region of the class)
+        :return: str
+        """
+        return region_url(self._base_url, path, region if region else self.region)
 
     def create(self, label: str) -> dict:
         """
@@ -21,15 +35,14 @@ class Networks:
         :return: object json
         """
         payload = {'label': label}
-        r = requests.post(self.url, headers=self.headers, params=payload)
+        return self.transport.post(self.url, params=payload)
 
-        return r.json()
-
-    def search(self, filter: str = None) -> dict:
+    def search(self, filter: str = None, model: bool = False) -> dict:
         """
         Function to listing the private networks
         :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
                        you can filter by any object that is inside the json
+        :param model: return Network models instead of dicts (optional, default False)
         :return: [
                   {
                     "id": "50f2fffa-f81e-4e96-830f-e78f7e565e6f",
@@ -41,13 +54,9 @@ class Networks:
                   }
                 ]
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
+        result = self.transport.get(self.url, filter=filter)
 
-        return r.json()
+        return models.build(result, models.Network) if model else result
 
     def rename(self, id: str, label: str) -> dict:
         """
@@ -57,15 +66,11 @@ class Networks:
         :return: object json
         """
         payload = {'label': label}
-        r = requests.put(self.url + '/{}'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}'.format(id)), params=payload)
 
     def delete(self, id: str) -> dict:
         """
         Function to removing a private network
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.delete(self.get_url('/{}'.format(id)))
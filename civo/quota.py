@@ -1,6 +1,8 @@
-import requests
+from .instrumentation import traced
+from .transport import Transport
 
 
+@traced
 class Quota:
     """
     Our quotas (and therefore our pricing), are based on a combined allocation of CPU, RAM and disk.
@@ -8,8 +10,9 @@ class Quota:
     handled correctly or after a call to our offices, we can increase this quota.
     """
 
-    def __init__(self, headers, api_url):
+    def __init__(self, headers, api_url, transport=None):
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{}/v2/quota'.format(api_url)
 
     def get(self,name:str = None) -> dict:
@@ -21,6 +24,4 @@ class Quota:
         params = {}
         if name:
             params = {"name":name}
-        r = requests.get(self.url, headers=self.headers,params=params)
-
-        return r.json()
+        return self.transport.get(self.url, params=params)
@@ -0,0 +1,295 @@
+"""
+File to receive the webhooks of the account on a local http server and hand them to handlers in batches
+"""
+import hashlib
+import hmac
+import http.client
+import json
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from .utils import print_err
+
+DEFAULT_HEADER = 'X-Civo-Signature'
+
+
+def sign(secret: str, body: bytes) -> str:
+    """
+    Function to sign a webhook body
+    :param secret: secret of the webhook
+    :param body: raw body of the request
+    :return: hex digest of the HMAC-SHA256 of the body
+    """
+    return hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+
+def verify(secret: str, body: bytes, signature: str) -> bool:
+    """
+    Function to check the signature of a webhook body in constant time, a 'sha256=' prefix is accepted
+    :param secret: secret of the webhook
+    :param body: raw body of the request
+    :param signature: value of the signature header
+    :return: bool
+    """
+    if not signature:
+        return False
+
+    if signature.startswith('sha256='):
+        signature = signature[7:]
+
+    return hmac.compare_digest(sign(secret, body), signature.strip().lower())
+
+
+def synthetic_event(event: str = 'test', **data) -> dict:
+    """
+    Function to build a synthetic event like the ones sent by WebHook.test
+    :param event: type of the event, e.g. 'instance.created'
+    :param data: fields of the event
+    :return: dict
+    """
+    return dict({'id': str(uuid.uuid4()), 'event': event, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                                                                          time.gmtime())}, **data)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive, a sender can post many events on one connection
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, status: int, headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        length = int(self.headers.get('Content-Length') or 0)
+
+        if length > receiver.max_body:
+            self.close_connection = True
+            return self._answer(413)
+
+        body = self.rfile.read(length)
+        if urlsplit(self.path).path != receiver.path:
+            return self._answer(404)
+
+        self._answer(*receiver.receive(body, self.headers.get(receiver.header)))
+
+
+class WebhookReceiver:
+    """
+    Local http server for the webhooks of the account. Each POST is checked against the HMAC-SHA256 signature
+    of the webhook secret, decoded and put on a bounded queue, and the request is answered at once. A dispatcher
+    takes the events from the queue in batches, grouped by type, and calls the handlers on a pool of workers.
+    When the handlers fall behind the queue fills up and the server answers 503 with a Retry-After, so the
+    sender retries later instead of the process growing without bound.
+    """
+
+    def __init__(self, secret: str, host: str = '127.0.0.1', port: int = 0, path: str = '/',
+                 header: str = DEFAULT_HEADER, queue_size: int = 10000, batch_size: int = 100,
+                 batch_wait: float = 0.05, workers: int = 4, max_body: int = 2 ** 20, type_key: str = 'event'):
+        """
+        Init for WebhookReceiver class
+        :param secret: secret of the webhook, as given to WebHook.create
+        :param host: address to listen on (optional, default 127.0.0.1)
+        :param port: port to listen on (optional, default a free port, see url)
+        :param path: path of the webhook url (optional, default '/')
+        :param header: header holding the signature (optional, default X-Civo-Signature)
+        :param queue_size: requests waiting for the handlers before new ones are refused with 503 (optional,
+                           default 10000)
+        :param batch_size: events gathered before a batch is dispatched (optional, default 100)
+        :param batch_wait: seconds a batch waits for more events before it is dispatched (optional, default 0.05)
+        :param workers: threads running the handlers (optional, default 4)
+        :param max_body: bytes accepted in one request (optional, default 1 MiB)
+        :param type_key: key of the event holding its type (optional, default 'event')
+        """
+        self.secret = secret
+        self.path = path
+        self.header = header
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.workers = workers
+        self.max_body = max_body
+        self.type_key = type_key
+        self.handlers = {}
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.counters = {'received': 0, 'rejected': 0, 'invalid': 0, 'refused': 0, 'dispatched': 0, 'batches': 0,
+                         'errors': 0}
+        self._counters_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.receiver = self
+        self._threads = []
+        self._pool = None
+        # batches handed to the pool and not finished, bounded so a slow handler holds the queue back
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._stop = threading.Event()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}{}'.format(host, port, self.path)
+
+    def on(self, event: str, handler):
+        """
+        Function to register a handler
+        :param event: type of the events given to the handler, e.g. 'instance.created', or '*' for every event
+        :param handler: callable receiving a list of events
+        """
+        self.handlers.setdefault(event, []).append(handler)
+        return handler
+
+    def _count(self, name: str, value: int = 1):
+        with self._counters_lock:
+            self.counters[name] += value
+
+    def receive(self, body: bytes, signature: str) -> tuple:
+        """
+        Function to check and queue the body of one request, called by the server
+        :param body: raw body of the request
+        :param signature: value of the signature header
+        :return: (status, headers) of the answer
+        """
+        if not verify(self.secret, body, signature):
+            self._count('rejected')
+            return 401, None
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._count('invalid')
+            return 400, None
+
+        # the events of one request are queued together, a refused request is retried whole by the sender
+        events = payload if isinstance(payload, list) else [payload]
+        try:
+            self.queue.put_nowait(events)
+        except queue.Full:
+            self._count('refused')
+            return 503, {'Retry-After': '1'}
+
+        self._count('received', len(events))
+        return 202, None
+
+    def _batches(self):
+        while not self._stop.is_set() or not self.queue.empty():
+            try:
+                batch = list(self.queue.get(timeout=0.1))
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                try:
+                    batch.extend(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            yield batch
+
+    def _dispatch(self):
+        for batch in self._batches():
+            groups = {}
+            for event in batch:
+                kind = event.get(self.type_key) if isinstance(event, dict) else None
+                groups.setdefault(kind, []).append(event)
+
+            for kind, events in groups.items():
+                for handler in self.handlers.get(kind, []) + self.handlers.get('*', []):
+                    self._slots.acquire()
+                    self._pool.submit(self._run, handler, events)
+
+            self._count('dispatched', len(batch))
+            self._count('batches')
+
+    def _run(self, handler, events: list):
+        try:
+            handler(events)
+        except Exception as error:
+            self._count('errors')
+            print_err('civo webhook handler {!r} failed: {}'.format(handler, error))
+        finally:
+            self._slots.release()
+
+    def start(self):
+        """
+        Function to start the server, the dispatcher and the workers in background threads
+        """
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='civo-webhook')
+        self._threads = [threading.Thread(target=self._server.serve_forever, name='civo-webhook-server', daemon=True),
+                         threading.Thread(target=self._dispatch, name='civo-webhook-dispatch', daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """
+        Function to stop receiving, the events already queued are still given to the handlers
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        """
+        Function to get the counters of the receiver
+        :return: dict
+        """
+        with self._counters_lock:
+            return dict(self.counters, queued=self.queue.qsize())
+
+    def test(self, event: str = 'test', **data) -> int:
+        """
+        Function to post a signed synthetic event to the receiver, like WebHook.test does from the api
+        :param event: type of the event
+        :param data: fields of the event
+        :return: http status of the answer
+        """
+        return deliver(self.url, self.secret, synthetic_event(event, **data), header=self.header)
+
+
+def deliver(url: str, secret: str, events, header: str = DEFAULT_HEADER, connection=None) -> int:
+    """
+    Function to post signed events to a receiver, to test the handlers without the api
+    :param url: url of the receiver
+    :param secret: secret of the webhook
+    :param events: an event, or a list of events sent in one request
+    :param header: header holding the signature (optional, default X-Civo-Signature)
+    :param connection: http.client.HTTPConnection reused between calls (optional)
+    :return: http status of the answer
+    """
+    parts = urlsplit(url)
+    body = json.dumps(events).encode('utf-8')
+    own = connection is None
+    connection = connection if connection else http.client.HTTPConnection(parts.hostname, parts.port)
+
+    try:
+        connection.request('POST', parts.path or '/', body=body,
+                           headers={'Content-Type': 'application/json', header: sign(secret, body)})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        if own:
+            connection.close()
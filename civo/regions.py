@@ -1,8 +1,8 @@
-import requests
-
-from .utils import filter_list
+from .instrumentation import traced
+from .transport import Transport
 
 
+@traced
 class Regions:
     """
     Civo will be hosted in multiple datacentres (a.k.a. regions), with more coming online all the time.
@@ -11,8 +11,9 @@ class Regions:
     region if you don't care.
     """
 
-    def __init__(self, headers, api_url):
+    def __init__(self, headers, api_url, transport=None):
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{}/v2/regions'.format(api_url)
 
     def search(self, filter: str = None) -> dict:
@@ -22,10 +23,4 @@ class Regions:
                        you can filter by any object that is inside the json
         :return: object json
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.url, filter=filter, cache='regions')
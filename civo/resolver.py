@@ -0,0 +1,187 @@
+"""
+File to resolve names, labels and ids of networks, firewalls, ssh keys and sizes
+"""
+import re
+import threading
+import time
+
+from .exceptions import CIVOAPIError
+
+# kind: (path, regional, keys indexed)
+KINDS = {
+    'networks': ('/v2/networks', True, ('id', 'name', 'label')),
+    'firewalls': ('/v2/firewalls', True, ('id', 'name')),
+    'sshkeys': ('/v2/sshkeys', False, ('id', 'name')),
+    'sizes': ('/v2/sizes', False, ('name', 'id')),
+}
+
+_UUID = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
+
+def _resolved(kind: str, ref: str) -> bool:
+    # the api takes the name of a size (e.g. g3.small) and the id of everything else, those need no lookup
+    if not ref:
+        return False
+
+    if kind == 'sizes':
+        return '.' in ref and not _UUID.match(ref)
+
+    return bool(_UUID.match(ref))
+
+
+class Resolver:
+    """
+    Keep per-region hash indexes from name, label or id to each network, firewall, ssh key and size, so
+    the create calls resolve references in O(1) without listing the resource every time. An index is
+    loaded on first use, reloaded once its ttl expires and on a miss, at most every min_refresh seconds.
+    """
+
+    def __init__(self, transport, api_url: str, ttl: int = 300, min_refresh: int = 5):
+        """
+        Init for Resolver class
+        :param transport: the transport used to list the resources
+        :param api_url: url of the civo api
+        :param ttl: seconds an index is trusted before it is loaded again (optional, default 300)
+        :param min_refresh: minimum seconds between two loads of the same index on a miss (optional, default 5)
+        """
+        self.transport = transport
+        self.api_url = api_url
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _request(self, kind: str, region: str = None):
+        path, regional, _ = KINDS[kind]
+        params = {'region': region} if regional and region else None
+
+        return self.transport.get(self.api_url + path, params=params)
+
+    def _store(self, kind: str, region: str, records) -> dict:
+        keys = KINDS[kind][2]
+
+        # an error of the api is answered as a json object in place of the list
+        if isinstance(records, dict) and 'reason' in records:
+            raise CIVOAPIError('Listing the {} failed: {}'.format(kind, records['reason']), body=records)
+
+        records = records['items'] if isinstance(records, dict) else records
+
+        index = {}
+        default = None
+        for record in records:
+            for key in keys:
+                if not record.get(key):
+                    continue
+                # an id always wins over a name or label that happens to look the same
+                if key == 'id':
+                    index[record[key]] = record
+                else:
+                    index.setdefault(record[key], record)
+            if record.get('default'):
+                default = record
+
+        entry = {'index': index, 'default': default, 'loaded': time.monotonic()}
+        with self._lock:
+            self._indexes[(kind, region)] = entry
+
+        return entry
+
+    def _stale(self, entry: dict, refresh: bool = False) -> bool:
+        if entry is None:
+            return True
+
+        age = time.monotonic() - entry['loaded']
+        return age > self.ttl or (refresh and age > self.min_refresh)
+
+    def _entry(self, kind: str, region: str = None, refresh: bool = False) -> dict:
+        region = region if KINDS[kind][1] else None
+        entry = self._indexes.get((kind, region))
+
+        if self._stale(entry, refresh):
+            entry = self._store(kind, region, self._request(kind, region))
+
+        return entry
+
+    @staticmethod
+    def _pick(kind: str, entry: dict, ref: str = None):
+        if not ref:
+            if entry['default'] is None:
+                raise CIVOAPIError('No default {} found'.format(kind[:-1]))
+            return entry['default']
+
+        return entry['index'].get(ref)
+
+    def find(self, kind: str, ref: str = None, region: str = None) -> dict:
+        """
+        Function to find a resource by name, label or id
+        :param kind: one of networks, firewalls, sshkeys or sizes
+        :param ref: the name, label or id, when empty the default resource is returned (e.g. the default network)
+        :param region: the region of the resource, ignored for ssh keys and sizes (optional)
+        :return: object json
+        """
+        record = self._pick(kind, self._entry(kind, region), ref)
+
+        if record is None:
+            record = self._pick(kind, self._entry(kind, region, refresh=True), ref)
+
+        if record is None:
+            raise CIVOAPIError('{} {} not found'.format(kind[:-1].capitalize(), ref))
+
+        return record
+
+    def resolve(self, kind: str, ref: str = None, region: str = None) -> str:
+        """
+        Function to resolve a name, label or id to the identifier expected by the api, the name for sizes
+        and the id for everything else, a ref that already is one (a size name or an uuid) is returned as is
+        :param kind: one of networks, firewalls, sshkeys or sizes
+        :param ref: the name, label or id, when empty the default resource is used
+        :param region: the region of the resource, ignored for ssh keys and sizes (optional)
+        :return: str
+        """
+        if _resolved(kind, ref):
+            return ref
+
+        return self.find(kind, ref, region)['name' if kind == 'sizes' else 'id']
+
+    def invalidate(self, kind: str = None, region: str = None):
+        """
+        Function to drop the indexes, so they are loaded again on the next lookup
+        :param kind: only drop this kind (optional, default all)
+        :param region: only drop this region (optional, default all)
+        """
+        with self._lock:
+            for key in list(self._indexes):
+                if (kind is None or key[0] == kind) and (region is None or key[1] == region):
+                    del self._indexes[key]
+
+
+class AsyncResolver(Resolver):
+    """
+    Asyncio counterpart of Resolver, find and resolve are coroutines
+    """
+
+    async def _entry(self, kind: str, region: str = None, refresh: bool = False) -> dict:
+        region = region if KINDS[kind][1] else None
+        entry = self._indexes.get((kind, region))
+
+        if self._stale(entry, refresh):
+            entry = self._store(kind, region, await self._request(kind, region))
+
+        return entry
+
+    async def find(self, kind: str, ref: str = None, region: str = None) -> dict:
+        record = self._pick(kind, await self._entry(kind, region), ref)
+
+        if record is None:
+            record = self._pick(kind, await self._entry(kind, region, refresh=True), ref)
+
+        if record is None:
+            raise CIVOAPIError('{} {} not found'.format(kind[:-1].capitalize(), ref))
+
+        return record
+
+    async def resolve(self, kind: str, ref: str = None, region: str = None) -> str:
+        if _resolved(kind, ref):
+            return ref
+
+        return (await self.find(kind, ref, region))['name' if kind == 'sizes' else 'id']
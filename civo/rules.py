@@ -0,0 +1,174 @@
+"""
+File to index the rules of a firewall by port range and address block, and to compute the changes between
+the rules of a firewall and a desired set
+"""
+import ipaddress
+from bisect import bisect_right
+from collections import namedtuple
+
+# one address block of a rule, the ports and the addresses are closed intervals of integers
+_Entry = namedtuple('_Entry', ['position', 'start', 'end', 'low', 'high'])
+
+# pairs of positions in the list of rules given to analyze_rules, the first rule of a pair is the one to drop
+RuleReport = namedtuple('RuleReport', ['duplicates', 'redundant', 'overlapping'])
+
+# rules to create and rules to delete
+RuleDiff = namedtuple('RuleDiff', ['create', 'delete'])
+
+
+def _port(value, default: int) -> int:
+    return int(value) if value not in (None, '') else default
+
+
+def _networks(cidr) -> tuple:
+    if not cidr:
+        cidr = '0.0.0.0/0'
+
+    blocks = cidr.split(',') if isinstance(cidr, str) else cidr
+    return tuple(sorted({ipaddress.ip_network(block.strip(), strict=False) for block in blocks if block.strip()},
+                        key=lambda network: (network.version, network.network_address, network.prefixlen)))
+
+
+def rule_key(rule: dict) -> tuple:
+    """
+    Function to get the identity of a rule, the label is not part of it
+    :param rule: rule of the api, or the arguments of Firewall.create_rule
+    :return: (direction, protocol, start_port, end_port, networks)
+    """
+    start = _port(rule.get('start_port'), 0)
+    end = _port(rule.get('end_port'), start if rule.get('start_port') not in (None, '') else 65535)
+
+    return ((rule.get('direction') or 'inbound').lower(), (rule.get('protocol') or 'tcp').lower(), start, end,
+            _networks(rule.get('cidr')))
+
+
+class RuleIndex:
+    """
+    Rules grouped by direction, protocol and ip version. Each group is sorted by start port with the running
+    maximum of the end ports, so the rules whose ports meet a range are found with a bisect and a short walk
+    back instead of comparing every pair of rules, and only those are compared on their address blocks.
+    """
+
+    def __init__(self, rules: list):
+        """
+        Init for RuleIndex class
+        :param rules: rules of the api, or the arguments of Firewall.create_rule
+        """
+        self.keys = [rule_key(rule) for rule in rules]
+        groups = {}
+
+        for position, (direction, protocol, start, end, networks) in enumerate(self.keys):
+            for network in networks:
+                entry = _Entry(position, start, end, int(network.network_address), int(network.broadcast_address))
+                groups.setdefault((direction, protocol, network.version), []).append(entry)
+
+        self._groups = {}
+        for group, entries in groups.items():
+            entries.sort(key=lambda entry: entry.start)
+            reach, highest = [], -1
+            for entry in entries:
+                highest = max(highest, entry.end)
+                reach.append(highest)
+            self._groups[group] = ([entry.start for entry in entries], reach, entries)
+
+    def _entries(self, position: int):
+        direction, protocol, start, end, networks = self.keys[position]
+
+        for network in networks:
+            yield (direction, protocol, network.version), _Entry(position, start, end, int(network.network_address),
+                                                                 int(network.broadcast_address))
+
+    def intersecting(self, position: int) -> dict:
+        """
+        Function to find the rules sharing ports and addresses with a rule
+        :param position: position of the rule
+        :return: {position of the other rule: True when it covers every block of the rule at that position}
+        """
+        found, covering = set(), {}
+        entries_of_rule = 0
+
+        for group, entry in self._entries(position):
+            starts, reach, entries = self._groups[group]
+            covered = set()
+            entries_of_rule += 1
+
+            index = bisect_right(starts, entry.end) - 1
+            while index >= 0 and reach[index] >= entry.start:
+                other = entries[index]
+                index -= 1
+
+                if other.position == position or other.end < entry.start or other.high < entry.low or \
+                        other.low > entry.high:
+                    continue
+
+                found.add(other.position)
+                if other.start <= entry.start and other.end >= entry.end and other.low <= entry.low and \
+                        other.high >= entry.high:
+                    covered.add(other.position)
+
+            for other in covered:
+                covering[other] = covering.get(other, 0) + 1
+
+        return {other: covering.get(other, 0) == entries_of_rule for other in found}
+
+
+def analyze_rules(rules: list) -> RuleReport:
+    """
+    Function to find the rules of a firewall that repeat, cover or overlap each other
+    :param rules: rules of the api, or the arguments of Firewall.create_rule
+    :return: RuleReport(duplicates=[(position, kept)], redundant=[(position, covering)], overlapping=[(a, b)])
+    """
+    index = RuleIndex(rules)
+    meets = [index.intersecting(position) for position in range(len(index.keys))]
+    duplicates, redundant, overlapping = [], [], []
+    first = {}
+
+    for position, key in enumerate(index.keys):
+        if key in first:
+            duplicates.append((position, first[key]))
+            continue
+        first[key] = position
+
+        for other, covers in sorted(meets[position].items()):
+            covered = meets[other][position]
+            if index.keys[other] == key:
+                continue
+            # of two rules covering each other the first one is kept
+            if covers and (other < position or not covered):
+                redundant.append((position, other))
+                break
+            if other > position and not covers and not covered:
+                overlapping.append((position, other))
+
+    return RuleReport(duplicates, redundant, overlapping)
+
+
+def diff_rules(current: list, desired: list, delete: bool = True) -> RuleDiff:
+    """
+    Function to compute the rules to create and to delete so a firewall has the desired rules. The desired
+    rules repeated or covered by another desired rule are not created, and with delete the current rules
+    repeated are deleted too, so a firewall does not end with two rules for the same traffic.
+    :param current: rules of the firewall, e.g. Firewall.lists_rule
+    :param desired: rules wanted, with the arguments of Firewall.create_rule
+    :param delete: delete the current rules that are not desired or repeated (optional, default True)
+    :return: RuleDiff(create=[desired], delete=[current])
+    """
+    report = analyze_rules(desired)
+    dropped = {position for position, _ in report.duplicates + report.redundant}
+    wanted = {rule_key(rule) for position, rule in enumerate(desired) if position not in dropped}
+
+    existing, extra = set(), []
+    for rule in current:
+        key = rule_key(rule)
+        if delete and (key in existing or key not in wanted):
+            extra.append(rule)
+        existing.add(key)
+
+    create, planned = [], set()
+    for position, rule in enumerate(desired):
+        key = rule_key(rule)
+        if position not in dropped and key not in existing and key not in planned:
+            create.append(rule)
+            planned.add(key)
+
+    return RuleDiff(create, extra)
@@ -0,0 +1,103 @@
+"""
+File to handle the client side rate limit and the retry policy used by the transport
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Methods that can be sent again without changing the result, only these are retried
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket, each request takes a token and tokens come back at `rate` per second up to
+    `burst`. A caller that finds the bucket empty is told how long to wait for its token, so concurrent
+    callers queue up behind each other at the sustainable rate instead of all retrying at once.
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        """
+        Init for TokenBucket class
+        :param rate: requests per second allowed on average
+        :param burst: maximum number of requests sent back to back (optional, default one second of rate)
+        """
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0')
+
+        self.rate = float(rate)
+        self.burst = float(burst if burst else max(1, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Function to take a token
+        :return: seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float):
+        """
+        Function to hold every caller for some seconds, used when the api answers with a Retry-After
+        :param seconds: how long to hold the requests
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for throttled or unavailable responses and connection errors.
+    A Retry-After header sent by the api takes precedence over the computed backoff and is never shortened,
+    a request asked to wait longer than max_backoff is not retried.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30,
+                 statuses: tuple = (429, 502, 503, 504), methods: frozenset = IDEMPOTENT_METHODS):
+        """
+        Init for RetryPolicy class
+        :param max_retries: how many times a request is sent again, 0 disables the retries (optional, default 3)
+        :param backoff: base seconds of the exponential backoff (optional, default 0.5)
+        :param max_backoff: maximum seconds to wait between two attempts, also for a Retry-After (optional, default 30)
+        :param statuses: http status answered when the api is throttling or unavailable (optional)
+        :param methods: http methods that are safe to retry (optional, default the idempotent ones)
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+
+    def can_retry(self, method: str, attempt: int, delay: float = 0) -> bool:
+        return method.upper() in self.methods and attempt < self.max_retries and delay <= self.max_backoff
+
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+        """
+        Function to get the seconds to wait before the next attempt
+        :param attempt: number of attempts already retried, starting at 0
+        :param retry_after: value of the Retry-After header, in seconds or as an http date (optional)
+        :return: float, a Retry-After is returned whole even over max_backoff, see can_retry
+        """
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
@@ -0,0 +1,112 @@
+"""
+File to coalesce identical requests sent at the same time, so only one of them reaches the api
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        # held by the caller running the call, the others wait on it
+        self.done = threading.Lock()
+        self.done.acquire()
+        self.result = None
+        self.error = None
+
+
+def flight_key(method: str, url: str, params: dict = None) -> tuple:
+    return method, url, tuple(sorted(params.items())) if params else ()
+
+
+class SingleFlight:
+    """
+    Thread safe coalescing of the calls in flight: the first caller of a key runs the call and the callers of
+    the same key arriving before it ends wait for it and get its result, or its error. Nothing is kept once the
+    call ends, a later caller runs the call again. The result is shared by the callers, so it must be treated
+    as read-only.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: tuple, function):
+        """
+        Function to run a call, or to wait for the same call already running
+        :param key: identity of the call, e.g. flight_key('GET', url, params)
+        :param function: callable running the call
+        :return: the result of the call
+        """
+        with self._lock:
+            call = self._flights.get(key)
+            leader = call is None
+            if leader:
+                call = self._flights[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            with call.done:
+                pass
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            call.done.release()
+
+    def stats(self) -> dict:
+        """
+        Function to get the counters, calls sent and calls served by a call already in flight
+        :return: dict
+        """
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self._flights)}
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio counterpart of SingleFlight, the callers of a key in flight await the task of the first one. A
+    caller cancelled while waiting does not cancel the call of the others.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+
+    async def do(self, key: tuple, function):
+        """
+        Coroutine to run a call, or to wait for the same call already running
+        :param key: identity of the call, e.g. flight_key('GET', url, params)
+        :param function: callable returning the coroutine of the call
+        :return: the result of the call
+        """
+        import asyncio
+
+        task = self._flights.get(key)
+
+        if task is None:
+            task = self._flights[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: self._flights.pop(key, None) if self._flights.get(key) is done
+                                   else None)
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self._flights)}
@@ -1,8 +1,9 @@
-import requests
-
-from .utils import filter_list
+from . import models
+from .instrumentation import traced
+from .transport import Transport
 
 
+@traced
 class Size:
     """
     Instances are sized by combinations of CPU virtual cores, memory and disk space.
@@ -10,21 +11,19 @@ class Size:
     a combined allocation of CPU, RAM and disk.
     """
 
-    def __init__(self, headers, api_url):
+    def __init__(self, headers, api_url, transport=None):
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{}/v2/sizes'.format(api_url)
 
-    def search(self, filter: str = None) -> dict:
+    def search(self, filter: str = None, model: bool = False) -> dict:
         """
         Function to listing available instances sizes
         :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
                        you can filter by any object that is inside the json
+        :param model: return Size models instead of dicts (optional, default False)
         :return: object json
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
+        result = self.transport.get(self.url, filter=filter, cache='sizes')
 
-        return r.json()
+        return models.build(result, models.Size) if model else result
@@ -1,8 +1,9 @@
-import requests
-
-from .utils import filter_list
+from .instrumentation import traced
+from .transport import Transport
+from .utils import region_url
 
 
+@traced
 class Snapshots:
     """
     We provide a backup service for our Instances called snapshots. This takes an exact copy of the instance's
@@ -14,10 +15,22 @@ class Snapshots:
     will overwrite itself each week not keep multiple weekly snapshots).
     """
 
-    def __init__(self, headers, api_url, region):
+    def __init__(self, headers, api_url, region, transport=None):
         param = "?region={region}".format(region=region) if region else ''
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{api_url}/v2/snapshots{param}'.format(api_url=api_url, param=param)
+        self._base_url = '{}/v2/snapshots'.format(api_url)
+        self.region = region
+
+    def get_url(self, path: str = None, region: str = None) -> str:
+        """
+        Function to build the url of the api, with the region in the query
+        :param path: path appended to the url of the snapshots, e.g. '/{id}' (optional)
+        :param region: region of the call (optional, default the region of the class)
+        :return: str
+        """
+        return region_url(self._base_url, path, region if region else self.region)
 
     def create(self, name: str, instance_id: str, safe: str = 'false', cron_timing: str = None) -> dict:
         """
@@ -41,9 +54,7 @@ class Snapshots:
         if cron_timing:
             payload['cron_timing'] = cron_timing
 
-        r = requests.put(self.url + '/{}'.format(name), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}'.format(name)), params=payload)
 
     def search(self, filter: str = None) -> dict:
         """
@@ -52,13 +63,7 @@ class Snapshots:
                        you can filter by any object that is inside the json
         :return: object json
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.url, filter=filter)
 
     def delete(self, name: str) -> dict:
         """
@@ -66,6 +71,4 @@ class Snapshots:
         :param name: name of the instance
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(name), headers=self.headers)
-
-        return r.json()
+        return self.transport.delete(self.get_url('/{}'.format(name)))
@@ -1,8 +1,8 @@
-import requests
-
-from .utils import filter_list
+from .instrumentation import traced
+from .transport import Transport
 
 
+@traced
 class Ssh:
     """
     To manage the SSH keys for an account that are used for logging in to instances,
@@ -10,8 +10,9 @@ class Ssh:
     as well as adding and removing them by name.
     """
 
-    def __init__(self, headers, api_url):
+    def __init__(self, headers, api_url, transport=None):
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{}/v2/sshkeys'.format(api_url)
 
     def create(self, name: str, public_key: str) -> dict:
@@ -22,9 +23,7 @@ class Ssh:
         :return: object json
         """
         payload = {'name': name, 'public_key': public_key}
-        r = requests.post(self.url, headers=self.headers, data=payload)
-
-        return r.json()
+        return self.transport.post(self.url, data=payload)
 
     def search(self, filter: str = None) -> dict:
         """
@@ -33,13 +32,7 @@ class Ssh:
                        you can filter by any object that is inside the json
         :return: object json
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.url, filter=filter)
 
     def retrieving(self, id: str) -> dict:
         """
@@ -47,9 +40,7 @@ class Ssh:
         :param id: id of the objects
         :return: object json
         """
-        r = requests.get(self.url + '/{}'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.get(self.url + '/{}'.format(id))
 
     def updating(self, id: str, name: str) -> dict:
         """
@@ -59,15 +50,11 @@ class Ssh:
         :return: object json
         """
         payload = {'name': name}
-        r = requests.put(self.url + '/{}'.format(id), headers=self.headers, data=payload)
-
-        return r.json()
+        return self.transport.put(self.url + '/{}'.format(id), data=payload)
 
     def delete(self, id: str) -> dict:
         """
         Function to removing a SSH key
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.delete(self.url + '/{}'.format(id))
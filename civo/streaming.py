@@ -0,0 +1,155 @@
+"""
+File to decode large list responses incrementally, one record at a time, instead of building the whole body
+"""
+import codecs
+import json
+import re
+
+from .filters import compile_filter
+
+_SKIP = re.compile(r'[\s,]*')
+_DELIMITERS = frozenset(',]} \t\r\n')
+_decode = json.JSONDecoder().raw_decode
+
+
+class _Incomplete(Exception):
+    """
+    The value at the position continues in a chunk not received yet
+    """
+
+
+class ItemDecoder:
+    """
+    Push decoder for a json list, or for an object holding the list in 'items' like the pages of the api. The
+    body is fed in chunks of bytes as they are received and every complete record of the list is returned as
+    soon as it is parsed, so only the records not yet consumed and one chunk are held in memory. The other
+    keys of an object, e.g. page and pages, are kept in `meta`. A filter is applied to the decoded records of
+    each chunk, finding where a record ends without decoding it would cost more than decoding it.
+    """
+
+    def __init__(self, filter: str = None):
+        """
+        Init for ItemDecoder class
+        :param filter: records not matching this filter expression are dropped as soon as they are decoded (optional)
+        """
+        self.meta = {}
+        self.predicate = compile_filter(filter) if filter else None
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._state = 'start'
+        self._in_object = False
+
+    def feed(self, chunk: bytes) -> list:
+        """
+        Function to give the next chunk of the body
+        :param chunk: bytes received
+        :return: list of the records completed by this chunk
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        return self._select(self._parse(final=False))
+
+    def close(self) -> list:
+        """
+        Function to call once the whole body was fed
+        :return: list of the last records
+        :raise ValueError: when the body is not a complete json list
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(b'', final=True)
+        self._pos = 0
+        items = self._select(self._parse(final=True))
+
+        if self._state != 'done' or self._buffer[self._pos:].strip():
+            raise ValueError('Truncated or invalid json list at offset {}'.format(self._pos))
+
+        return items
+
+    def _select(self, items: list) -> list:
+        if self.predicate is None or not items:
+            return items
+
+        try:
+            return self.predicate.select(items)
+        except KeyError:
+            raise KeyError('Invalid filter')
+
+    def _value(self, final: bool):
+        try:
+            value, end = _decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            raise _Incomplete()
+
+        # a value touching the end of the buffer may continue in the next chunk, a number may also have been
+        # cut in the middle, e.g. 4. of 4.5
+        if not final and (end == len(self._buffer) or (value.__class__ is int or value.__class__ is float) and
+                          self._buffer[end] not in _DELIMITERS):
+            raise _Incomplete()
+
+        self._pos = end
+        return value
+
+    def _parse(self, final: bool) -> list:
+        items = []
+        buffer = self._buffer
+
+        while self._state != 'done':
+            self._pos = _SKIP.match(buffer, self._pos).end()
+            if self._pos >= len(buffer):
+                break
+
+            start = self._pos
+            char = buffer[start]
+            try:
+                if self._state == 'start':
+                    if char not in '[{':
+                        raise ValueError('Expected a json list or object at offset {}'.format(start))
+                    self._state = 'items' if char == '[' else 'keys'
+                    self._in_object = char == '{'
+                    self._pos += 1
+                elif self._state == 'items':
+                    if char == ']':
+                        self._state = 'keys' if self._in_object else 'done'
+                        self._pos += 1
+                    else:
+                        items.append(self._value(final))
+                elif char == '}':
+                    self._state = 'done'
+                    self._pos += 1
+                else:
+                    key = self._value(final)
+                    colon = buffer.find(':', self._pos)
+                    self._pos = _SKIP.match(buffer, colon + 1).end() if colon >= 0 else len(buffer)
+                    if self._pos >= len(buffer):
+                        if final:
+                            raise ValueError('Missing value of {} at offset {}'.format(key, start))
+                        raise _Incomplete()
+
+                    if key == 'items' and buffer[self._pos] == '[':
+                        self._state = 'items'
+                        self._pos += 1
+                    else:
+                        self.meta[key] = self._value(final)
+            except _Incomplete:
+                # wait for the next chunk
+                self._pos = start
+                break
+
+        return items
+
+
+def iter_items(chunks, filter: str = None):
+    """
+    Function to decode a json list from an iterable of bytes chunks
+    :param chunks: iterable of bytes, e.g. response.iter_content(65536)
+    :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9' (optional)
+    :return: generator of records
+    """
+    decoder = ItemDecoder(filter)
+
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+
+    yield from decoder.close()
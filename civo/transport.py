@@ -0,0 +1,558 @@
+"""
+File to handle the http transport shared by all the resources
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import TTLCache
+from .cassette import Cassette, CassetteAdapter, ReplayedResponse, _encode
+from .conditional import ConditionalStore
+from .exceptions import CIVOAPIError
+from .instrumentation import RequestEvent, caller, emit, endpoint
+from .scheduler import RetryPolicy, TokenBucket
+from .singleflight import AsyncSingleFlight, SingleFlight, flight_key
+from .streaming import ItemDecoder, iter_items
+from .utils import filter_list
+
+
+def _scheduler(rate_limit: float = None, burst: int = None, retry: RetryPolicy = None):
+    limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+    return limiter, retry if retry is not None else RetryPolicy()
+
+
+# bytes read from the socket at a time by the streamed responses
+_CHUNK_SIZE = 65536
+
+
+def _error(method: str, url: str, status: int, body: str) -> CIVOAPIError:
+    return CIVOAPIError('{} {} failed with status {}'.format(method, url, status), status=status, body=body)
+
+
+def _encoded(fields: dict) -> str:
+    return urlencode([(k, v) for k, v in fields.items() if v is not None], doseq=True) if fields else ''
+
+
+def _form_size(fields: dict) -> int:
+    # the api takes most payloads in the query string, so it counts in the request size like a form body
+    return len(_encoded(fields))
+
+
+def _conditional(store: ConditionalStore, method: str, url: str, params: dict, stream: bool) -> tuple:
+    # only the plain GET requests are sent conditionally, a streamed body is never kept
+    if store is None or method != 'GET' or stream or not store.enabled(url):
+        return None, None
+
+    key = ConditionalStore.key(url, params)
+    return key, store.headers(key)
+
+
+def _started(method: str, url: str, origin: tuple) -> RequestEvent:
+    resource, operation = origin
+    return RequestEvent('request', resource, operation, method, endpoint(url), url, None, None, None, None, 0, None)
+
+
+class Transport:
+    """
+    Pooled keep-alive http session shared by every resource of a Civo client. Connections to the api are
+    reused between calls, so the TCP connection and TLS handshake are paid once per pooled connection
+    instead of once per request.
+    """
+
+    def __init__(self, headers: dict = None, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, cache: TTLCache = None, rate_limit: float = None, burst: int = None,
+                 retry: RetryPolicy = None, cassette: Cassette = None, hooks: list = None,
+                 conditional: ConditionalStore = None, coalesce: bool = True):
+        """
+        Init for Transport class
+        :param headers: headers sent with every request, usually the Authorization header
+        :param pool_connections: number of host pools to keep in the session (optional, default 10)
+        :param pool_maxsize: maximum number of keep-alive connections kept per host (optional, default 10)
+        :param pool_block: when True, block until a pooled connection is free instead of opening
+               a throwaway one once pool_maxsize is reached (optional, default False)
+        :param cache: cache for the GET requests that name a cache endpoint (optional, default no cache)
+        :param rate_limit: requests per second sent on average, calls over it wait their turn (optional, default off)
+        :param burst: requests sent back to back before the rate_limit applies (optional, default one second)
+        :param retry: retry policy for throttled or unavailable responses (optional, default RetryPolicy())
+        :param cassette: record the traffic to, or replay it from, a cassette instead of the network (optional)
+        :param hooks: callables receiving a RequestEvent when a request starts, is answered or fails (optional)
+        :param conditional: store of the validators, the GET requests are then sent conditionally (optional)
+        :param coalesce: identical GET requests sent at the same time share one call (optional, default True)
+        """
+        self.headers = headers if headers else {}
+        self.pool_maxsize = pool_maxsize
+        self.conditional = conditional
+        self.flights = SingleFlight() if coalesce else None
+        self.cassette = cassette
+        self.hooks = list(hooks) if hooks else []
+        self.cache = cache
+        self.limiter, self.retry = _scheduler(rate_limit, burst, retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        if cassette is not None:
+            adapter = CassetteAdapter(cassette, adapter)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, params: dict = None, data: dict = None, filter: str = None,
+                cache: str = None, stream: bool = False):
+        """
+        Function to send a request through the pooled session
+        :param method: http method (GET, POST, PUT or DELETE)
+        :param url: absolute url of the endpoint
+        :param params: query string parameters (optional)
+        :param data: form body (optional)
+        :param filter: filter applied with filter_list to the decoded json (optional)
+        :param cache: name of the cache endpoint, e.g. 'sizes', a GET is then served from the cache (optional)
+        :param stream: decode the list of the response incrementally, the cache is not used (optional)
+        :return: object json, or a generator of the records of the list when stream is True
+        """
+        if stream:
+            # the request is sent now so its errors are raised here, the body is decoded while it is iterated
+            return self._iter_stream(self._observe(method, url, params, data, stream=True)[1], url, filter)
+
+        if cache and method == 'GET' and self.cache is not None:
+            key = TTLCache.key(cache, url, params)
+            found, result = self.cache.get(key)
+
+            if not found:
+                status, result = self._fetch(method, url, params, data)
+                # an error body is answered as json too, it must not be served once the api has recovered
+                if status < 400:
+                    self.cache.set(key, result)
+        else:
+            _, result = self._fetch(method, url, params, data)
+
+        if filter:
+            return filter_list(data=result, filter_by=filter)
+
+        return result
+
+    def _fetch(self, method: str, url: str, params: dict = None, data: dict = None):
+        # identical GET requests sent at the same time wait for the first one instead of reaching the api
+        if self.flights is None or method != 'GET':
+            return self._observe(method, url, params, data)
+
+        return self.flights.do(flight_key(method, url, params), lambda: self._observe(method, url, params, data))
+
+    def _observe(self, method: str, url: str, params: dict = None, data: dict = None, stream: bool = False):
+        # without hooks a request costs a single truth test here
+        if not self.hooks:
+            return self._send(method, url, params, data, stream=stream)
+
+        event = _started(method, url, caller())
+        emit(self.hooks, event)
+        stats = {}
+        start = time.perf_counter()
+
+        try:
+            result = self._send(method, url, params, data, stats, stream)
+        except Exception as error:
+            emit(self.hooks, event._replace(kind='error', duration=time.perf_counter() - start, error=error, **stats))
+            raise
+
+        emit(self.hooks, event._replace(kind='response', duration=time.perf_counter() - start, **stats))
+        return result
+
+    def _send(self, method: str, url: str, params: dict = None, data: dict = None, stats: dict = None,
+              stream: bool = False):
+        attempt = 0
+        key, validators = _conditional(self.conditional, method, url, params, stream)
+
+        while True:
+            if self.limiter is not None:
+                wait = self.limiter.reserve()
+                if wait > 0:
+                    time.sleep(wait)
+
+            try:
+                if stream:
+                    r = self.session.request(method, url, params=params, data=data, stream=True)
+                elif validators:
+                    r = self.session.request(method, url, params=params, data=data, headers=validators)
+                else:
+                    r = self.session.request(method, url, params=params, data=data)
+            except (requests.ConnectionError, requests.Timeout):
+                if stats is not None:
+                    stats['retries'] = attempt
+                if not self.retry.can_retry(method, attempt):
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+
+            if stats is not None:
+                # a streamed body is not read yet, its size is the announced one
+                size = int(r.headers.get('Content-Length', 0)) if stream else len(r.content)
+                stats.update(status=r.status_code, retries=attempt, response_bytes=size,
+                             request_bytes=_form_size(params) + _form_size(data))
+
+            if r.status_code in self.retry.statuses:
+                delay = self.retry.delay(attempt, r.headers.get('Retry-After'))
+                if self.limiter is not None and r.status_code == 429:
+                    self.limiter.pause(delay)
+
+                # a Retry-After over the budget is not retried early, the api would most likely refuse it again
+                if not self.retry.can_retry(method, attempt, delay):
+                    raise _error(method, url, r.status_code, r.text)
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if stream:
+                if r.status_code >= 400:
+                    raise _error(method, url, r.status_code, r.text)
+                return r.status_code, r
+
+            if key is not None and r.status_code == 304:
+                found, result = self.conditional.hit(key)
+                if found:
+                    return r.status_code, result
+                # the stored body was evicted meanwhile, it is requested again in full
+                validators = None
+                continue
+
+            try:
+                start = time.perf_counter()
+                result = r.json()
+            except ValueError:
+                raise _error(method, url, r.status_code, r.text)
+
+            if key is not None and 200 <= r.status_code < 300:
+                self.conditional.store(key, r.headers, result, len(r.content), time.perf_counter() - start)
+            return r.status_code, result
+
+    @staticmethod
+    def _iter_stream(r, url: str, filter: str = None):
+        try:
+            yield from iter_items(r.iter_content(_CHUNK_SIZE), filter)
+        except ValueError as error:
+            raise CIVOAPIError('{} returned an invalid json list: {}'.format(url, error), status=r.status_code)
+        finally:
+            r.close()
+
+    def get(self, url: str, params: dict = None, filter: str = None, cache: str = None, stream: bool = False):
+        return self.request('GET', url, params=params, filter=filter, cache=cache, stream=stream)
+
+    def post(self, url: str, params: dict = None, data: dict = None):
+        return self.request('POST', url, params=params, data=data)
+
+    def put(self, url: str, params: dict = None, data: dict = None):
+        return self.request('PUT', url, params=params, data=data)
+
+    def delete(self, url: str, params: dict = None):
+        return self.request('DELETE', url, params=params)
+
+    def add_hook(self, hook):
+        """
+        Function to observe the requests, e.g. with a LatencyAggregator
+        :param hook: callable receiving a RequestEvent when a request starts, is answered or fails
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Function to stop observing the requests
+        :param hook: a hook given to add_hook
+        """
+        self.hooks.remove(hook)
+
+    def warm_up(self, url: str, connections: int = 1) -> int:
+        """
+        Function to open pooled connections before the first real call, so it does not pay the handshake
+        :param url: any url of the host to connect to, the response is discarded
+        :param connections: how many connections to open in parallel, capped at pool_maxsize (optional, default 1)
+        :return: number of connections that were opened
+        """
+        connections = max(1, min(connections, self.pool_maxsize))
+
+        def _open(_):
+            try:
+                self.session.head(url).close()
+                return True
+            except requests.RequestException:
+                return False
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(_open, range(connections)))
+
+    def close(self):
+        """
+        Function to close every pooled connection
+        """
+        self.session.close()
+
+
+class AsyncTransport:
+    """
+    Asyncio counterpart of Transport. Every call returns a coroutine and all of them share one aiohttp
+    connection pool, so thousands of concurrent calls can run on a single event loop.
+    """
+
+    def __init__(self, headers: dict = None, limit: int = 100, limit_per_host: int = 0, cache: TTLCache = None,
+                 rate_limit: float = None, burst: int = None, retry: RetryPolicy = None, hooks: list = None,
+                 conditional: ConditionalStore = None, coalesce: bool = True, cassette: Cassette = None):
+        """
+        Init for AsyncTransport class
+        :param headers: headers sent with every request, usually the Authorization header
+        :param limit: maximum number of simultaneous connections (optional, default 100, 0 is unlimited)
+        :param limit_per_host: maximum number of simultaneous connections per host (optional, default 0 is unlimited)
+        :param cache: cache for the GET requests that name a cache endpoint (optional, default no cache)
+        :param rate_limit: requests per second sent on average, calls over it wait their turn (optional, default off)
+        :param burst: requests sent back to back before the rate_limit applies (optional, default one second)
+        :param retry: retry policy for throttled or unavailable responses (optional, default RetryPolicy())
+        :param hooks: callables receiving a RequestEvent when a request starts, is answered or fails (optional)
+        :param conditional: store of the validators, the GET requests are then sent conditionally (optional)
+        :param coalesce: identical GET requests sent at the same time share one call (optional, default True)
+        :param cassette: record the traffic to, or replay it from, a cassette instead of the network (optional)
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError('aiohttp is required for the async client, install it with: pip install civo[async]')
+
+        self._aiohttp = aiohttp
+        self.headers = headers if headers else {}
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.cache = cache
+        self.limiter, self.retry = _scheduler(rate_limit, burst, retry)
+        self.hooks = list(hooks) if hooks else []
+        self.conditional = conditional
+        self.flights = AsyncSingleFlight() if coalesce else None
+        self.cassette = cassette
+        self._session = None
+
+    @property
+    def session(self):
+        # The session is bound to the running event loop, so it is created on first use instead of in __init__
+        if self._session is None or self._session.closed:
+            connector = self._aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = self._aiohttp.ClientSession(headers=self.headers, connector=connector)
+
+        return self._session
+
+    def request(self, method: str, url: str, params: dict = None, data: dict = None, filter: str = None,
+                cache: str = None, stream: bool = False):
+        """
+        Coroutine to send a request through the pooled session
+        :param method: http method (GET, POST, PUT or DELETE)
+        :param url: absolute url of the endpoint
+        :param params: query string parameters (optional)
+        :param data: form body (optional)
+        :param filter: filter applied with filter_list to the decoded json (optional)
+        :param cache: name of the cache endpoint, e.g. 'sizes', a GET is then served from the cache (optional)
+        :param stream: decode the list of the response incrementally, the cache is not used (optional)
+        :return: object json, or an async generator of the records of the list when stream is True
+        """
+        # a resource method returning this coroutine has returned by the time it runs, so the caller is looked up now
+        origin = caller() if self.hooks else None
+        return self._request(method, url, params, data, filter, cache, origin, stream)
+
+    async def _request(self, method: str, url: str, params: dict, data: dict, filter: str, cache: str,
+                       origin: tuple, stream: bool = False):
+        if stream:
+            _, r = await self._observe(method, url, params, data, origin, stream=True)
+            return self._iter_stream(r, url, filter)
+
+        if cache and method == 'GET' and self.cache is not None:
+            key = TTLCache.key(cache, url, params)
+            found, result = self.cache.get(key)
+
+            if not found:
+                status, result = await self._fetch(method, url, params, data, origin)
+                # an error body is answered as json too, it must not be served once the api has recovered
+                if status < 400:
+                    self.cache.set(key, result)
+        else:
+            _, result = await self._fetch(method, url, params, data, origin)
+
+        if filter:
+            return filter_list(data=result, filter_by=filter)
+
+        return result
+
+    async def _fetch(self, method: str, url: str, params: dict, data: dict, origin: tuple):
+        # identical GET requests sent at the same time wait for the first one instead of reaching the api
+        if self.flights is None or method != 'GET':
+            return await self._observe(method, url, params, data, origin)
+
+        return await self.flights.do(flight_key(method, url, params),
+                                     lambda: self._observe(method, url, params, data, origin))
+
+    async def _observe(self, method: str, url: str, params: dict, data: dict, origin: tuple, stream: bool = False):
+        if origin is None:
+            return await self._send(method, url, params, data, stream=stream)
+
+        event = _started(method, url, origin)
+        emit(self.hooks, event)
+        stats = {}
+        start = time.perf_counter()
+
+        try:
+            result = await self._send(method, url, params, data, stats, stream)
+        except Exception as error:
+            emit(self.hooks, event._replace(kind='error', duration=time.perf_counter() - start, error=error, **stats))
+            raise
+
+        emit(self.hooks, event._replace(kind='response', duration=time.perf_counter() - start, **stats))
+        return result
+
+    async def _send(self, method: str, url: str, params: dict = None, data: dict = None, stats: dict = None,
+                    stream: bool = False):
+        import asyncio
+
+        attempt = 0
+        key, validators = _conditional(self.conditional, method, url, params, stream)
+
+        while True:
+            if self.limiter is not None:
+                wait = self.limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            try:
+                if self.cassette is not None:
+                    r = await self._cassette(method, url, params, data, validators)
+                else:
+                    r = await self.session.request(method, url, params=params, data=data, headers=validators or None)
+                status = r.status
+                retry_after = r.headers.get('Retry-After')
+                body = None
+                # a streamed body is left on the connection for _iter_stream, unless it is an error
+                if not stream or status >= 400:
+                    try:
+                        body = await r.text()
+                    finally:
+                        r.release()
+            except (self._aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if stats is not None:
+                    stats['retries'] = attempt
+                if not self.retry.can_retry(method, attempt):
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+
+            if stats is not None:
+                size = len(body.encode('utf-8')) if body is not None else r.content_length or 0
+                stats.update(status=status, retries=attempt, response_bytes=size,
+                             request_bytes=_form_size(params) + _form_size(data))
+
+            if status in self.retry.statuses:
+                delay = self.retry.delay(attempt, retry_after)
+                if self.limiter is not None and status == 429:
+                    self.limiter.pause(delay)
+
+                # a Retry-After over the budget is not retried early, the api would most likely refuse it again
+                if not self.retry.can_retry(method, attempt, delay):
+                    raise _error(method, url, status, body)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            if stream:
+                if status >= 400:
+                    raise _error(method, url, status, body)
+                return status, r
+
+            if key is not None and status == 304:
+                found, result = self.conditional.hit(key)
+                if found:
+                    return status, result
+                # the stored body was evicted meanwhile, it is requested again in full
+                validators = None
+                continue
+
+            try:
+                start = time.perf_counter()
+                result = json.loads(body)
+            except ValueError:
+                raise _error(method, url, status, body)
+
+            if key is not None and 200 <= status < 300:
+                self.conditional.store(key, r.headers, result, len(body), time.perf_counter() - start)
+            return status, result
+
+    async def _cassette(self, method: str, url: str, params: dict, data: dict, validators: dict):
+        import asyncio
+
+        full_url = url + ('&' if '?' in url else '?') + _encoded(params) if params else url
+
+        if self.cassette.mode == 'record':
+            r = await self.session.request(method, url, params=params, data=data, headers=validators or None)
+            try:
+                text = await r.text()
+            finally:
+                r.release()
+
+            try:
+                content = json.loads(text)
+            except ValueError:
+                content = text
+            self.cassette.record_answer(method, full_url, _encoded(data), r.status, r.headers, content)
+            # the body is read already, a streamed request is served from it
+            return ReplayedResponse(r.status, dict(r.headers), text.encode('utf-8'))
+
+        if self.cassette.latency:
+            await asyncio.sleep(self.cassette.latency)
+
+        interaction = self.cassette.find(method, full_url, _encoded(data))
+        return ReplayedResponse(interaction['status'], interaction.get('headers', {}),
+                                _encode(interaction['response']))
+
+    @staticmethod
+    async def _iter_stream(r, url: str, filter: str = None):
+        decoder = ItemDecoder(filter)
+
+        try:
+            async for chunk in r.content.iter_chunked(_CHUNK_SIZE):
+                for item in decoder.feed(chunk):
+                    yield item
+
+            for item in decoder.close():
+                yield item
+        except ValueError as error:
+            raise CIVOAPIError('{} returned an invalid json list: {}'.format(url, error), status=r.status)
+        finally:
+            r.release()
+
+    def get(self, url: str, params: dict = None, filter: str = None, cache: str = None, stream: bool = False):
+        return self.request('GET', url, params=params, filter=filter, cache=cache, stream=stream)
+
+    def post(self, url: str, params: dict = None, data: dict = None):
+        return self.request('POST', url, params=params, data=data)
+
+    def put(self, url: str, params: dict = None, data: dict = None):
+        return self.request('PUT', url, params=params, data=data)
+
+    def delete(self, url: str, params: dict = None):
+        return self.request('DELETE', url, params=params)
+
+    def add_hook(self, hook):
+        """
+        Function to observe the requests, e.g. with a LatencyAggregator
+        :param hook: callable receiving a RequestEvent when a request starts, is answered or fails
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Function to stop observing the requests
+        :param hook: a hook given to add_hook
+        """
+        self.hooks.remove(hook)
+
+    async def close(self):
+        """
+        Coroutine to close every pooled connection
+        """
+        if self._session is not None:
+            await self._session.close()
@@ -2,49 +2,124 @@
 File to handle all utils
 """
 from __future__ import print_function
+import contextvars
 import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .exceptions import CIVOAPIError
+from .filters import compile_filter, unknown_key
+
+
+# Outcome of one item of a bulk operation, error is None when it succeeded
+BulkResult = namedtuple('BulkResult', ['item', 'result', 'error'])
 
 
 def print_err(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
 
 
+def region_url(url: str, path: str = None, region: str = None) -> str:
+    """
+    Build the url of a regional endpoint, the region goes in the query after the path
+    :param url: url of the collection, e.g. https://api.civo.com/v2/instances
+    :param path: path appended to the url, e.g. '/{id}/stop' (optional)
+    :param region: the civo region (optional)
+    :return: str
+    """
+    return url + (path if path else '') + ('?region={}'.format(region) if region else '')
+
+
 def filter_list(data: dict, filter_by: str) -> list:
     """
-    Filter a list of items by a key:value pair also the search value can be a partial match
+    Filter a list of items by a filter expression, the classic key:value pair is a partial match,
+    see civo.filters for nested keys, AND/OR/NOT, regex, ranges and sets
     :param data: The data to filter
-    :param filter_by: The key:value pair to filter by
+    :param filter_by: The filter expression, like key:value
     :return: The filtered list
     """
-
-    return_list = []
-
-    try:
-        filter_split = filter_by.split(':')
-        search_in = filter_split[0]
-        search = filter_split[1]
-    except IndexError:
-        raise ValueError('Invalid filter format')
-
-    try:
-        search = int(search)
-    except ValueError:
-        pass
+    predicate = compile_filter(filter_by)
 
     try:
         data_search = data['items']
     except TypeError:
         data_search = data
 
-    try:
-        for element in data_search:
-            # we check if the search value is a partial match or not, check if search is a string or int
-            try:
-                if search in element[search_in]:
-                    return_list.append(element)
-            except TypeError:
-                if search == element[search_in]:
-                    return_list.append(element)
-        return return_list
-    except KeyError:
-        raise KeyError('Invalid filter')
\ No newline at end of file
+    result = predicate.select(data_search)
+
+    # a record without a key of the filter does not match, but a key that no record has is an invalid filter
+    if not result and data_search and unknown_key(predicate, data_search) is not None:
+        raise KeyError('Invalid filter')
+
+    return result
+
+
+def page_items(data) -> list:
+    """
+    Function to get the items of a decoded page, a paginated object or a plain list
+    :param data: the decoded page
+    :return: list
+    :raise CIVOAPIError: when the api answered with an error object
+    """
+    if isinstance(data, dict) and 'reason' in data:
+        raise CIVOAPIError('Listing failed: {}'.format(data['reason']), body=data)
+
+    return data['items'] if isinstance(data, dict) else data
+
+
+def iterate_pages(fetch_page, filter_by: str = None):
+    """
+    Lazily yield every item of a paginated endpoint, the next page is fetched in the background while
+    the current one is consumed, so only two pages are held in memory at any time
+    :param fetch_page: callable that receives the page number and returns the decoded page
+    :param filter_by: The key:value pair to filter each page by (optional)
+    :return: generator of items
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        page = 1
+        future = executor.submit(fetch_page, page)
+
+        while future is not None:
+            data = future.result()
+
+            # prefetch before handing out the items of the current page
+            pages = data.get('pages', page) if isinstance(data, dict) else page
+            future = executor.submit(fetch_page, page + 1) if page < pages else None
+
+            items = page_items(data)
+            if filter_by:
+                items = filter_list(data=items, filter_by=filter_by)
+
+            yield from items
+            page += 1
+
+
+def run_bulk(function, items: list, concurrency: int = 10, progress=None) -> list:
+    """
+    Run function over every item on a bounded thread pool, an error of one item does not stop the others
+    :param function: callable that receives one item
+    :param items: the items to process
+    :param concurrency: maximum number of items processed at the same time (optional, default 10)
+    :param progress: callable receiving (done, total, BulkResult) as each item finishes (optional)
+    :return: list of BulkResult in the same order as items
+    """
+    items = list(items)
+    results = [None] * len(items)
+
+    def _run(item):
+        try:
+            return BulkResult(item, function(item), None)
+        except Exception as error:
+            return BulkResult(item, None, error)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        # the items run in the context of the caller, so their requests are reported for the method running them
+        futures = {executor.submit(contextvars.copy_context().run, _run, item): position
+                   for position, item in enumerate(items)}
+
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if progress:
+                progress(done, len(items), future.result())
+
+    return results
@@ -1,8 +1,11 @@
-import requests
-
-from .utils import filter_list
+from . import models
+from .instrumentation import traced
+from .transport import Transport
+from .utils import region_url
+from .waiter import Waiter
 
 
+@traced
 class Volumes:
     """
     We provide a flexible size additional storage service for our Instances called volumes.
@@ -12,10 +15,23 @@ class Volumes:
     As volume storage is chargeable, at any time these can be deleted.
     """
 
-    def __init__(self, headers, api_url, region):
+    def __init__(self, headers, api_url, region, transport=None):
         param = "?region={region}".format(region=region) if region else ''
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{api_url}/v2/volumes{param}'.format(api_url=api_url, param=param)
+        self._base_url = '{}/v2/volumes'.format(api_url)
+        self.region = region
+        self._waiter = None
+
+    def get_url(self, path: str = None, region: str = None) -> str:
+        """
+        Function to build the url of the api, with the region in the query
+        :param path: path appended to the url of the volumes, e.g. '/{id}' (optional)
+        :param region: region of the call (optional, default the region of the class)
+        :return: str
+        """
+        return region_url(self._base_url, path, region if region else self.region)
 
     def create(self, name: str, size_gb: str, bootable: str = 'false') -> dict:
         """
@@ -31,24 +47,19 @@ class Volumes:
         if bootable:
             payload['bootable'] = bootable
 
-        r = requests.post(self.url, headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.post(self.url, params=payload)
 
-    def search(self, filter: str = None) -> dict:
+    def search(self, filter: str = None, model: bool = False) -> dict:
         """
         Function to list volumes
         :param filter: Filter json object the format is 'id:6224cd2b-d416-4e92-bdbb-db60521c8eb9',
                        you can filter by any object that is inside the json
+        :param model: return Volume models instead of dicts (optional, default False)
         :return: object json
         """
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
+        result = self.transport.get(self.url, filter=filter)
 
-        return r.json()
+        return models.build(result, models.Volume) if model else result
 
     def resizing(self, id: str, size_gb: str) -> dict:
         """
@@ -60,9 +71,7 @@ class Volumes:
         """
         payload = {'size_gb': size_gb}
 
-        r = requests.put(self.url + '/{}/resize'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/resize'.format(id)), params=payload)
 
     def attach(self, id: str, instance_id: str) -> dict:
         """
@@ -73,9 +82,7 @@ class Volumes:
         """
         payload = {'instance_id': instance_id}
 
-        r = requests.put(self.url + '/{}/attach'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/attach'.format(id)), params=payload)
 
     def detach(self, id: str) -> dict:
         """
@@ -83,9 +90,7 @@ class Volumes:
         :param id: id of the objects
         :return: object json
         """
-        r = requests.put(self.url + '/{}/detach'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.put(self.get_url('/{}/detach'.format(id)))
 
     def delete(self, id: str) -> dict:
         """
@@ -93,6 +98,19 @@ class Volumes:
         :param id: name of the instance
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(id), headers=self.headers)
+        return self.transport.delete(self.get_url('/{}'.format(id)))
+
+    def wait(self, ids: list, state: str = 'available', timeout: float = 600, callback=None) -> dict:
+        """
+        Function to wait for volumes to reach a state, all the waits of this object share one poller that
+        lists the volumes once per tick instead of retrieving each one
+        :param ids: ids of the volumes
+        :param state: the target status, None waits for the deletion (optional, default available)
+        :param timeout: seconds before the future of one of them fails with TimeoutError (optional, default 600)
+        :param callback: callable receiving the future of each one once it is done (optional)
+        :return: dict of id to concurrent.futures.Future resolving to the object json
+        """
+        if self._waiter is None:
+            self._waiter = Waiter(self.search)
 
-        return r.json()
\ No newline at end of file
+        return self._waiter.wait(ids, state=state, timeout=timeout, callback=callback)
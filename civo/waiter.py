@@ -0,0 +1,309 @@
+"""
+File to wait for many resources to reach a state with a single listing call per poll
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+from .exceptions import CIVOAPIError
+from .utils import page_items, print_err
+
+# States after which a resource will never reach the one being waited for
+FAILED_STATES = frozenset(('ERROR', 'FAILED', 'error', 'failed'))
+
+
+class _Pending:
+    __slots__ = ('future', 'state', 'deadline', 'callback')
+
+    def __init__(self, future, state, deadline, callback):
+        self.future = future
+        self.state = state
+        self.deadline = deadline
+        self.callback = callback
+
+
+def _timeout(id: str, pending: _Pending) -> TimeoutError:
+    return TimeoutError('{} did not reach {} in time'.format(id, pending.state if pending.state else 'deletion'))
+
+
+class Waiter:
+    """
+    Track many resources at once from a background thread. Every tick makes one listing call for the whole
+    set and resolves the future of each resource that reached its target state. With fetch_page the listing
+    is read one page at a time and stops at the first page holding every tracked resource, the next pages
+    are only requested while one is still missing or a deletion is waited for. The interval goes back to
+    `interval` when something changed and grows up to `max_interval` while nothing does. A failed listing is
+    retried on the next tick with the same backoff, the waits only fail after max_errors failures in a row.
+    """
+
+    def __init__(self, lister=None, key: str = 'status', interval: float = 2, max_interval: float = 30,
+                 backoff: float = 1.5, failed_states: frozenset = FAILED_STATES, max_errors: int = 5,
+                 fetch_page=None):
+        """
+        Init for Waiter class
+        :param lister: callable returning every record of the resource, e.g. lambda: list(instances.iter_all())
+        :param key: key of the record holding its state (optional, default 'status')
+        :param interval: seconds between two polls after a change (optional, default 2)
+        :param max_interval: maximum seconds between two polls (optional, default 30)
+        :param backoff: factor the interval grows by while nothing changes (optional, default 1.5)
+        :param failed_states: states that fail the wait immediately (optional)
+        :param max_errors: failed listings in a row before every wait fails with the error (optional, default 5)
+        :param fetch_page: callable that receives the page number and returns the decoded page, used in place
+               of lister, e.g. lambda page: instances.search(page=page, per_page=100)
+        """
+        if (lister is None) == (fetch_page is None):
+            raise ValueError('Give either lister or fetch_page')
+
+        self.lister = lister
+        self.fetch_page = fetch_page
+        self.key = key
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.failed_states = failed_states
+        self.max_errors = max_errors
+        self.polls = 0
+        self.errors = 0
+        self._pending = {}
+        self._states = {}
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._runner = None
+
+    def _add(self, ids: list, state: str, timeout: float, callback, make_future) -> dict:
+        deadline = time.monotonic() + timeout
+        futures = {}
+
+        with self._lock:
+            for id in ids:
+                futures[id] = make_future()
+                self._pending.setdefault(id, []).append(_Pending(futures[id], state, deadline, callback))
+
+        return futures
+
+    def _finish(self, pending: _Pending, record: dict = None, error: Exception = None):
+        if pending.future.done():
+            return
+
+        if error is not None:
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(record)
+
+        if pending.callback:
+            pending.callback(pending.future)
+
+    def _found(self, records: list) -> bool:
+        # the tracked resources are all in the records, and none of them is waited for until it is gone
+        ids = {record['id'] for record in records}
+
+        with self._lock:
+            return all(id in ids and all(p.state is not None for p in waits) for id, waits in self._pending.items())
+
+    def _next_page(self, records: list, data) -> bool:
+        records.extend(page_items(data))
+        page = data.get('page', 1) if isinstance(data, dict) else 1
+        pages = data.get('pages', page) if isinstance(data, dict) else page
+
+        return page < pages and not self._found(records)
+
+    def _poll(self) -> list:
+        if self.fetch_page is None:
+            return self.lister()
+
+        records, page = [], 1
+        while self._next_page(records, self.fetch_page(page)):
+            page += 1
+
+        return records
+
+    def _tick(self, records: list) -> bool:
+        """
+        Resolve the pending waits against one listing
+        :return: True when the state of a tracked resource changed since the previous tick
+        """
+        # an error of the api is answered as a json object in place of the list
+        if isinstance(records, dict) and 'reason' in records:
+            raise CIVOAPIError('Listing failed: {}'.format(records['reason']), body=records)
+
+        records = records['items'] if isinstance(records, dict) else records
+        by_id = {record['id']: record for record in records}
+        now = time.monotonic()
+        changed = False
+
+        with self._lock:
+            for id in list(self._pending):
+                record = by_id.get(id)
+                state = record.get(self.key) if record else None
+
+                if self._states.get(id, state) != state:
+                    changed = True
+                self._states[id] = state
+
+                remaining = []
+                for pending in self._pending[id]:
+                    if pending.state is None and record is None:
+                        # waiting for a deletion, the resource is gone from the listing
+                        self._finish(pending, {'id': id})
+                    elif record is not None and state == pending.state:
+                        self._finish(pending, record)
+                    elif state in self.failed_states:
+                        self._finish(pending, error=CIVOAPIError('{} reached state {}'.format(id, state)))
+                    elif now >= pending.deadline:
+                        self._finish(pending, error=_timeout(id, pending))
+                    elif not pending.future.done():
+                        remaining.append(pending)
+
+                if remaining:
+                    self._pending[id] = remaining
+                else:
+                    del self._pending[id]
+                    self._states.pop(id, None)
+
+        return changed
+
+    def _next_interval(self, current: float, changed: bool) -> float:
+        current = self.interval if changed else min(self.max_interval, current * self.backoff)
+
+        # never sleep past the closest deadline
+        with self._lock:
+            deadlines = [p.deadline for waits in self._pending.values() for p in waits]
+        if deadlines:
+            current = min(current, max(0.0, min(deadlines) - time.monotonic()))
+
+        return current
+
+    def _expire(self):
+        # a failed listing still ends the waits past their deadline
+        now = time.monotonic()
+
+        with self._lock:
+            for id in list(self._pending):
+                remaining = []
+                for pending in self._pending[id]:
+                    if now >= pending.deadline:
+                        self._finish(pending, error=_timeout(id, pending))
+                    elif not pending.future.done():
+                        remaining.append(pending)
+
+                if remaining:
+                    self._pending[id] = remaining
+                else:
+                    del self._pending[id]
+                    self._states.pop(id, None)
+
+    def _failed(self, error: Exception):
+        self.errors += 1
+
+        if self.errors >= self.max_errors:
+            self.errors = 0
+            self._fail_all(error)
+            return
+
+        print_err('civo waiter listing failed ({} in a row), retrying: {}'.format(self.errors, error))
+        self._expire()
+
+    def _fail_all(self, error: Exception):
+        with self._lock:
+            pendings = [p for waits in self._pending.values() for p in waits]
+            self._pending.clear()
+            self._states.clear()
+
+        for pending in pendings:
+            self._finish(pending, error=error)
+
+    def _run(self):
+        current = self.interval
+
+        while True:
+            try:
+                self.polls += 1
+                changed = self._tick(self._poll())
+                self.errors = 0
+            except Exception as error:
+                self._failed(error)
+                changed = False
+
+            with self._lock:
+                if not self._pending:
+                    self._runner = None
+                    return
+
+            current = self._next_interval(current, changed)
+            self._wakeup.wait(current)
+            self._wakeup.clear()
+
+    def wait(self, ids: list, state: str = 'ACTIVE', timeout: float = 600, callback=None) -> dict:
+        """
+        Function to wait for resources to reach a state
+        :param ids: ids of the resources
+        :param state: the target state, None waits for the resources to be deleted (optional, default ACTIVE)
+        :param timeout: seconds before the future of a resource fails with TimeoutError (optional, default 600)
+        :param callback: callable receiving the future of each resource once it is done (optional)
+        :return: dict of id to concurrent.futures.Future resolving to the record
+        """
+        futures = self._add(ids, state, timeout, callback, Future)
+
+        with self._lock:
+            if self._runner is None:
+                self._runner = threading.Thread(target=self._run, name='civo-waiter', daemon=True)
+                self._runner.start()
+            else:
+                self._wakeup.set()
+
+        return futures
+
+
+class AsyncWaiter(Waiter):
+    """
+    Asyncio counterpart of Waiter, the polling loop is a task and wait returns asyncio futures
+    """
+
+    async def _poll(self) -> list:
+        if self.fetch_page is None:
+            return await self.lister()
+
+        records, page = [], 1
+        while self._next_page(records, await self.fetch_page(page)):
+            page += 1
+
+        return records
+
+    async def _run(self):
+        import asyncio
+
+        current = self.interval
+
+        while True:
+            try:
+                self.polls += 1
+                changed = self._tick(await self._poll())
+                self.errors = 0
+            except Exception as error:
+                self._failed(error)
+                changed = False
+
+            if not self._pending:
+                self._runner = None
+                return
+
+            current = self._next_interval(current, changed)
+            try:
+                await asyncio.wait_for(self._async_wakeup.wait(), current)
+            except asyncio.TimeoutError:
+                pass
+            self._async_wakeup.clear()
+
+    def wait(self, ids: list, state: str = 'ACTIVE', timeout: float = 600, callback=None) -> dict:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        futures = self._add(ids, state, timeout, callback, loop.create_future)
+
+        if self._runner is None:
+            self._async_wakeup = asyncio.Event()
+            self._runner = loop.create_task(self._run())
+        else:
+            self._async_wakeup.set()
+
+        return futures
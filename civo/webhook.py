@@ -1,15 +1,16 @@
-import requests
-
-from .utils import filter_list
+from .instrumentation import traced
+from .transport import Transport
 
 
+@traced
 class WebHook:
     """
     Open certain actions taking place within your account, we can trigger a JSON POST callback to a URL or your choice.
     """
 
-    def __init__(self, headers, api_url):
+    def __init__(self, headers, api_url, transport=None):
         self.headers = headers
+        self.transport = transport if transport else Transport(headers)
         self.url = '{}/v2/webhooks'.format(api_url)
 
     def create(self, events: str, url: str, secret: str = None) -> dict:
@@ -26,9 +27,7 @@ class WebHook:
         if secret:
             payload['secret'] = secret
 
-        r = requests.post(self.url, headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.post(self.url, params=payload)
 
     def search(self, filter: str = None) -> dict:
         """
@@ -38,13 +37,7 @@ class WebHook:
         :return: object json
         """
 
-        r = requests.get(self.url, headers=self.headers)
-
-        if filter:
-            data = r.json()
-            return filter_list(data=data, filter_by=filter)
-
-        return r.json()
+        return self.transport.get(self.url, filter=filter)
 
     def test(self, id: str) -> dict:
         """
@@ -52,9 +45,7 @@ class WebHook:
         :param id: id of webhook object
         :return: object json
         """
-        r = requests.post(self.url + '/{}/test'.format(id), headers=self.headers)
-
-        return r.json()
+        return self.transport.post(self.url + '/{}/test'.format(id))
 
     def update(self, id: str, events: str, url: str, secret: str = None) -> dict:
         """
@@ -71,9 +62,7 @@ class WebHook:
         if secret:
             payload['secret'] = secret
 
-        r = requests.put(self.url + '/{}'.format(id), headers=self.headers, params=payload)
-
-        return r.json()
+        return self.transport.put(self.url + '/{}'.format(id), params=payload)
 
     def delete(self, id: str) -> dict:
         """
@@ -81,6 +70,15 @@ class WebHook:
         :param id: id of the webhook object
         :return: object json
         """
-        r = requests.delete(self.url + '/{}'.format(id), headers=self.headers)
+        return self.transport.delete(self.url + '/{}'.format(id))
+
+    def receiver(self, secret: str, **kwargs):
+        """
+        Function to build a local server receiving the webhooks, see receiver.WebhookReceiver
+        :param secret: secret of the webhook
+        :param kwargs: host, port, path, header, queue_size, batch_size, batch_wait, workers...
+        :return: WebhookReceiver, started with start() or used as a context manager
+        """
+        from .receiver import WebhookReceiver
 
-        return r.json()
+        return WebhookReceiver(secret, **kwargs)
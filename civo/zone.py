@@ -0,0 +1,175 @@
+"""
+File to read a dns zone file and to compute the changes between the records of a domain and a desired set
+"""
+import re
+import shlex
+from collections import namedtuple
+
+# records the dns api can serve, the SOA and NS records of a domain are managed by civo
+TYPES = frozenset(('A', 'AAAA', 'CNAME', 'MX', 'TXT', 'SRV'))
+_IGNORED = frozenset(('SOA', 'NS'))
+_CLASSES = frozenset(('IN', 'CH', 'HS'))
+_TTL = re.compile(r'^\d+$')
+
+# records to create, (current, desired) pairs to update and records to delete
+ZoneDiff = namedtuple('ZoneDiff', ['create', 'update', 'delete'])
+
+
+def _relative(name: str, origin: str = None) -> str:
+    # the api names the records relative to the domain, @ is the apex
+    name = name.lower()
+
+    if name.endswith('.'):
+        name = name[:-1]
+        if origin and name == origin:
+            return '@'
+        if origin and name.endswith('.' + origin):
+            return name[:-len(origin) - 1]
+
+    return name if name else '@'
+
+
+def _lines(text: str):
+    # comments are dropped and the records split in parentheses are joined on one line
+    pending = ''
+
+    for line in text.splitlines():
+        line = re.sub(r';(?=(?:[^"]*"[^"]*")*[^"]*$).*', '', line)
+        if not line.strip() and not pending:
+            continue
+
+        pending = pending + ' ' + line.strip() if pending else line.rstrip()
+        if pending.count('(') > pending.count(')'):
+            continue
+
+        yield pending.replace('(', ' ').replace(')', ' ')
+        pending = ''
+
+    if pending:
+        raise ValueError('Unbalanced parentheses in the zone: {}'.format(pending.strip()))
+
+
+def parse_zone(text: str, origin: str = None, ttl: int = 600) -> list:
+    """
+    Function to read the records of a zone file, in the format of bind
+    :param text: content of the zone file
+    :param origin: domain of the zone, e.g. 'example.com', a $ORIGIN of the file wins (optional)
+    :param ttl: ttl of the records that do not set one, a $TTL of the file wins (optional, default 600)
+    :return: list of records like {'type': 'MX', 'name': '@', 'value': 'mail.example.com', 'priority': 10, 'ttl': 600}
+    """
+    origin = origin.lower().rstrip('.') if origin else None
+    records = []
+    name = '@'
+
+    for number, line in enumerate(_lines(text), 1):
+        fields = shlex.split(line, posix=False)
+
+        if fields[0].upper() == '$ORIGIN':
+            origin = fields[1].lower().rstrip('.')
+            continue
+
+        if fields[0].upper() == '$TTL':
+            ttl = int(fields[1])
+            continue
+
+        # a record starting with a blank belongs to the name of the previous one
+        if not line[0].isspace():
+            name = _relative(fields.pop(0), origin)
+
+        record_ttl = ttl
+        while fields and (_TTL.match(fields[0]) or fields[0].upper() in _CLASSES):
+            value = fields.pop(0)
+            if _TTL.match(value):
+                record_ttl = int(value)
+
+        if len(fields) < 2:
+            raise ValueError('Invalid record of the zone: {}'.format(line.strip()))
+
+        type = fields[0].upper()
+        data = fields[1:]
+
+        if type in _IGNORED:
+            continue
+
+        if type not in TYPES:
+            raise ValueError('Unsupported record type {} in the zone: {}'.format(type, line.strip()))
+
+        priority = None
+        if type in ('MX', 'SRV'):
+            priority = int(data.pop(0))
+
+        if type == 'TXT':
+            value = ''.join(part[1:-1] if part.startswith('"') and part.endswith('"') else part for part in data)
+        elif type in ('CNAME', 'MX'):
+            value = data[-1].rstrip('.')
+        else:
+            value = ' '.join(data)
+
+        record = {'type': type, 'name': name, 'value': value, 'ttl': record_ttl}
+        if priority is not None:
+            record['priority'] = priority
+        records.append(record)
+
+    return records
+
+
+def record_key(record: dict) -> tuple:
+    """
+    Function to get the identity of a record, two records with the same key are the same record
+    :param record: record of the api or of parse_zone
+    :return: (type, name, value)
+    """
+    return str(record['type']).upper(), _relative(str(record.get('name') or '@')), str(record['value'])
+
+
+def _same(current: dict, desired: dict) -> bool:
+    for field in ('ttl', 'priority'):
+        if desired.get(field) is not None and str(desired[field]) != str(current.get(field)):
+            return False
+
+    return True
+
+
+def diff_records(current: list, desired: list, delete: bool = True) -> ZoneDiff:
+    """
+    Function to compute the fewest calls turning the current records into the desired ones. The records are
+    matched on (type, name, value), a changed ttl or priority is an update, and a record whose value changed is
+    updated in place instead of being deleted and created again when its type and name still match.
+    :param current: records of the domain, e.g. Dns.lists_record
+    :param desired: records wanted, each one with type, name and value, and optionally ttl and priority
+    :param delete: delete the current records that are not desired (optional, default True)
+    :return: ZoneDiff(create=[desired], update=[(current, desired)], delete=[current])
+    """
+    existing = {}
+    for record in current:
+        existing.setdefault(record_key(record), []).append(record)
+
+    create, update = [], []
+    for record in desired:
+        matches = existing.get(record_key(record))
+        if not matches:
+            create.append(record)
+            continue
+
+        found = matches.pop(0)
+        if not _same(found, record):
+            update.append((found, record))
+
+    leftover = [record for records in existing.values() for record in records]
+    if not delete:
+        return ZoneDiff(create, update, [])
+
+    # a record to create and one to delete of the same type and name are a single update
+    spare = {}
+    for record in leftover:
+        spare.setdefault(record_key(record)[:2], []).append(record)
+
+    remaining = []
+    for record in create:
+        candidates = spare.get(record_key(record)[:2])
+        if candidates:
+            update.append((candidates.pop(0), record))
+        else:
+            remaining.append(record)
+
+    return ZoneDiff(remaining, update, [record for records in spare.values() for record in records])
@@ -24,6 +24,7 @@ setup(
     long_description=read("civo/README.rst"),
     packages=find_packages(exclude=('tests',)),
     install_requires=['requests'],
+    extras_require={'async': ['aiohttp']},
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'License :: OSI Approved :: MIT License',
@@ -0,0 +1,121 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from civo.admission import AdmissionController
+from civo.exceptions import CIVOAPIError, QuotaExceededError
+
+QUOTA = {'instance_count_limit': 4, 'instance_count_usage': 1, 'cpu_core_limit': 8, 'cpu_core_usage': 1,
+         'ram_mb_limit': 8192, 'ram_mb_usage': 1024, 'disk_gb_limit': 200, 'disk_gb_usage': 25,
+         'public_ip_address_limit': 2, 'public_ip_address_usage': 1, 'disk_volume_count_limit': 2,
+         'disk_volume_count_usage': 0}
+
+
+def client():
+    civo = mock.Mock()
+    civo.quota.get.return_value = dict(QUOTA)
+    civo.size.search.return_value = [{'id': 'size-id', 'name': 'g3.small', 'cpu_cores': 1, 'ram_mb': 2048,
+                                      'disk_gb': 25}]
+    civo.instances.create.return_value = {'id': 'i1'}
+    civo.volumes.create.return_value = {'id': 'v1'}
+    return civo
+
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self):
+        self.civo = client()
+        self.admission = AdmissionController(self.civo)
+
+    def test_create_within_quota(self):
+        self.admission.create_instance('web', 'g3.small', 'template', public_ip='none')
+
+        self.civo.instances.create.assert_called_once()
+        self.assertEqual(self.admission.available()['instance_count'], 2)
+        self.assertEqual(self.admission.available()['ram_mb'], 8192 - 1024 - 2048)
+
+    def test_refused_before_any_call(self):
+        with self.assertRaises(QuotaExceededError) as context:
+            self.admission.create_instance('web', 'g3.small', 'template', count=2)
+
+        self.assertEqual(context.exception.exceeded, {'public_ip_address': (2, 1)})
+        self.assertIsInstance(context.exception, CIVOAPIError)
+        self.civo.instances.create.assert_not_called()
+
+    def test_public_ip_true_and_size_id(self):
+        demand = self.admission.instance_demand('size-id', public_ip='true')
+
+        self.assertEqual(demand['public_ip_address'], 1)
+        self.assertEqual(demand['ram_mb'], 2048)
+        with self.assertRaises(QuotaExceededError):
+            self.admission.create_instance('web', 'size-id', 'template', count=2, public_ip='true')
+        self.civo.instances.create.assert_not_called()
+
+    def test_batch_check(self):
+        demands = [self.admission.volume_demand(50) for _ in range(3)]
+
+        with self.assertRaises(QuotaExceededError):
+            self.admission.check(demands)
+        self.admission.check(demands[:2])
+
+    def test_failed_create_releases_its_quota(self):
+        self.civo.volumes.create.return_value = {'result': 'failed', 'reason': 'invalid name'}
+
+        self.admission.create_volume('data', 100)
+
+        self.assertEqual(self.admission.available()['disk_gb'], 175)
+
+    def test_resync(self):
+        self.admission.create_volume('data', 100)
+        self.admission.resync = 0
+        self.civo.quota.get.return_value = dict(QUOTA, disk_gb_usage=125, disk_volume_count_usage=1)
+
+        self.assertEqual(self.admission.available()['disk_gb'], 75)
+        self.assertEqual(self.civo.quota.get.call_count, 2)
+
+    def test_wait_for_released_quota(self):
+        admission = AdmissionController(self.civo, wait=True, timeout=5)
+        first = admission.reserve(admission.volume_demand(100))
+        second = admission.reserve(admission.volume_demand(50))
+        threading.Timer(0.05, first.release).start()
+
+        start = time.monotonic()
+        with admission.reserve(admission.volume_demand(100)):
+            pass
+
+        self.assertLess(time.monotonic() - start, 5)
+        second.release()
+        self.assertEqual(admission.available()['disk_gb'], 75)
+
+    def test_committed_quota_is_not_waited_for(self):
+        admission = AdmissionController(self.civo, wait=True, timeout=None)
+        admission.create_volume('data', 50)
+        admission.create_volume('logs', 50)
+
+        start = time.monotonic()
+        with self.assertRaises(QuotaExceededError):
+            admission.reserve(admission.volume_demand(10))
+
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_wait_resyncs_the_usage(self):
+        admission = AdmissionController(self.civo, resync=0.05, wait=True, timeout=5)
+        held = admission.reserve(admission.volume_demand(150))
+        self.civo.quota.get.return_value = dict(QUOTA, disk_gb_usage=0)
+
+        with admission.reserve(admission.volume_demand(50)):
+            pass
+
+        self.assertGreater(self.civo.quota.get.call_count, 1)
+        held.release()
+
+    def test_wait_timeout(self):
+        admission = AdmissionController(self.civo, wait=True, timeout=0.05)
+        admission.reserve(admission.volume_demand(150))
+
+        with self.assertRaises(QuotaExceededError):
+            admission.reserve(admission.volume_demand(50))
+
+
+if __name__ == '__main__':
+    unittest.main()
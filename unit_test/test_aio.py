@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import unittest
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+from civo import AsyncCivo
+from civo.cassette import Cassette
+from civo.conditional import ConditionalStore
+
+RESPONSES = os.path.join(os.path.dirname(__file__), '..', 'responses')
+
+
+@unittest.skipIf(web is None, 'aiohttp is not installed')
+class TestAsyncCivo(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        with open(os.path.join(RESPONSES, 'get_network.json')) as fd:
+            networks = json.load(fd)
+        self.created = []
+
+        async def list_networks(request):
+            return web.json_response(networks)
+
+        async def list_charges(request):
+            return web.json_response([{'code': 'instance', 'label': str(i)} for i in range(1000)])
+
+        async def create_cluster(request):
+            self.created.append(dict(request.query))
+            return web.json_response({'id': 'cluster_id', 'name': request.query['name']})
+
+        async def list_regions(request):
+            return web.json_response([{'code': 'lon1'}, {'code': 'nyc1'}])
+
+        async def list_volumes(request):
+            if request.query['region'] == 'nyc1':
+                return web.json_response({'reason': 'unavailable'}, status=500)
+            return web.json_response([{'id': 'volume_id'}])
+
+        async def list_sizes(request):
+            if request.headers.get('If-None-Match') == '"v1"':
+                return web.Response(status=304, headers={'ETag': '"v1"'})
+            return web.json_response([{'name': 'g3.small'}], headers={'ETag': '"v1"'})
+
+        async def list_instances(request):
+            page = int(request.query['page'])
+            self.pages.append(page)
+            items = [{'id': 'instance_{}'.format(page), 'status': 'ACTIVE'}]
+            return web.json_response({'page': page, 'per_page': 1, 'pages': 2, 'items': items})
+
+        self.pages = []
+        app = web.Application()
+        app.router.add_get('/v2/instances', list_instances)
+        app.router.add_get('/v2/networks', list_networks)
+        app.router.add_post('/v2/kubernetes/clusters', create_cluster)
+        app.router.add_get('/v2/charges', list_charges)
+        app.router.add_get('/v2/regions', list_regions)
+        app.router.add_get('/v2/sizes', list_sizes)
+        app.router.add_get('/v2/volumes', list_volumes)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        self.api_url = 'http://127.0.0.1:{}'.format(port)
+        self.civo = AsyncCivo('token', api_url=self.api_url)
+
+    async def asyncTearDown(self):
+        await self.civo.close()
+        await self.runner.cleanup()
+
+    async def test_search_with_filter(self):
+        result = await self.civo.networks.search(filter='label:internal')
+
+        self.assertEqual([i['id'] for i in result], ['52732d38-4eb2-448b-82a4-f8f614f94674'])
+
+    async def test_kubernetes_create_uses_default_network(self):
+        result = await self.civo.kubernetes.create(name='my_cluster', num_nodes=2)
+
+        self.assertEqual(result['name'], 'my_cluster')
+        self.assertEqual(self.created[0]['network_id'], 'network_id')
+
+    async def test_hooks_report_the_resource_method(self):
+        events = []
+        self.civo.transport.add_hook(events.append)
+
+        await self.civo.kubernetes.create(name='my_cluster', num_nodes=2)
+
+        self.assertEqual([(e.kind, e.resource, e.operation, e.endpoint) for e in events], [
+            ('request', 'AsyncKubernetes', 'create', '/v2/networks'),
+            ('response', 'AsyncKubernetes', 'create', '/v2/networks'),
+            ('request', 'AsyncKubernetes', 'create', '/v2/kubernetes/clusters'),
+            ('response', 'AsyncKubernetes', 'create', '/v2/kubernetes/clusters'),
+        ])
+        self.assertEqual(events[1].status, 200)
+        self.assertGreater(events[1].response_bytes, 0)
+
+    async def test_wait_reads_the_pages_it_needs(self):
+        futures = self.civo.instances.wait(['instance_1'])
+
+        self.assertEqual((await futures['instance_1'])['status'], 'ACTIVE')
+        self.assertEqual(self.pages, [1])
+
+    async def test_stream(self):
+        charges = await self.civo.charges.get(stream=True)
+        labels = [charge['label'] async for charge in charges]
+
+        self.assertEqual(labels, [str(i) for i in range(1000)])
+
+    async def test_multiregion_search(self):
+        result = await self.civo.multiregion.search('volumes')
+
+        self.assertEqual(result.items, [{'id': 'volume_id', 'region': 'lon1'}])
+        self.assertEqual(list(result.errors), ['nyc1'])
+
+    async def test_charges_report(self):
+        report = await self.civo.charges.report('2019-07-01', '2019-07-15')
+
+        self.assertEqual(len(report['resources']), 1000)
+        self.assertEqual(len(self.civo.cache), 2)
+
+    async def test_conditional_get(self):
+        store = ConditionalStore()
+        civo = AsyncCivo('token', api_url=self.api_url, cache=False, conditional=store)
+
+        try:
+            first = await civo.size.search()
+            second = await civo.size.search()
+        finally:
+            await civo.close()
+
+        self.assertIs(first, second)
+        self.assertEqual(store.stats()['hits'], 1)
+
+    async def test_identical_gets_are_coalesced(self):
+        civo = AsyncCivo('token', api_url=self.api_url, cache=False)
+        hits = []
+        civo.transport.add_hook(lambda event: hits.append(event) if event.kind == 'request' else None)
+
+        try:
+            results = await asyncio.gather(*[civo.size.search() for _ in range(10)])
+        finally:
+            await civo.close()
+
+        self.assertEqual(results, [[{'name': 'g3.small'}]] * 10)
+        self.assertEqual(len(hits), 1)
+
+    async def test_cassette_record_then_replay(self):
+        cassette = Cassette(mode='record')
+        civo = AsyncCivo('token', api_url=self.api_url, cassette=cassette)
+
+        try:
+            await civo.kubernetes.create(name='my_cluster', num_nodes=2)
+            await civo.charges.get()
+        finally:
+            await civo.close()
+
+        self.assertEqual([i['path'] for i in cassette.interactions],
+                         ['/v2/networks', '/v2/kubernetes/clusters', '/v2/charges'])
+
+        replay = Cassette()
+        for interaction in cassette.interactions:
+            replay._add(interaction)
+        civo = AsyncCivo('token', api_url='http://offline.invalid', cassette=replay)
+
+        try:
+            cluster = await civo.kubernetes.create(name='my_cluster', num_nodes=2)
+            charges = [charge['label'] async for charge in await civo.charges.get(stream=True)]
+        finally:
+            await civo.close()
+
+        self.assertEqual(cluster['name'], 'my_cluster')
+        self.assertEqual(len(charges), 1000)
+        self.assertEqual(len(self.created), 1)
+
+    async def test_charges_invalid_range(self):
+        result = await self.civo.charges.get(date_from='2019-07-30', date_to='2019-07-01')
+
+        self.assertIn('message', result)
+
+
+if __name__ == '__main__':
+    unittest.main()
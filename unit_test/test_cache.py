@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+from civo import Civo
+from civo.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = TTLCache()
+        key = TTLCache.key('sizes', 'https://api.civo.com/v2/sizes')
+
+        self.assertEqual(cache.get(key), (False, None))
+        cache.set(key, ['g3.small'])
+        self.assertEqual(cache.get(key), (True, ['g3.small']))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1})
+
+    def test_expires_after_ttl(self):
+        cache = TTLCache(ttls={'sizes': 10})
+        key = TTLCache.key('sizes', 'url')
+
+        with mock.patch('civo.cache.time.monotonic', return_value=100):
+            cache.set(key, 'value')
+        with mock.patch('civo.cache.time.monotonic', return_value=109):
+            self.assertTrue(cache.get(key)[0])
+        with mock.patch('civo.cache.time.monotonic', return_value=111):
+            self.assertFalse(cache.get(key)[0])
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+        cache.set(('sizes', 'a', ()), 1)
+        cache.set(('sizes', 'b', ()), 2)
+        cache.get(('sizes', 'a', ()))
+        cache.set(('sizes', 'c', ()), 3)
+
+        self.assertTrue(cache.get(('sizes', 'a', ()))[0])
+        self.assertFalse(cache.get(('sizes', 'b', ()))[0])
+        self.assertEqual(cache.evictions, 1)
+
+    def test_invalidate_endpoint(self):
+        cache = TTLCache()
+        cache.set(('sizes', 'a', ()), 1)
+        cache.set(('regions', 'b', ()), 2)
+        cache.invalidate('sizes')
+
+        self.assertFalse(cache.get(('sizes', 'a', ()))[0])
+        self.assertTrue(cache.get(('regions', 'b', ()))[0])
+
+    def test_disabled(self):
+        cache = TTLCache(enabled=False)
+        cache.set(('sizes', 'a', ()), 1)
+
+        self.assertFalse(cache.get(('sizes', 'a', ()))[0])
+
+
+class TestCatalogCache(unittest.TestCase):
+    def setUp(self):
+        self.response = mock.Mock(status_code=200)
+        self.response.json.return_value = [{'name': 'g3.small'}, {'name': 'g3.large'}]
+
+    def test_size_search_is_cached(self):
+        civo = Civo('token')
+
+        with mock.patch.object(civo.transport.session, 'request', return_value=self.response) as request:
+            civo.size.search()
+            result = civo.size.search(filter='name:large')
+
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(result, [{'name': 'g3.large'}])
+
+    def test_cache_can_be_disabled(self):
+        civo = Civo('token', cache=False)
+
+        with mock.patch.object(civo.transport.session, 'request', return_value=self.response) as request:
+            civo.regions.search()
+            civo.regions.search()
+
+        self.assertEqual(request.call_count, 2)
+
+    def test_error_is_not_cached(self):
+        civo = Civo('token')
+        error = mock.Mock(status_code=401)
+        error.json.return_value = {'code': 'authentication_failed', 'reason': 'Authentication failed'}
+
+        with mock.patch.object(civo.transport.session, 'request', side_effect=[error, self.response]) as request:
+            self.assertEqual(civo.size.search()['reason'], 'Authentication failed')
+            self.assertEqual(civo.size.search(), self.response.json.return_value)
+            civo.size.search()
+
+        self.assertEqual(request.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from requests.models import Response
+
+from civo import Civo
+from civo.cassette import Cassette, CassetteAdapter
+from civo.exceptions import CIVOAPIError
+
+RESPONSES = os.path.join(os.path.dirname(__file__), '..', 'responses')
+
+
+class TestCassetteReplay(unittest.TestCase):
+    def setUp(self):
+        self.cassette = Cassette()
+        self.cassette.add('GET', '/v2/networks', fixture=os.path.join(RESPONSES, 'get_network.json'))
+        self.cassette.add('POST', '/v2/kubernetes/clusters', fixture=os.path.join(RESPONSES, 'create_clusters.json'))
+        self.civo = Civo('token', region='lon1', cassette=self.cassette)
+
+    def test_resources_are_served_from_fixtures(self):
+        cluster = self.civo.kubernetes.create(name='your-cluster-name', num_nodes=1, nodes_size='g3.xsmall')
+
+        self.assertEqual(cluster['id'], '69a23478-a89e-41d2-97b1-6f4c341cee70')
+        self.assertEqual(len(self.civo.networks.search()), 3)
+
+    def test_exact_query_wins(self):
+        self.cassette.add('GET', '/v2/instances', {'items': [], 'page': 2}, query={'page': 2, 'region': 'lon1'})
+        self.cassette.add('GET', '/v2/instances', {'items': [], 'page': 1})
+
+        self.assertEqual(self.civo.instances.search(page=2)['page'], 2)
+        self.assertEqual(self.civo.instances.search()['page'], 1)
+
+    def test_answers_replayed_in_order(self):
+        self.cassette.add('GET', '/v2/volumes', [{'id': 'a', 'status': 'creating'}])
+        self.cassette.add('GET', '/v2/volumes', [{'id': 'a', 'status': 'available'}])
+
+        self.assertEqual(self.civo.volumes.search()[0]['status'], 'creating')
+        self.assertEqual(self.civo.volumes.search()[0]['status'], 'available')
+        self.assertEqual(self.civo.volumes.search()[0]['status'], 'available')
+
+    def test_latency(self):
+        self.cassette.latency = 0.05
+
+        with mock.patch('civo.cassette.time.sleep') as sleep:
+            self.civo.networks.search()
+
+        sleep.assert_called_once_with(0.05)
+
+    def test_unknown_request(self):
+        with self.assertRaises(CIVOAPIError):
+            self.civo.firewalls.search()
+
+
+class TestCassetteRecord(unittest.TestCase):
+    def test_record_then_replay(self):
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps([{'name': 'g3.small'}]).encode()
+        real = mock.Mock()
+        real.send.return_value = response
+
+        cassette = Cassette(mode='record')
+        civo = Civo('token', cassette=cassette)
+        civo.transport.session.mount('https://', CassetteAdapter(cassette, real))
+        civo.size.search()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sizes.jsonl')
+            cassette.save(path)
+            replay = Civo('token', cassette=Cassette(path))
+
+            self.assertEqual(replay.size.search(filter='name:small'), [{'name': 'g3.small'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from datetime import date, timedelta
+
+from civo.cache import TTLCache
+from civo.charges import Charges
+from civo.exceptions import CIVOAPIError
+
+
+class FakeTransport:
+    pool_maxsize = 4
+
+    def __init__(self, answer=None):
+        self.cache = TTLCache()
+        self.calls = []
+        self.answer = answer
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append(params)
+        if self.answer is not None:
+            return self.answer
+        return [{'code': 'instance-g3.small', 'label': 'web', 'num_hours': 24},
+                {'code': 'ip_address', 'label': '74.220.1.1', 'num_hours': 24}]
+
+
+class TestChargesReport(unittest.TestCase):
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.charges = Charges({}, 'https://api.civo.com', transport=self.transport)
+
+    def test_windows_cover_the_range(self):
+        windows = self.charges._windows('2019-07-01', '2019-08-01', window_days=7)
+
+        self.assertEqual(len(windows), 5)
+        self.assertEqual(windows[0][0]['from'][:10], '2019-07-01')
+        self.assertEqual(windows[-1][0]['from'][:10], '2019-07-29')
+        self.assertEqual(windows[-1][0]['to'][:10], '2019-08-01')
+        self.assertTrue(all(closed for _, closed in windows))
+        self.assertEqual([w[0]['to'] for w in windows[:-1]], [w[0]['from'] for w in windows[1:]])
+
+    def test_report_aggregates_every_window(self):
+        report = self.charges.report('2019-07-01', '2019-08-01')
+
+        self.assertEqual(report['hours'], 5 * 48)
+        self.assertEqual(report['types'], {'instance-g3.small': 120, 'ip_address': 120})
+        self.assertEqual(report['resources'][0], {'code': 'instance-g3.small', 'label': 'web', 'hours': 120})
+
+    def test_closed_windows_are_cached(self):
+        start = (date.today() - timedelta(days=10)).isoformat()
+
+        self.charges.report(start, window_days=7)
+        self.charges.report(start, window_days=7)
+
+        # the first week is over, the open tail is requested by both reports
+        self.assertEqual(len(self.transport.calls), 3)
+
+    def test_errors_are_raised_and_not_cached(self):
+        self.transport.answer = {'reason': 'unauthorized'}
+
+        with self.assertRaises(CIVOAPIError):
+            self.charges.report('2019-07-01', '2019-07-08')
+
+        self.assertEqual(len(self.transport.cache), 0)
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            self.charges.report('2019-07-30', '2019-07-01')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from unittest import mock
+
+from civo import civo as client_module
+from civo import Civo
+from civo.networks import Networks
+
+
+class TestCivo(unittest.TestCase):
+    def test_resources_are_built_on_first_access(self):
+        civo = Civo('token', region='lon1')
+
+        self.assertNotIn('networks', vars(civo))
+        networks = civo.networks
+
+        self.assertIsInstance(networks, Networks)
+        self.assertIs(civo.networks, networks)
+        self.assertIs(networks.transport, civo.transport)
+        self.assertIn('region=lon1', networks.url)
+
+    def test_resources_get_the_resolver(self):
+        civo = Civo('token', region='lon1')
+
+        self.assertIs(civo.instances.resolver, civo.resolver)
+        self.assertIs(civo.kubernetes.resolver, civo.resolver)
+
+    def test_default_region_printed_once(self):
+        with mock.patch.object(client_module, '_default_region_printed', False), \
+                mock.patch('civo.utils.print_err') as print_err:
+            Civo('token')
+            Civo('token')
+
+        print_err.assert_called_once_with('Using Default Region')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import unittest
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+from civo import Civo
+from civo.conditional import ConditionalStore
+
+
+class EtagAdapter(BaseAdapter):
+    """
+    Answers every GET with an ETag, and with 304 when the request carries the current one
+    """
+
+    def __init__(self, body):
+        super().__init__()
+        self.body = body
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        etag = '"{}"'.format(hash(json.dumps(self.body)))
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.headers['ETag'] = etag
+
+        if request.headers.get('If-None-Match') == etag:
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = 200
+            response._content = json.dumps(self.body).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        self.store = ConditionalStore(exclude=['/v2/charges'])
+        self.civo = Civo('token', region='lon1', conditional=self.store)
+        self.adapter = EtagAdapter([{'id': 'n1', 'label': 'default'}])
+        self.civo.transport.session.mount('https://', self.adapter)
+
+    def test_not_modified_is_served_from_the_store(self):
+        first = self.civo.networks.search()
+        second = self.civo.networks.search()
+
+        self.assertIs(first, second)
+        self.assertNotIn('If-None-Match', self.adapter.requests[0].headers)
+        self.assertIn('If-None-Match', self.adapter.requests[1].headers)
+        stats = self.store.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertGreater(stats['bytes_saved'], 0)
+
+    def test_changed_body_is_decoded_again(self):
+        self.civo.networks.search()
+        self.adapter.body = [{'id': 'n2', 'label': 'other'}]
+
+        self.assertEqual(self.civo.networks.search(), [{'id': 'n2', 'label': 'other'}])
+
+    def test_excluded_paths(self):
+        self.civo.charges.get()
+        self.civo.charges.get()
+
+        self.assertNotIn('If-None-Match', self.adapter.requests[1].headers)
+        self.assertEqual(len(self.store), 0)
+
+    def test_memory_bound(self):
+        store = ConditionalStore(max_bytes=100)
+        store.store(('a', ()), {'ETag': '"a"'}, [1], 60, 0.001)
+        store.store(('b', ()), {'ETag': '"b"'}, [2], 60, 0.001)
+        store.store(('c', ()), {}, [3], 10, 0.001)
+
+        self.assertEqual((len(store), store.size, store.evictions), (1, 60, 1))
+        self.assertEqual(store.headers(('b', ())), {'If-None-Match': '"b"'})
+
+
+if __name__ == '__main__':
+    unittest.main()
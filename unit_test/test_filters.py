@@ -0,0 +1,82 @@
+import unittest
+
+from civo.filters import compile_filter
+from civo.utils import filter_list
+
+
+class TestCompileFilter(unittest.TestCase):
+    def setUp(self):
+        self.data = [
+            {'hostname': 'web-1', 'status': 'ACTIVE', 'cpu': 2, 'public': True, 'tags': ['web'],
+             'network': {'id': 'net-1', 'label': 'Default'}},
+            {'hostname': 'web-2', 'status': 'BUILDING', 'cpu': 4, 'public': False, 'tags': ['web', 'db'],
+             'network': {'id': 'net-2', 'label': 'private net'}},
+            {'hostname': 'db-1', 'status': 'ACTIVE', 'cpu': 8, 'public': False, 'tags': ['db'],
+             'network': {'id': 'net-1', 'label': 'Default'}},
+        ]
+
+    def hostnames(self, expression):
+        return [i['hostname'] for i in filter_list(self.data, expression)]
+
+    def test_classic_partial_match(self):
+        self.assertEqual(self.hostnames('hostname:web'), ['web-1', 'web-2'])
+        self.assertEqual(self.hostnames('tags:db'), ['web-2', 'db-1'])
+        self.assertEqual(self.hostnames('cpu:4'), ['web-2'])
+
+    def test_nested_key(self):
+        self.assertEqual(self.hostnames('network.id=net-1'), ['web-1', 'db-1'])
+        self.assertEqual(self.hostnames('network.label:private net'), ['web-2'])
+
+    def test_boolean_operators(self):
+        self.assertEqual(self.hostnames('status=ACTIVE AND hostname:web'), ['web-1'])
+        self.assertEqual(self.hostnames('hostname=db-1 OR status=BUILDING'), ['web-2', 'db-1'])
+        self.assertEqual(self.hostnames('NOT status=ACTIVE'), ['web-2'])
+        self.assertEqual(self.hostnames('status=ACTIVE AND (cpu>4 OR public=true)'), ['web-1', 'db-1'])
+
+    def test_regex(self):
+        self.assertEqual(self.hostnames('hostname~^web-\\d$'), ['web-1', 'web-2'])
+        self.assertEqual(self.hostnames('hostname~"^(db|web)-1"'), ['web-1', 'db-1'])
+
+    def test_ranges_and_sets(self):
+        self.assertEqual(self.hostnames('cpu in 2..4'), ['web-1', 'web-2'])
+        self.assertEqual(self.hostnames('cpu>=4 AND cpu<8'), ['web-2'])
+        self.assertEqual(self.hostnames('status in [BUILDING, STOPPED]'), ['web-2'])
+
+    def test_quoted_keyword(self):
+        data = [{'name': 'A OR B'}, {'name': 'A'}]
+
+        self.assertEqual(filter_list(data, 'name="A OR B"'), [{'name': 'A OR B'}])
+
+    def test_classic_value_with_a_keyword(self):
+        data = [{'name': 'R AND D'}, {'name': 'R'}, {'name': 'D'}]
+
+        self.assertEqual(filter_list(data, 'name:R AND D'), [{'name': 'R AND D'}])
+        self.assertEqual(filter_list(data, 'name:R OR name:D'), data)
+
+    def test_is_cached(self):
+        self.assertIs(compile_filter('status=ACTIVE'), compile_filter('status=ACTIVE'))
+
+    def test_invalid_expressions(self):
+        for expression in ('', 'status', 'status=', 'status=ACTIVE AND', '(status=ACTIVE', 'cpu>big', 'cpu in 3'):
+            with self.assertRaises(ValueError, msg=expression):
+                compile_filter(expression)
+
+    def test_missing_nested_key(self):
+        with self.assertRaises(KeyError):
+            filter_list(self.data, 'network.cidr:10')
+
+    def test_records_without_the_key(self):
+        self.data.append({'hostname': 'bare-1', 'network': None})
+        self.data.append({'hostname': 'bare-2'})
+
+        self.assertEqual(self.hostnames('status:ACTIVE'), ['web-1', 'db-1'])
+        self.assertEqual(self.hostnames('status=BUILDING OR hostname:bare'), ['web-2', 'bare-1', 'bare-2'])
+        self.assertEqual(self.hostnames('NOT status=ACTIVE'), ['web-2', 'bare-1', 'bare-2'])
+        self.assertEqual(self.hostnames('network.id=net-2'), ['web-2'])
+        self.assertEqual(self.hostnames('status!=ACTIVE'), ['web-2'])
+        self.assertEqual(self.hostnames('cpu>=4 OR status~BUILD'), ['web-2', 'db-1'])
+        self.assertEqual(compile_filter('network.label:Default')({'hostname': 'bare-2'}), False)
+
+
+if __name__ == '__main__':
+    unittest.main()
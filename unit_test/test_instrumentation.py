@@ -0,0 +1,111 @@
+import os
+import unittest
+from unittest import mock
+
+from civo import Civo
+from civo.cassette import Cassette
+from civo.exceptions import CIVOAPIError
+from civo.instrumentation import LatencyAggregator, RequestEvent, caller, endpoint, traced
+from civo.utils import run_bulk
+
+RESPONSES = os.path.join(os.path.dirname(__file__), '..', 'responses')
+
+
+def event(kind, duration, method='GET', path='/v2/instances'):
+    return RequestEvent(kind, 'Instances', 'search', method, path, 'https://api.civo.com' + path, 200, duration,
+                        0, 10, 0, None)
+
+
+class TestEvents(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.cassette = Cassette()
+        self.cassette.add('GET', '/v2/networks', fixture=os.path.join(RESPONSES, 'get_network.json'))
+        self.cassette.add('POST', '/v2/kubernetes/clusters', fixture=os.path.join(RESPONSES, 'create_clusters.json'))
+        self.civo = Civo('token', region='lon1', cassette=self.cassette, hooks=[self.events.append])
+
+    def test_endpoint_template(self):
+        self.assertEqual(endpoint('https://api.civo.com/v2/instances/69a23478-a89e-41d2-97b1-6f4c341cee70/stop'
+                                  '?region=lon1'), '/v2/instances/{id}/stop')
+        self.assertEqual(endpoint('https://api.civo.com/v2/sizes'), '/v2/sizes')
+
+    def test_events_name_the_resource_method(self):
+        self.civo.kubernetes.create(name='your-cluster-name', num_nodes=1, nodes_size='g3.xsmall')
+
+        self.assertEqual([(e.kind, e.resource, e.operation, e.method, e.endpoint) for e in self.events], [
+            ('request', 'Kubernetes', 'create', 'GET', '/v2/networks'),
+            ('response', 'Kubernetes', 'create', 'GET', '/v2/networks'),
+            ('request', 'Kubernetes', 'create', 'POST', '/v2/kubernetes/clusters'),
+            ('response', 'Kubernetes', 'create', 'POST', '/v2/kubernetes/clusters'),
+        ])
+        response = self.events[-1]
+        self.assertEqual(response.status, 200)
+        self.assertGreater(response.request_bytes, 0)
+        self.assertGreater(response.response_bytes, 0)
+        self.assertGreaterEqual(response.duration, 0)
+
+    def test_traced_methods(self):
+        @traced
+        class Resource:
+            def sync(self):
+                return [result.result for result in run_bulk(lambda item: caller(), [1, 2])]
+
+        self.assertEqual(Resource().sync(), [('Resource', 'sync'), ('Resource', 'sync')])
+        self.assertEqual(caller(), (None, None))
+
+    def test_retries_are_counted(self):
+        self.cassette.add('GET', '/v2/volumes', {'reason': 'unavailable'}, status=503)
+        self.cassette.add('GET', '/v2/volumes', [])
+
+        with mock.patch('civo.transport.time.sleep'):
+            self.civo.volumes.search()
+
+        self.assertEqual((self.events[-1].kind, self.events[-1].retries), ('response', 1))
+
+    def test_error_event(self):
+        with self.assertRaises(CIVOAPIError):
+            self.civo.firewalls.search()
+
+        self.assertEqual(self.events[-1].kind, 'error')
+        self.assertIsInstance(self.events[-1].error, CIVOAPIError)
+
+    def test_failing_hook_does_not_fail_the_call(self):
+        self.civo.transport.add_hook(mock.Mock(side_effect=ValueError('broken')))
+
+        with mock.patch('sys.stderr'):
+            self.assertEqual(len(self.civo.networks.search()), 3)
+
+    def test_no_hooks(self):
+        self.civo.transport.remove_hook(self.events.append)
+
+        with mock.patch('civo.transport.caller') as caller:
+            self.civo.networks.search()
+
+        caller.assert_not_called()
+        self.assertEqual(self.events, [])
+
+
+class TestLatencyAggregator(unittest.TestCase):
+    def test_percentiles(self):
+        aggregator = LatencyAggregator(growth=1.01)
+        aggregator(event('request', None))
+        for i in range(1, 101):
+            aggregator(event('response', i / 1000.0))
+        aggregator(event('error', 0.5, method='POST'))
+
+        summary = aggregator.summary()
+        stats = summary[('GET', '/v2/instances')]
+
+        self.assertEqual(stats['count'], 100)
+        self.assertAlmostEqual(stats['p50'], 0.050, delta=0.001)
+        self.assertAlmostEqual(stats['p95'], 0.095, delta=0.001)
+        self.assertAlmostEqual(stats['p99'], 0.099, delta=0.001)
+        self.assertEqual(stats['response_bytes'], 1000)
+        self.assertEqual(summary[('POST', '/v2/instances')]['errors'], 1)
+
+        aggregator.reset()
+        self.assertEqual(aggregator.summary(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from civo.exceptions import CIVOAPIError
+from civo.inventory import Inventory
+
+
+def client(instances, volumes=None):
+    civo = mock.Mock()
+    civo.instances.iter_all.side_effect = lambda: iter(list(instances))
+    civo.volumes.search.side_effect = lambda: list(volumes or [])
+    return civo
+
+
+class TestInventory(unittest.TestCase):
+    def setUp(self):
+        self.instances = [{'id': 'i1', 'network_id': 'n1', 'status': 'ACTIVE', 'tags': ['web']},
+                          {'id': 'i2', 'network_id': 'n2', 'status': 'ACTIVE', 'tags': ['db']}]
+        self.volumes = [{'id': 'v1', 'instance_id': 'i1'}]
+        self.civo = client(self.instances, self.volumes)
+        self.inventory = Inventory(self.civo, types=['instances', 'volumes'])
+
+    def test_refresh_and_find(self):
+        changes = self.inventory.refresh()
+
+        self.assertEqual(changes['instances'].added, ['i1', 'i2'])
+        self.assertEqual([i['id'] for i in self.inventory.find('instances', network_id='n1')], ['i1'])
+        self.assertEqual([i['id'] for i in self.inventory.find('instances', tags='db', status='ACTIVE')], ['i2'])
+        self.assertEqual([v['id'] for v in self.inventory.find('volumes', instance_id='i1')], ['v1'])
+        self.assertEqual(self.inventory.find('instances', network_id='n9'), [])
+
+    def test_incremental_changes(self):
+        self.inventory.refresh()
+        self.instances[0] = dict(self.instances[0], network_id='n2')
+        del self.instances[1]
+        self.instances.append({'id': 'i3', 'network_id': 'n1', 'status': 'BUILDING'})
+
+        changes = self.inventory.refresh(['instances'])['instances']
+
+        self.assertEqual(changes, (['i3'], ['i1'], ['i2']))
+        self.assertEqual([i['id'] for i in self.inventory.find('instances', network_id='n2')], ['i1'])
+        self.assertEqual([i['id'] for i in self.inventory.find('instances', network_id='n1')], ['i3'])
+
+    def test_schedule(self):
+        self.inventory.refresh()
+
+        self.assertEqual(self.inventory.due(), [])
+        self.assertEqual(self.inventory.refresh(), {})
+
+    @mock.patch('civo.inventory.print_err')
+    def test_failed_refresh_is_reported(self, print_err):
+        self.inventory.refresh()
+        refreshed_at = self.inventory.refreshed_at['volumes']
+        self.civo.volumes.search.side_effect = ConnectionError('down')
+        self.inventory._attempted['volumes'] = None
+        print_err.side_effect = lambda message: self.inventory._stop.set()
+
+        self.inventory.start()
+        self.inventory._thread.join(timeout=5)
+
+        self.assertIsInstance(self.inventory.errors['volumes'].error, ConnectionError)
+        self.assertEqual(self.inventory.refreshed_at['volumes'], refreshed_at)
+        self.assertEqual(self.inventory.due(), [])
+        self.assertEqual(self.inventory.get('volumes', 'v1')['instance_id'], 'i1')
+        print_err.assert_called_once()
+
+    def test_failed_type_does_not_stop_the_others(self):
+        self.civo.instances.iter_all.side_effect = ConnectionError('down')
+
+        with self.assertRaises(CIVOAPIError) as context:
+            self.inventory.refresh()
+
+        self.assertEqual(list(context.exception.body), ['instances'])
+        self.assertEqual(self.inventory.get('volumes', 'v1')['instance_id'], 'i1')
+        self.assertIsNone(self.inventory.refreshed_at['instances'])
+        self.assertEqual(self.inventory.due(), [])
+
+    def test_failed_apply_is_scheduled_again(self):
+        self.civo.volumes.search.side_effect = lambda: [{'name': 'without id'}]
+
+        with self.assertRaises(CIVOAPIError):
+            self.inventory.refresh(['volumes'])
+
+        self.assertIsNotNone(self.inventory._attempted['volumes'])
+        self.assertIsInstance(self.inventory.errors['volumes'].error, KeyError)
+
+    def test_sqlite_mirror(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'inventory.db')
+            self.inventory = Inventory(self.civo, types=['instances'], path=path)
+            self.inventory.refresh()
+            self.inventory.stop()
+
+            restored = Inventory(client([]), types=['instances'], path=path)
+            self.assertEqual(restored.get('instances', 'i2')['network_id'], 'n2')
+            restored.stop()
+
+    def test_invalid_type(self):
+        with self.assertRaises(ValueError):
+            Inventory(self.civo, types=['dns'])
+
+
+if __name__ == '__main__':
+    unittest.main()
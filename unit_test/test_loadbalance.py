@@ -0,0 +1,122 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from civo.exceptions import CIVOAPIError
+from civo.loadbalance import LoadBalance
+
+BALANCER = {'id': 'lb1', 'hostname': 'www.example.com', 'policy': 'round_robin', 'max_conns': 20,
+            'backends': [{'instance_id': 'i1', 'protocol': 'http', 'port': 80}]}
+
+
+class TestBackendDeltas(unittest.TestCase):
+    def setUp(self):
+        self.transport = mock.Mock()
+        self.transport.get.return_value = [dict(BALANCER), {'id': 'lb2', 'backends': []}]
+        self.transport.put.side_effect = lambda url, data=None: {'id': url}
+        self.loadbalance = LoadBalance({}, 'https://api.civo.com', 'lon1', transport=self.transport)
+
+    def test_add_keeps_backends_and_settings(self):
+        result = self.loadbalance.add_backends('lb1', [{'instance_id': 'i2', 'protocol': 'http', 'port': 80}])
+
+        self.assertIsNone(result.error)
+        url, data = self.transport.put.call_args[0][0], self.transport.put.call_args[1]['data']
+        self.assertEqual(url, 'https://api.civo.com/v2/loadbalancers/lb1?region=lon1')
+        self.assertEqual(data['backends[0][instance_id]'], 'i1')
+        self.assertEqual(data['backends[1][instance_id]'], 'i2')
+        self.assertEqual((data['policy'], data['max_conns'], data['hostname']), ('round_robin', 20, 'www.example.com'))
+
+    def test_pending_changes_are_coalesced(self):
+        self.loadbalance.add_backends('lb1', [{'instance_id': 'i2', 'protocol': 'http', 'port': 80}], flush=False)
+        self.loadbalance.remove_backends('lb1', [{'instance_id': 'i1', 'protocol': 'http', 'port': 80}], flush=False)
+        self.loadbalance.add_backends('lb2', [{'instance_id': 'i3', 'protocol': 'http', 'port': 80}], flush=False)
+
+        results = self.loadbalance.flush()
+
+        self.assertEqual(sorted(results), ['lb1', 'lb2'])
+        self.transport.get.assert_called_once()
+        self.assertEqual(self.transport.put.call_count, 2)
+        self.assertEqual([b['instance_id'] for b in self.loadbalance._views['lb1']['backends']], ['i2'])
+
+        # the view is kept, the next change is sent without listing again
+        self.loadbalance.remove_backends('lb1', [{'instance_id': 'i2', 'protocol': 'http', 'port': 80}])
+        self.transport.get.assert_called_once()
+
+    def test_changes_cancelling_each_other_send_nothing(self):
+        backend = {'instance_id': 'i2', 'protocol': 'http', 'port': 80}
+        self.loadbalance.add_backends('lb1', [backend], flush=False)
+        self.loadbalance.remove_backends('lb1', [backend], flush=False)
+
+        self.assertIsNone(self.loadbalance.flush()['lb1'].result)
+        self.transport.put.assert_not_called()
+
+    def test_failed_update_is_dropped(self):
+        self.transport.put.side_effect = None
+        self.transport.put.return_value = {'result': 'failed', 'reason': 'invalid backend'}
+
+        with self.assertRaises(CIVOAPIError):
+            self.loadbalance.add_backends('lb1', [{'instance_id': 'i2', 'protocol': 'http', 'port': 80}])
+
+        self.assertNotIn('lb1', self.loadbalance._pending)
+        self.assertNotIn('lb1', self.loadbalance._views)
+
+        # the next change is planned from a new listing, without the failed one
+        self.transport.put.side_effect = lambda url, data=None: {'id': url}
+        self.loadbalance.add_backends('lb1', [{'instance_id': 'i3', 'protocol': 'http', 'port': 80}])
+        data = self.transport.put.call_args[1]['data']
+        self.assertEqual(sorted(v for k, v in data.items() if k.endswith('[instance_id]')), ['i1', 'i3'])
+
+    def test_failed_update_is_reported_by_flush(self):
+        self.transport.put.side_effect = None
+        self.transport.put.return_value = {'result': 'failed', 'reason': 'invalid backend'}
+        self.loadbalance.add_backends('lb1', [{'instance_id': 'i2', 'protocol': 'http', 'port': 80}], flush=False)
+
+        results = self.loadbalance.flush()
+
+        self.assertIsInstance(results['lb1'].error, CIVOAPIError)
+        self.assertEqual(self.loadbalance.flush(), {})
+
+    def test_concurrent_changes_are_not_lost(self):
+        sent = []
+
+        def put(url, data=None):
+            sent.append(sorted(v for k, v in data.items() if k.endswith('[instance_id]')))
+            time.sleep(0.05)
+            return {'id': 'lb1'}
+
+        self.transport.put.side_effect = put
+        self.loadbalance.refresh()
+        results = {}
+
+        def add(instance):
+            backend = {'instance_id': instance, 'protocol': 'http', 'port': 80}
+            results[instance] = self.loadbalance.add_backends('lb1', [backend])
+
+        threads = [threading.Thread(target=add, args=(instance,)) for instance in ('i2', 'i3', 'i4')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sent[-1], ['i1', 'i2', 'i3', 'i4'])
+        self.assertEqual([b['instance_id'] for b in self.loadbalance._views['lb1']['backends']],
+                         ['i1', 'i2', 'i3', 'i4'])
+        self.assertTrue(all(result is not None and result.error is None for result in results.values()))
+
+    def test_listing_older_than_an_update_keeps_its_view(self):
+        self.loadbalance.refresh()
+        since = self.loadbalance._settles
+        self.loadbalance.add_backends('lb1', [{'instance_id': 'i2', 'protocol': 'http', 'port': 80}])
+
+        self.loadbalance._store_views([dict(BALANCER), {'id': 'lb2', 'backends': []}], since)
+
+        self.assertEqual(len(self.loadbalance._views['lb1']['backends']), 2)
+
+    def test_unknown_balancer(self):
+        with self.assertRaises(CIVOAPIError):
+            self.loadbalance.add_backends('lb9', [{'instance_id': 'i2'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+import unittest
+
+from civo import Civo
+from civo.cassette import Cassette
+from civo.models import Cluster, Instance, Network, build
+
+RESPONSES = os.path.join(os.path.dirname(__file__), '..', 'responses')
+
+
+def instance(i):
+    return {'id': str(i), 'hostname': 'web-{}'.format(i), 'size': 'g3.' + 'small', 'region': ''.join(['lon', '1']),
+            'status': 'ACTIVE', 'tags': ['web'], 'notes': 'rarely read', 'unknown_key': i}
+
+
+class TestModels(unittest.TestCase):
+    def test_fields_and_dict_access(self):
+        record = Instance(instance(1))
+
+        self.assertEqual(record.hostname, 'web-1')
+        self.assertEqual(record['size'], 'g3.small')
+        self.assertEqual(record.get('unknown_key'), 1)
+        self.assertIsNone(record.get('public_ip'))
+        self.assertNotIn('public_ip', record)
+        with self.assertRaises(KeyError):
+            record['public_ip']
+
+    def test_shared_strings_are_interned(self):
+        first, second = Instance(instance(1)), Instance(instance(2))
+
+        self.assertIs(first.region, second.region)
+        self.assertIs(first.size, second.size)
+        self.assertIs(first.tags[0], second.tags[0])
+
+    def test_lazy_nested_fields(self):
+        with open(os.path.join(RESPONSES, 'create_clusters.json')) as fd:
+            data = json.load(fd)
+        cluster = Cluster(data)
+
+        self.assertIsInstance(cluster._installed_applications, bytes)
+        self.assertEqual(cluster.installed_applications[0]['application'], 'Traefik')
+        self.assertEqual(cluster.instances[0]['region'], 'NYC1')
+        self.assertIsNone(cluster.pools)
+        self.assertEqual(cluster.to_dict(), data)
+
+    def test_no_dict_per_record(self):
+        self.assertFalse(hasattr(Instance(instance(1)), '__dict__'))
+
+    def test_build_keeps_the_page(self):
+        page = build({'page': 1, 'pages': 3, 'items': [instance(1), instance(2)]}, Instance)
+
+        self.assertEqual(page['pages'], 3)
+        self.assertEqual([record.id for record in page['items']], ['1', '2'])
+
+    def test_build_awaitable(self):
+        async def result():
+            return [instance(1)]
+
+        self.assertEqual(asyncio.run(build(result(), Instance)), [Instance(instance(1))])
+
+
+class TestSearchModels(unittest.TestCase):
+    def test_search_returns_models_on_request(self):
+        cassette = Cassette()
+        cassette.add('GET', '/v2/networks', fixture=os.path.join(RESPONSES, 'get_network.json'))
+        civo = Civo('token', region='lon1', cassette=cassette)
+
+        networks = civo.networks.search(filter='label:Default', model=True)
+
+        self.assertEqual(networks, [Network({'id': 'network_id', 'default': True, 'name': 'cust-f5a8f98c-808d-default',
+                                             'label': 'Default'})])
+        self.assertIsInstance(civo.networks.search()[0], dict)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from civo import Civo
+from civo.cassette import Cassette
+from civo.exceptions import CIVOAPIError
+from civo.multiregion import _tag
+
+
+class TestMultiRegion(unittest.TestCase):
+    def setUp(self):
+        self.cassette = Cassette()
+        self.cassette.add('GET', '/v2/regions', [{'code': 'lon1'}, {'code': 'nyc1'}, {'code': 'fra1'}])
+        self.civo = Civo('token', region='lon1', cassette=self.cassette)
+
+    def test_items_of_every_region_are_tagged(self):
+        for region in ('lon1', 'nyc1', 'fra1'):
+            self.cassette.add('GET', '/v2/volumes', [{'id': region + '-a', 'status': 'available'}],
+                              query={'region': region})
+
+        result = self.civo.multiregion.search('volumes')
+
+        self.assertEqual(sorted((i['region'], i['id']) for i in result.items),
+                         [('fra1', 'fra1-a'), ('lon1', 'lon1-a'), ('nyc1', 'nyc1-a')])
+        self.assertEqual(result.errors, {})
+
+    def test_failed_region_is_reported(self):
+        self.cassette.add('GET', '/v2/instances', {'items': [{'id': 'a'}], 'page': 1, 'pages': 1},
+                          query={'region': 'lon1', 'page': 1, 'per_page': 100})
+        self.cassette.add('GET', '/v2/instances', {'reason': 'unavailable'}, status=500,
+                          query={'region': 'nyc1', 'page': 1, 'per_page': 100})
+
+        result = self.civo.multiregion.search('instances', regions=['lon1', 'nyc1'])
+
+        self.assertEqual(result.items, [{'id': 'a', 'region': 'lon1'}])
+        self.assertEqual(list(result.errors), ['nyc1'])
+
+    def test_region_of_the_item_is_kept(self):
+        self.cassette.add('GET', '/v2/networks', [{'id': 'n', 'region': 'LON1', 'label': 'default'}])
+
+        result = self.civo.multiregion.search('networks', regions=['lon1'], filter='label:default')
+
+        self.assertEqual(result.items[0]['region'], 'LON1')
+
+    def test_records_are_not_modified(self):
+        records = [{'id': 'a'}]
+
+        self.assertEqual(_tag(records, 'lon1'), [{'id': 'a', 'region': 'lon1'}])
+        self.assertEqual(records, [{'id': 'a'}])
+
+    def test_failed_region_listing(self):
+        cassette = Cassette()
+        cassette.add('GET', '/v2/regions', {'code': 'authentication_failed', 'reason': 'Authentication failed'},
+                     status=401)
+        civo = Civo('token', region='lon1', cassette=cassette)
+
+        with self.assertRaises(CIVOAPIError):
+            civo.multiregion.regions()
+
+    def test_invalid_resource(self):
+        with self.assertRaises(ValueError):
+            self.civo.multiregion.search('dns')
+
+    def test_id_urls_keep_the_region_in_the_query(self):
+        self.assertEqual(self.civo.volumes.get_url('/a/attach'), 'https://api.civo.com/v2/volumes/a/attach?region=lon1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import http.client
+import json
+import threading
+import unittest
+from urllib.parse import urlsplit
+
+from civo import Civo
+from civo.receiver import WebhookReceiver, deliver, sign, synthetic_event, verify
+
+
+class TestSignature(unittest.TestCase):
+    def test_verify(self):
+        body = b'{"event": "test"}'
+
+        self.assertTrue(verify('secret', body, sign('secret', body)))
+        self.assertTrue(verify('secret', body, 'sha256=' + sign('secret', body)))
+        self.assertFalse(verify('other', body, sign('secret', body)))
+        self.assertFalse(verify('secret', body, None))
+
+
+class TestWebhookReceiver(unittest.TestCase):
+    def setUp(self):
+        self.receiver = Civo('token').webhook.receiver('secret', batch_wait=0.01)
+        self.events = []
+        self.done = threading.Event()
+
+        def handler(events):
+            self.events.extend(events)
+            if len(self.events) >= 3:
+                self.done.set()
+
+        self.receiver.on('instance.created', handler)
+        self.receiver.start()
+
+    def tearDown(self):
+        self.receiver.stop()
+
+    def test_events_reach_the_handlers(self):
+        self.assertEqual(self.receiver.test('instance.created', instance_id='i1'), 202)
+        self.assertEqual(deliver(self.receiver.url, 'secret', [synthetic_event('instance.created'),
+                                                               synthetic_event('instance.created')]), 202)
+
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(self.events[0]['instance_id'], 'i1')
+        self.assertEqual(self.receiver.stats()['received'], 3)
+
+    def test_invalid_signature(self):
+        self.assertEqual(deliver(self.receiver.url, 'wrong', synthetic_event()), 401)
+        self.assertEqual(self.receiver.stats()['rejected'], 1)
+
+    def test_invalid_body(self):
+        parts = urlsplit(self.receiver.url)
+        connection = http.client.HTTPConnection(parts.hostname, parts.port)
+        connection.request('POST', '/', body=b'{', headers={'X-Civo-Signature': sign('secret', b'{')})
+
+        self.assertEqual(connection.getresponse().status, 400)
+        connection.close()
+
+
+class TestBackpressure(unittest.TestCase):
+    def test_full_queue_answers_503(self):
+        receiver = WebhookReceiver('secret', queue_size=2)
+        body = json.dumps(synthetic_event()).encode()
+
+        # not started, nothing takes the events from the queue
+        statuses = [receiver.receive(body, sign('secret', body))[0] for _ in range(3)]
+
+        self.assertEqual(statuses, [202, 202, 503])
+        self.assertEqual(receiver.stats()['refused'], 1)
+        receiver._server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
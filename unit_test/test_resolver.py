@@ -0,0 +1,87 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from civo.exceptions import CIVOAPIError
+from civo.intances import Instances
+from civo.kubernetes import Kubernetes
+from civo.resolver import Resolver
+
+RESPONSES = os.path.join(os.path.dirname(__file__), '..', 'responses')
+
+
+class TestResolver(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(RESPONSES, 'get_network.json')) as fd:
+            self.networks = json.load(fd)
+        self.transport = mock.Mock()
+        self.transport.get.return_value = self.networks
+        self.resolver = Resolver(self.transport, 'https://api.civo.com', min_refresh=0)
+
+    def test_resolve_by_name_label_and_id(self):
+        self.assertEqual(self.resolver.resolve('networks', 'cust-f5a8f98c-61c9-public'),
+                         '85a6db60-9b57-4bb3-9ab4-17334e3e0249')
+        self.assertEqual(self.resolver.resolve('networks', 'internal'), '52732d38-4eb2-448b-82a4-f8f614f94674')
+        self.assertEqual(self.resolver.resolve('networks', 'network_id'), 'network_id')
+        self.assertEqual(self.transport.get.call_count, 1)
+
+    def test_default_network(self):
+        self.assertEqual(self.resolver.resolve('networks'), 'network_id')
+
+    def test_index_per_region(self):
+        self.resolver.resolve('networks', 'public', region='lon1')
+        self.resolver.resolve('networks', 'public', region='nyc1')
+
+        self.transport.get.assert_called_with('https://api.civo.com/v2/networks', params={'region': 'nyc1'})
+        self.assertEqual(self.transport.get.call_count, 2)
+
+    def test_miss_refreshes_once(self):
+        with self.assertRaises(CIVOAPIError):
+            self.resolver.resolve('networks', 'missing')
+
+        self.assertEqual(self.transport.get.call_count, 2)
+
+    def test_sizes_resolve_to_name(self):
+        self.transport.get.return_value = [{'id': 'size-id', 'name': 'g3.small'}]
+
+        self.assertEqual(self.resolver.resolve('sizes', 'size-id'), 'g3.small')
+
+    def test_ids_and_size_names_are_not_looked_up(self):
+        self.assertEqual(self.resolver.resolve('sizes', 'g3.k3s.small'), 'g3.k3s.small')
+        self.assertEqual(self.resolver.resolve('networks', '52732d38-4eb2-448b-82a4-f8f614f94674'),
+                         '52732d38-4eb2-448b-82a4-f8f614f94674')
+        self.transport.get.assert_not_called()
+
+    def test_error_listing(self):
+        self.transport.get.return_value = {'code': 'database_error', 'reason': 'Server error'}
+
+        with self.assertRaises(CIVOAPIError) as context:
+            self.resolver.resolve('sizes', 'size-id')
+
+        self.assertEqual(context.exception.body['reason'], 'Server error')
+
+    def test_kubernetes_create_lists_networks_once(self):
+        self.transport.post.return_value = {'id': 'cluster'}
+        kubernetes = Kubernetes({}, 'https://api.civo.com', 'lon1', self.transport, self.resolver)
+
+        kubernetes.create(name='one')
+        kubernetes.create(name='two', network='internal')
+
+        self.assertEqual(self.transport.get.call_count, 1)
+        self.assertEqual(self.transport.post.call_args[1]['params']['network_id'],
+                         '52732d38-4eb2-448b-82a4-f8f614f94674')
+
+    def test_instances_create_resolves_the_network(self):
+        self.transport.post.return_value = {'id': 'instance'}
+        instances = Instances({}, 'https://api.civo.com', 'lon1', self.transport, self.resolver)
+
+        instances.create(hostname='web', size='g3.small', template_id='template', network_id='internal')
+
+        params = self.transport.post.call_args[1]['params']
+        self.assertEqual(params['network_id'], '52732d38-4eb2-448b-82a4-f8f614f94674')
+        self.assertEqual(params['size'], 'g3.small')
+
+
+if __name__ == '__main__':
+    unittest.main()
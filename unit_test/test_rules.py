@@ -0,0 +1,82 @@
+import time
+import unittest
+from unittest import mock
+
+from civo.firewall import Firewall
+from civo.rules import analyze_rules, diff_rules, rule_key
+
+
+class TestAnalyzeRules(unittest.TestCase):
+    def test_duplicates_redundant_and_overlapping(self):
+        rules = [
+            {'protocol': 'tcp', 'start_port': '80', 'end_port': '90', 'cidr': '10.0.0.0/8'},
+            {'protocol': 'tcp', 'start_port': '80', 'end_port': '90', 'cidr': '10.0.0.0/8', 'label': 'again'},
+            {'protocol': 'tcp', 'start_port': '85', 'cidr': '10.1.0.0/16'},
+            {'protocol': 'tcp', 'start_port': '88', 'end_port': '100', 'cidr': '10.2.0.0/16'},
+            {'protocol': 'udp', 'start_port': '85', 'cidr': '10.1.0.0/16'},
+            {'protocol': 'tcp', 'start_port': '85', 'cidr': '192.168.0.0/16'},
+            {'protocol': 'tcp', 'start_port': '22', 'direction': 'outbound', 'cidr': '10.1.0.0/16'},
+        ]
+
+        report = analyze_rules(rules)
+
+        self.assertEqual(report.duplicates, [(1, 0)])
+        self.assertEqual(report.redundant, [(2, 0)])
+        self.assertEqual(report.overlapping, [(0, 3)])
+
+    def test_rules_covering_each_other_keep_the_first(self):
+        rules = [{'start_port': '443', 'cidr': '10.0.0.0/8'}, {'start_port': '443', 'cidr': ['10.0.0.0/8', '10.1.0.0/16']}]
+
+        self.assertEqual(analyze_rules(rules).redundant, [(1, 0)])
+
+    def test_key(self):
+        self.assertEqual(rule_key({'start_port': '22', 'cidr': '10.0.0.1/8'})[:4], ('inbound', 'tcp', 22, 22))
+        self.assertEqual(rule_key({'protocol': 'icmp', 'start_port': ''})[2:4], (0, 65535))
+
+
+class TestDiffRules(unittest.TestCase):
+    def test_only_missing_rules_are_created(self):
+        current = [{'id': 'a', 'protocol': 'tcp', 'start_port': '22', 'end_port': '22', 'cidr': ['0.0.0.0/0']},
+                   {'id': 'b', 'protocol': 'tcp', 'start_port': '22', 'end_port': '22', 'cidr': ['0.0.0.0/0']},
+                   {'id': 'c', 'protocol': 'tcp', 'start_port': '3306', 'end_port': '3306', 'cidr': ['0.0.0.0/0']}]
+        desired = [{'start_port': '22'}, {'start_port': '443'}, {'start_port': '443', 'cidr': '10.0.0.0/8'}]
+
+        diff = diff_rules(current, desired)
+
+        self.assertEqual(diff.create, [{'start_port': '443'}])
+        self.assertEqual([rule['id'] for rule in diff.delete], ['b', 'c'])
+        self.assertEqual(diff_rules(current, desired, delete=False).delete, [])
+
+
+class TestReconcile(unittest.TestCase):
+    def test_changes_of_every_firewall(self):
+        transport = mock.Mock()
+        transport.get.side_effect = lambda url, filter=None: {
+            'https://api.civo.com/v2/firewalls/f1/rules?region=lon1': [{'id': 'r1', 'start_port': '22'}],
+            'https://api.civo.com/v2/firewalls/f2/rules?region=lon1': {'reason': 'not found'},
+        }[url]
+        firewall = Firewall({}, 'https://api.civo.com', 'lon1', transport=transport)
+
+        result = firewall.reconcile({'f1': [{'start_port': '443'}], 'f2': []})
+
+        transport.delete.assert_called_once_with('https://api.civo.com/v2/firewalls/f1/rules/r1?region=lon1')
+        self.assertEqual(transport.post.call_args[1]['params'],
+                         {'protocol': 'tcp', 'start_port': '443', 'cidr': '0.0.0.0/0', 'direction': 'inbound'})
+        self.assertEqual(result['f1']['errors'], [])
+        self.assertEqual(len(result['f2']['errors']), 1)
+
+    def test_deletes_before_creates(self):
+        calls = []
+        transport = mock.Mock()
+        transport.get.return_value = [{'id': 'r1', 'start_port': '22'}, {'id': 'r2', 'start_port': '80'}]
+        transport.delete.side_effect = lambda url: time.sleep(0.02) or calls.append('delete')
+        transport.post.side_effect = lambda url, params: calls.append('create')
+        firewall = Firewall({}, 'https://api.civo.com', 'lon1', transport=transport)
+
+        firewall.reconcile({'f1': [{'start_port': '443'}], 'f2': [{'start_port': '8080'}]})
+
+        self.assertEqual(calls, ['delete'] * 4 + ['create'] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
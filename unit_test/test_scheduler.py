@@ -0,0 +1,118 @@
+import unittest
+from unittest import mock
+
+from civo.exceptions import CIVOAPIError
+from civo.scheduler import RetryPolicy, TokenBucket
+from civo.transport import Transport
+
+
+def response(status, body=None, headers=None):
+    r = mock.Mock()
+    r.status_code = status
+    r.headers = headers if headers else {}
+    r.text = 'error'
+    r.json.return_value = body
+    return r
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        with mock.patch('civo.scheduler.time.monotonic', return_value=100):
+            bucket = TokenBucket(rate=2, burst=2)
+            waits = [bucket.reserve() for _ in range(4)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 1.0])
+
+    def test_tokens_come_back(self):
+        with mock.patch('civo.scheduler.time.monotonic', return_value=100):
+            bucket = TokenBucket(rate=1, burst=1)
+            bucket.reserve()
+        with mock.patch('civo.scheduler.time.monotonic', return_value=101):
+            self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_pause(self):
+        with mock.patch('civo.scheduler.time.monotonic', return_value=100):
+            bucket = TokenBucket(rate=10)
+            bucket.pause(3)
+            self.assertEqual(bucket.reserve(), 3)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_only_idempotent_methods(self):
+        policy = RetryPolicy(max_retries=2)
+
+        self.assertTrue(policy.can_retry('GET', 0))
+        self.assertTrue(policy.can_retry('DELETE', 1))
+        self.assertFalse(policy.can_retry('GET', 2))
+        self.assertFalse(policy.can_retry('POST', 0))
+
+    def test_backoff_with_jitter_is_bounded(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+
+        for attempt in range(6):
+            self.assertLessEqual(policy.delay(attempt), min(5, 2 ** attempt))
+
+    def test_retry_after(self):
+        policy = RetryPolicy(max_backoff=30)
+
+        self.assertEqual(policy.delay(0, '7'), 7)
+        self.assertEqual(policy.delay(0, '120'), 120)
+        self.assertTrue(policy.can_retry('GET', 0, 30))
+        self.assertFalse(policy.can_retry('GET', 0, 120))
+
+
+class TestTransportRetry(unittest.TestCase):
+    def setUp(self):
+        self.transport = Transport(retry=RetryPolicy(max_retries=2))
+        self.sleep = mock.patch('civo.transport.time.sleep').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_get_is_retried(self):
+        responses = [response(503), response(429, headers={'Retry-After': '2'}), response(200, {'result': 'ok'})]
+
+        with mock.patch.object(self.transport.session, 'request', side_effect=responses) as request:
+            result = self.transport.get('https://api.civo.com/v2/instances')
+
+        self.assertEqual(result, {'result': 'ok'})
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(self.sleep.call_args_list[-1], mock.call(2.0))
+
+    def test_post_is_not_retried(self):
+        with mock.patch.object(self.transport.session, 'request', return_value=response(503)) as request:
+            with self.assertRaises(CIVOAPIError) as error:
+                self.transport.post('https://api.civo.com/v2/instances')
+
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(error.exception.status, 503)
+
+    def test_gives_up_after_max_retries(self):
+        with mock.patch.object(self.transport.session, 'request', return_value=response(429)) as request:
+            with self.assertRaises(CIVOAPIError):
+                self.transport.get('https://api.civo.com/v2/instances')
+
+        self.assertEqual(request.call_count, 3)
+
+    def test_retry_after_over_the_budget(self):
+        self.transport.limiter = TokenBucket(rate=10)
+        r = response(429, headers={'Retry-After': '60'})
+
+        with mock.patch.object(self.transport.session, 'request', return_value=r) as request:
+            with self.assertRaises(CIVOAPIError) as error:
+                self.transport.get('https://api.civo.com/v2/instances')
+
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(error.exception.status, 429)
+        self.sleep.assert_not_called()
+        self.assertGreater(self.transport.limiter.reserve(), 50)
+
+    def test_invalid_json(self):
+        r = response(500)
+        r.json.side_effect = ValueError('no json')
+
+        with mock.patch.object(self.transport.session, 'request', return_value=r):
+            with self.assertRaises(CIVOAPIError):
+                self.transport.get('https://api.civo.com/v2/instances')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+from civo import Civo
+from civo.singleflight import SingleFlight
+
+
+class SlowAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        time.sleep(0.1)
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps([{'name': 'g3.small'}]).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def call():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            first = executor.submit(flights.do, 'key', call)
+            started.wait()
+            others = [executor.submit(flights.do, 'key', call) for _ in range(9)]
+
+        self.assertEqual([first.result()] + [f.result() for f in others], ['result'] * 10)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.stats(), {'calls': 1, 'coalesced': 9, 'in_flight': 0})
+
+    def test_error_reaches_every_caller(self):
+        flights = SingleFlight()
+
+        def call():
+            raise ValueError('failed')
+
+        with self.assertRaises(ValueError):
+            flights.do('key', call)
+        self.assertEqual(flights.do('key', lambda: 'again'), 'again')
+
+    def test_client_coalesces_identical_gets(self):
+        civo = Civo('token', cache=False)
+        adapter = SlowAdapter()
+        civo.transport.session.mount('https://', adapter)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: civo.size.search(), range(8)))
+
+        self.assertEqual(results, [[{'name': 'g3.small'}]] * 8)
+        self.assertEqual(adapter.calls, 1)
+
+    def test_disabled(self):
+        civo = Civo('token', cache=False, coalesce=False)
+        adapter = SlowAdapter()
+        civo.transport.session.mount('https://', adapter)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: civo.size.search(), range(4)))
+
+        self.assertEqual(adapter.calls, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import types
+import unittest
+
+from civo import Civo
+from civo.cassette import Cassette
+from civo.exceptions import CIVOAPIError
+from civo.models import Instance
+from civo.streaming import ItemDecoder, iter_items
+
+PAGE = {'page': 1, 'per_page': 50, 'pages': 2,
+        'items': [{'id': str(i), 'hostname': 'héllo "{}"'.format(i), 'status': 'ACTIVE' if i % 2 else 'SHUTOFF',
+                   'cpu_cores': i * 2, 'tags': ['a', 'b']} for i in range(50)]}
+
+
+def chunks(data, size):
+    raw = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class TestItemDecoder(unittest.TestCase):
+    def test_any_chunk_boundary(self):
+        for size in (1, 3, 17, 4096):
+            decoder = ItemDecoder()
+            items = []
+            for chunk in chunks(PAGE, size):
+                items += decoder.feed(chunk)
+            items += decoder.close()
+
+            self.assertEqual(items, PAGE['items'])
+            self.assertEqual(decoder.meta, {'page': 1, 'per_page': 50, 'pages': 2})
+
+    def test_records_come_out_before_the_end_of_the_body(self):
+        decoder = ItemDecoder()
+        parts = chunks(PAGE, 64)
+
+        self.assertTrue(any(decoder.feed(chunk) for chunk in parts[:len(parts) // 2]))
+
+    def test_plain_list_with_numbers(self):
+        self.assertEqual(list(iter_items(chunks([1, 22, 333, 4.5], 1))), [1, 22, 333, 4.5])
+
+    def test_filter(self):
+        records = list(iter_items(chunks(PAGE, 100), filter='status:ACTIVE AND cpu_cores>=90'))
+
+        self.assertEqual([record['id'] for record in records], ['45', '47', '49'])
+
+    def test_truncated_body(self):
+        with self.assertRaises(ValueError):
+            list(iter_items(chunks(PAGE, 100)[:-1]))
+
+
+class TestStreamedSearch(unittest.TestCase):
+    def setUp(self):
+        self.cassette = Cassette()
+        self.cassette.add('GET', '/v2/instances', PAGE)
+        self.cassette.add('GET', '/v2/charges', [{'code': 'instance', 'num_hours': 3}])
+        self.civo = Civo('token', region='lon1', cassette=self.cassette)
+
+    def test_instances(self):
+        records = self.civo.instances.search(filter='status:SHUTOFF', stream=True)
+
+        self.assertIsInstance(records, types.GeneratorType)
+        self.assertEqual(len(list(records)), 25)
+
+    def test_instances_models(self):
+        records = list(self.civo.instances.search(stream=True, model=True))
+
+        self.assertIsInstance(records[0], Instance)
+        self.assertEqual(records[0].tags, ('a', 'b'))
+
+    def test_charges(self):
+        self.assertEqual(list(self.civo.charges.get(stream=True)), [{'code': 'instance', 'num_hours': 3}])
+
+    def test_error_is_raised_by_the_call(self):
+        self.cassette.add('GET', '/v2/dns/domain/records', {'reason': 'not found'}, status=404)
+        self.cassette.add('GET', '/v2/dnsdomain/records', {'reason': 'not found'}, status=404)
+
+        with self.assertRaises(CIVOAPIError) as error:
+            self.civo.dns.lists_record('domain', stream=True)
+
+        self.assertEqual(error.exception.status, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
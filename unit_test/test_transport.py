@@ -0,0 +1,42 @@
+import unittest
+from unittest import mock
+
+from civo import Civo
+from civo.transport import Transport
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        self.transport = Transport({'Authorization': 'bearer token'}, pool_maxsize=4)
+        self.response = mock.Mock()
+        self.response.json.return_value = [
+            {'name': 'lon1', 'default': True},
+            {'name': 'nyc1', 'default': False},
+        ]
+
+    def test_headers_are_set_on_session(self):
+        self.assertEqual(self.transport.session.headers['Authorization'], 'bearer token')
+
+    def test_request_decodes_json(self):
+        with mock.patch.object(self.transport.session, 'request', return_value=self.response) as request:
+            result = self.transport.get('https://api.civo.com/v2/regions', params={'page': 1})
+
+        request.assert_called_once_with('GET', 'https://api.civo.com/v2/regions', params={'page': 1}, data=None)
+        self.assertEqual(len(result), 2)
+
+    def test_request_applies_filter(self):
+        with mock.patch.object(self.transport.session, 'request', return_value=self.response):
+            result = self.transport.get('https://api.civo.com/v2/regions', filter='name:nyc')
+
+        self.assertEqual(result, [{'name': 'nyc1', 'default': False}])
+
+    def test_civo_shares_one_transport(self):
+        civo = Civo('token', region='lon1')
+
+        self.assertIs(civo.instances.transport, civo.transport)
+        self.assertIs(civo.kubernetes.transport, civo.transport)
+        self.assertIs(civo.size.transport, civo.transport)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import threading
+import time
 import unittest
 
-from civo.utils import filter_list
+from civo.exceptions import CIVOAPIError
+from civo.utils import filter_list, iterate_pages, run_bulk
 
 class TestFilterList(unittest.TestCase):
     def setUp(self):
@@ -37,6 +40,79 @@ class TestFilterList(unittest.TestCase):
         filter_by = 'invalid_key:25'
         with self.assertRaises(KeyError):
             filter_list(self.data, filter_by)
-        
+
+
+class TestIteratePages(unittest.TestCase):
+    def setUp(self):
+        self.requested = []
+
+    def fetch_page(self, page):
+        self.requested.append(page)
+        items = [{'id': '{}-{}'.format(page, i), 'status': 'ACTIVE' if i % 2 else 'BUILDING'} for i in range(3)]
+        return {'page': page, 'per_page': 3, 'pages': 3, 'items': items}
+
+    def test_yields_every_item_in_order(self):
+        result = [i['id'] for i in iterate_pages(self.fetch_page)]
+
+        self.assertEqual(result, ['1-0', '1-1', '1-2', '2-0', '2-1', '2-2', '3-0', '3-1', '3-2'])
+        self.assertEqual(self.requested, [1, 2, 3])
+
+    def test_filter_each_page(self):
+        result = [i['id'] for i in iterate_pages(self.fetch_page, filter_by='status:ACTIVE')]
+
+        self.assertEqual(result, ['1-1', '2-1', '3-1'])
+
+    def test_is_lazy(self):
+        pages = iterate_pages(self.fetch_page)
+        next(pages)
+        pages.close()
+
+        self.assertLessEqual(len(self.requested), 2)
+
+    def test_plain_list(self):
+        result = list(iterate_pages(lambda page: [{'id': 1}, {'id': 2}]))
+
+        self.assertEqual(result, [{'id': 1}, {'id': 2}])
+
+    def test_error_body(self):
+        with self.assertRaises(CIVOAPIError) as context:
+            list(iterate_pages(lambda page: {'code': 'authentication_failed', 'reason': 'Authentication failed'}))
+
+        self.assertEqual(context.exception.body['code'], 'authentication_failed')
+
+
+class TestRunBulk(unittest.TestCase):
+    def test_results_in_order_with_errors(self):
+        def function(item):
+            time.sleep(0.01 * (5 - item))
+            if item == 3:
+                raise ValueError('boom')
+            return item * 10
+
+        progress = []
+        results = run_bulk(function, range(5), concurrency=5, progress=lambda done, total, r: progress.append(done))
+
+        self.assertEqual([r.item for r in results], [0, 1, 2, 3, 4])
+        self.assertEqual([r.result for r in results], [0, 10, 20, None, 40])
+        self.assertIsInstance(results[3].error, ValueError)
+        self.assertEqual(progress, [1, 2, 3, 4, 5])
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def function(item):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+
+        run_bulk(function, range(20), concurrency=3)
+
+        self.assertLessEqual(state['peak'], 3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from unittest import mock
+
+from civo.exceptions import CIVOAPIError
+from civo.waiter import Waiter
+
+
+class FakeListing:
+    def __init__(self, ticks):
+        self.ticks = ticks
+        self.calls = 0
+
+    def __call__(self):
+        records = self.ticks[min(self.calls, len(self.ticks) - 1)]
+        self.calls += 1
+        if isinstance(records, Exception):
+            raise records
+        return records
+
+
+class TestWaiter(unittest.TestCase):
+    def test_one_listing_per_tick_for_many_resources(self):
+        listing = FakeListing([
+            [{'id': str(i), 'status': 'BUILDING'} for i in range(50)],
+            [{'id': str(i), 'status': 'ACTIVE' if i < 25 else 'BUILDING'} for i in range(50)],
+            [{'id': str(i), 'status': 'ACTIVE'} for i in range(50)],
+        ])
+        waiter = Waiter(listing, interval=0.01)
+        done = []
+
+        futures = waiter.wait([str(i) for i in range(50)], callback=done.append, timeout=5)
+        records = [futures[str(i)].result(timeout=5) for i in range(50)]
+
+        self.assertTrue(all(record['status'] == 'ACTIVE' for record in records))
+        self.assertEqual(len(done), 50)
+        self.assertEqual(listing.calls, 3)
+
+    def test_failed_state(self):
+        waiter = Waiter(FakeListing([[{'id': 'a', 'status': 'ERROR'}]]), interval=0.01)
+
+        with self.assertRaises(CIVOAPIError):
+            waiter.wait(['a'])['a'].result(timeout=5)
+
+    def test_timeout(self):
+        waiter = Waiter(FakeListing([[{'id': 'a', 'status': 'BUILDING'}]]), interval=0.01)
+
+        with self.assertRaises(TimeoutError):
+            waiter.wait(['a'], timeout=0.05)['a'].result(timeout=5)
+
+    def test_wait_for_deletion(self):
+        waiter = Waiter(FakeListing([[{'id': 'a', 'status': 'DELETING'}], []]), interval=0.01)
+
+        self.assertEqual(waiter.wait(['a'], state=None)['a'].result(timeout=5), {'id': 'a'})
+
+    @mock.patch('civo.waiter.print_err')
+    def test_transient_errors_are_retried(self, print_err):
+        listing = FakeListing([ConnectionError('reset'), {'code': 'bad_gateway', 'reason': 'Bad gateway'},
+                               [{'id': 'a', 'status': 'ACTIVE'}]])
+        waiter = Waiter(listing, interval=0.01, max_interval=0.01)
+
+        self.assertEqual(waiter.wait(['a'], timeout=5)['a'].result(timeout=5)['status'], 'ACTIVE')
+        self.assertEqual(print_err.call_count, 2)
+
+    @mock.patch('civo.waiter.print_err')
+    def test_errors_in_a_row_fail_the_waits(self, print_err):
+        waiter = Waiter(FakeListing([ConnectionError('down')]), interval=0.01, max_interval=0.01, max_errors=3)
+
+        with self.assertRaises(ConnectionError):
+            waiter.wait(['a'], timeout=5)['a'].result(timeout=5)
+
+    @mock.patch('civo.waiter.print_err')
+    def test_timeout_while_failing(self, print_err):
+        waiter = Waiter(FakeListing([ConnectionError('down')]), interval=0.01, max_errors=1000)
+
+        with self.assertRaises(TimeoutError):
+            waiter.wait(['a'], timeout=0.05)['a'].result(timeout=5)
+
+    def test_pages_are_read_until_the_resources_are_found(self):
+        requested = []
+
+        def fetch_page(page):
+            requested.append(page)
+            items = [{'id': '{}-{}'.format(page, i), 'status': 'ACTIVE'} for i in range(3)]
+            return {'page': page, 'per_page': 3, 'pages': 3, 'items': items}
+
+        waiter = Waiter(fetch_page=fetch_page, interval=0.01)
+        waiter.wait(['1-0', '1-2'])['1-0'].result(timeout=5)
+        self.assertEqual(requested, [1])
+
+        del requested[:]
+        waiter.wait(['2-1'])['2-1'].result(timeout=5)
+        self.assertEqual(requested, [1, 2])
+
+        del requested[:]
+        waiter.wait(['gone'], state=None)['gone'].result(timeout=5)
+        self.assertEqual(requested, [1, 2, 3])
+
+    def test_lister_or_fetch_page(self):
+        with self.assertRaises(ValueError):
+            Waiter()
+
+    def test_adaptive_interval(self):
+        waiter = Waiter(FakeListing([[]]), interval=1, max_interval=4, backoff=2)
+
+        self.assertEqual(waiter._next_interval(1, changed=False), 2)
+        self.assertEqual(waiter._next_interval(4, changed=False), 4)
+        self.assertEqual(waiter._next_interval(4, changed=True), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
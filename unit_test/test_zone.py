@@ -0,0 +1,116 @@
+import time
+import unittest
+from unittest import mock
+
+from civo.dns import Dns
+from civo.zone import diff_records, parse_zone
+
+ZONE = '''
+$ORIGIN example.com.
+$TTL 3600
+@       IN  SOA ns0.civo.com. admin.example.com. (
+            2021022701 ; serial
+            3600 )
+@       IN  NS    ns0.civo.com.
+@           A     74.220.1.1
+www     600 IN  CNAME example.com.
+@           MX    10 mail.example.com.
+            MX    20 backup.example.com.
+txt         TXT   "v=spf1 include:_spf.example.com ~all" ; spf
+api.example.com. A 74.220.1.2
+'''
+
+
+class TestParseZone(unittest.TestCase):
+    def test_parse(self):
+        records = parse_zone(ZONE)
+
+        self.assertEqual(records, [
+            {'type': 'A', 'name': '@', 'value': '74.220.1.1', 'ttl': 3600},
+            {'type': 'CNAME', 'name': 'www', 'value': 'example.com', 'ttl': 600},
+            {'type': 'MX', 'name': '@', 'value': 'mail.example.com', 'ttl': 3600, 'priority': 10},
+            {'type': 'MX', 'name': '@', 'value': 'backup.example.com', 'ttl': 3600, 'priority': 20},
+            {'type': 'TXT', 'name': 'txt', 'value': 'v=spf1 include:_spf.example.com ~all', 'ttl': 3600},
+            {'type': 'A', 'name': 'api', 'value': '74.220.1.2', 'ttl': 3600},
+        ])
+
+    def test_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            parse_zone('@ IN HINFO "cpu" "os"', origin='example.com')
+
+
+class TestDiffRecords(unittest.TestCase):
+    def setUp(self):
+        self.current = [
+            {'id': '1', 'type': 'a', 'name': 'www', 'value': '10.0.0.1', 'ttl': 600},
+            {'id': '2', 'type': 'a', 'name': 'api', 'value': '10.0.0.2', 'ttl': 600},
+            {'id': '3', 'type': 'txt', 'name': 'old', 'value': 'x', 'ttl': 600},
+            {'id': '4', 'type': 'a', 'name': 'db', 'value': '10.0.0.4', 'ttl': 600},
+        ]
+
+    def test_minimal_diff(self):
+        desired = [
+            {'type': 'A', 'name': 'www', 'value': '10.0.0.1', 'ttl': 600},
+            {'type': 'A', 'name': 'api', 'value': '10.0.0.2', 'ttl': 3600},
+            {'type': 'A', 'name': 'db', 'value': '10.0.0.5'},
+            {'type': 'A', 'name': 'new', 'value': '10.0.0.6'},
+        ]
+
+        diff = diff_records(self.current, desired)
+
+        self.assertEqual(diff.create, [desired[3]])
+        self.assertEqual([(c['id'], d['value']) for c, d in diff.update], [('2', '10.0.0.2'), ('4', '10.0.0.5')])
+        self.assertEqual([r['id'] for r in diff.delete], ['3'])
+
+    def test_no_delete(self):
+        diff = diff_records(self.current, [], delete=False)
+
+        self.assertEqual(diff, ([], [], []))
+
+
+class TestDnsSync(unittest.TestCase):
+    def test_sync_only_calls_for_changes(self):
+        transport = mock.Mock()
+        transport.get.return_value = [{'id': 'r1', 'type': 'a', 'name': 'www', 'value': '10.0.0.1', 'ttl': 600},
+                                      {'id': 'r2', 'type': 'a', 'name': 'old', 'value': '10.0.0.9', 'ttl': 600}]
+        dns = Dns({}, 'https://api.civo.com', transport=transport)
+
+        result = dns.sync('d1', records=[{'type': 'A', 'name': 'www', 'value': '10.0.0.1', 'ttl': 600},
+                                         {'type': 'A', 'name': 'old', 'value': '10.0.0.2'}])
+
+        transport.get.assert_called_once_with('https://api.civo.com/v2/dns/d1/records', filter=None, stream=False)
+        self.assertEqual(transport.put.call_args[0][0], 'https://api.civo.com/v2/dns/d1/records/r2')
+        transport.post.assert_not_called()
+        transport.delete.assert_not_called()
+        self.assertEqual(len(result['update']), 1)
+        self.assertEqual(result['errors'], [])
+
+    def test_deletes_then_updates_then_creates(self):
+        calls = []
+        transport = mock.Mock()
+        transport.get.return_value = [{'id': 'r1', 'type': 'a', 'name': 'www', 'value': '10.0.0.1', 'ttl': 600},
+                                      {'id': 'r2', 'type': 'cname', 'name': 'api', 'value': 'www', 'ttl': 600}]
+        transport.delete.side_effect = lambda url: time.sleep(0.02) or calls.append('delete')
+        transport.put.side_effect = lambda url, params: time.sleep(0.01) or calls.append('update')
+        transport.post.side_effect = lambda url, params: calls.append('create')
+        dns = Dns({}, 'https://api.civo.com', transport=transport)
+
+        dns.sync('d1', records=[{'type': 'A', 'name': 'www', 'value': '10.0.0.2', 'ttl': 600},
+                                {'type': 'A', 'name': 'api', 'value': '10.0.0.3', 'ttl': 600},
+                                {'type': 'A', 'name': 'new', 'value': '10.0.0.4', 'ttl': 600}])
+
+        self.assertEqual(calls, ['delete', 'update', 'create', 'create'])
+
+    def test_dry_run(self):
+        transport = mock.Mock()
+        transport.get.return_value = []
+        dns = Dns({}, 'https://api.civo.com', transport=transport)
+
+        result = dns.sync('d1', zone='www A 10.0.0.1', origin='example.com', dry_run=True)
+
+        self.assertEqual(result['create'], [{'type': 'A', 'name': 'www', 'value': '10.0.0.1', 'ttl': 600}])
+        transport.post.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()